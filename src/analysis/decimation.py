@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+import logging
+
+import numpy as np
+
+from analysis.range_index import index_range
+
+# Use root logger
+logger = logging.getLogger(__name__)
+
+DECIMATION_METHODS = ["lttb", "minmax"]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Downsamples a trace with the Largest-Triangle-Three-Buckets algorithm.
+
+    The first and last points are kept. The remaining points are split into
+    threshold - 2 buckets, and each bucket keeps the point forming the largest
+    triangle with the previously kept point and the mean of the next bucket.
+    Peaks and valleys are therefore preserved much better than with a stride.
+
+    Args:
+        x (np.ndarray): Increasing abscissae.
+        y (np.ndarray): Values.
+        threshold (int): Number of points to keep.
+
+    Returns:
+        tuple: Downsampled (x, y).
+    """
+
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return (x, y)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Bucket boundaries over the points between the first and the last one
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    sizes = np.diff(edges)
+    mean_x = np.append(np.add.reduceat(x[:-1], edges[:-1]) / sizes, x[-1])
+    mean_y = np.append(np.add.reduceat(y[:-1], edges[:-1]) / sizes, y[-1])
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - mean_x[i + 1]) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (mean_y[i + 1] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return (x[selected], y[selected])
+
+
+def minmax(x: np.ndarray, y: np.ndarray, buckets: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Downsamples a trace to the minimum and maximum of evenly sized buckets.
+
+    With one bucket per pixel column, the drawn line covers exactly the same
+    pixels as the full trace.
+
+    Args:
+        x (np.ndarray): Increasing abscissae.
+        y (np.ndarray): Values.
+        buckets (int): Number of buckets, two points are kept per bucket.
+
+    Returns:
+        tuple: Downsampled (x, y), in increasing x order.
+    """
+
+    n = len(x)
+    if 2 * buckets >= n or buckets < 1:
+        return (x, y)
+
+    # Pad to a whole number of buckets by repeating the last value
+    size = -(-n // buckets)
+    blocks = np.pad(np.asarray(y), (0, size * buckets - n), mode="edge")
+    blocks = blocks.reshape(buckets, size)
+
+    offsets = np.arange(buckets) * size
+    low = offsets + blocks.argmin(axis=1)
+    high = offsets + blocks.argmax(axis=1)
+    selected = np.minimum(np.sort(np.stack((low, high), axis=1), axis=1).ravel(), n - 1)
+
+    return (x[selected], y[selected])
+
+
+def decimate_range(
+    x: np.ndarray,
+    y: np.ndarray,
+    limits: tuple[float, float],
+    points: int,
+    method: str = "lttb",
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Downsamples the part of a trace visible within x limits.
+
+    One point beyond each limit is kept so the line reaches the axes edges.
+
+    Args:
+        x (np.ndarray): Increasing abscissae.
+        y (np.ndarray): Values.
+        limits (tuple): Visible (min, max) x range.
+        points (int): Approximate number of points to keep.
+        method (str, optional): One of DECIMATION_METHODS. Defaults to "lttb".
+
+    Returns:
+        tuple: Downsampled (x, y).
+    """
+
+    start, stop = index_range(x, *limits)
+    start, stop = max(start - 1, 0), min(stop + 1, len(x))
+    x, y = x[start:stop], y[start:stop]
+
+    if method == "minmax":
+        return minmax(x, y, points // 2)
+    if method == "lttb":
+        return lttb(x, y, points)
+    return (x, y)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+import logging
+
+import numpy as np
+
+# Use root logger
+logger = logging.getLogger(__name__)
+
+INTERPOLATION_METHODS = ["linear", "cubic", "akima"]
+
+
+def upsample_rows(
+    axis: np.ndarray, matrix: np.ndarray, factor: int, method: str = "linear"
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Resamples the rows of a matrix onto a finer, evenly spaced axis.
+
+    Every column of the matrix is interpolated at once, so the cost is a
+    handful of vectorized operations regardless of the number of D2 points.
+
+    Args:
+        axis (np.ndarray): Increasing coordinates of the matrix rows (D1 times).
+        matrix (np.ndarray): 2D matrix with one row per axis value.
+        factor (int): Number of output intervals per input interval.
+        method (str, optional): One of "linear", "cubic" (natural cubic spline)
+            or "akima". Defaults to "linear".
+
+    Returns:
+        tuple: A tuple containing:
+            - fine_axis (np.ndarray): The resampled axis.
+            - fine_matrix (np.ndarray): The resampled matrix.
+
+    Raises:
+        ValueError: If the method is unknown or the factor is lower than 1.
+    """
+
+    if method not in INTERPOLATION_METHODS:
+        raise ValueError(f"Unknown interpolation method '{method}'.")
+    if factor < 1:
+        raise ValueError("Upsampling factor must be at least 1.")
+
+    axis = np.asarray(axis, dtype=float)
+    matrix = np.asarray(matrix, dtype=float)
+    n = len(axis)
+
+    if factor == 1 or n < 2:
+        return axis, matrix
+
+    # Cubic methods need at least three nodes to define curvature
+    if n < 3:
+        method = "linear"
+
+    fine_axis = np.linspace(axis[0], axis[-1], (n - 1) * factor + 1)
+
+    # Locate the input interval of every output point
+    k = np.clip(np.searchsorted(axis, fine_axis, side="right") - 1, 0, n - 2)
+    h = np.diff(axis)
+    t = ((fine_axis - axis[k]) / h[k])[:, None]
+
+    y0, y1 = matrix[k], matrix[k + 1]
+
+    if method == "linear":
+        fine_matrix = (1 - t) * y0 + t * y1
+
+    elif method == "cubic":
+        second = _spline_second_derivatives(axis, matrix)
+        hk = h[k][:, None]
+        a, b = 1 - t, t
+        fine_matrix = (
+            a * y0
+            + b * y1
+            + ((a**3 - a) * second[k] + (b**3 - b) * second[k + 1]) * hk**2 / 6
+        )
+
+    else:
+        slopes = _akima_slopes(axis, matrix)
+        hk = h[k][:, None]
+        fine_matrix = (
+            (2 * t**3 - 3 * t**2 + 1) * y0
+            + (t**3 - 2 * t**2 + t) * hk * slopes[k]
+            + (-2 * t**3 + 3 * t**2) * y1
+            + (t**3 - t**2) * hk * slopes[k + 1]
+        )
+
+    logger.debug(
+        f"Upsampled {matrix.shape} to {fine_matrix.shape} ({method}, x{factor})."
+    )
+
+    return fine_axis, fine_matrix
+
+
+def _spline_second_derivatives(axis: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Solves the natural cubic spline system for all columns at once.
+
+    Args:
+        axis (np.ndarray): Node coordinates.
+        matrix (np.ndarray): Node values, one row per node.
+
+    Returns:
+        np.ndarray: Second derivatives at the nodes, same shape as the matrix.
+    """
+
+    n = len(axis)
+    h = np.diff(axis)
+    second = np.zeros_like(matrix)
+
+    # Tridiagonal system for the interior nodes (Thomas algorithm)
+    slopes = np.diff(matrix, axis=0) / h[:, None]
+    rhs = 6 * np.diff(slopes, axis=0)
+    diag = 2 * (h[:-1] + h[1:])
+    sub = h[1:-1]
+
+    c = np.zeros(n - 2)
+    d = np.zeros_like(rhs)
+    c[0] = sub[0] / diag[0] if n > 3 else 0
+    d[0] = rhs[0] / diag[0]
+    for i in range(1, n - 2):
+        denominator = diag[i] - h[i] * c[i - 1]
+        if i < n - 3:
+            c[i] = sub[i] / denominator
+        d[i] = (rhs[i] - h[i] * d[i - 1]) / denominator
+
+    second[n - 2] = d[-1]
+    for i in range(n - 4, -1, -1):
+        second[i + 1] = d[i] - c[i] * second[i + 2]
+
+    return second
+
+
+def _akima_slopes(axis: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Computes Akima node slopes for all columns at once.
+
+    Args:
+        axis (np.ndarray): Node coordinates.
+        matrix (np.ndarray): Node values, one row per node.
+
+    Returns:
+        np.ndarray: Slopes at the nodes, same shape as the matrix.
+    """
+
+    m = np.diff(matrix, axis=0) / np.diff(axis)[:, None]
+
+    # Extend the secant slopes by two on each side
+    m_start = 2 * m[0] - m[1]
+    m_end = 2 * m[-1] - m[-2]
+    m = np.vstack((2 * m_start - m[0], m_start, m, m_end, 2 * m_end - m[-1]))
+
+    w1 = np.abs(m[3:] - m[2:-1])
+    w2 = np.abs(m[1:-2] - m[:-3])
+    weights = w1 + w2
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slopes = (w1 * m[1:-2] + w2 * m[2:-1]) / weights
+    flat = weights == 0
+    slopes[flat] = 0.5 * (m[1:-2] + m[2:-1])[flat]
+
+    return slopes
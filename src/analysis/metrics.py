@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Use root logger
+logger = logging.getLogger(__name__)
+
+# Conversion from full width at half maximum to standard deviation
+FWHM_TO_SIGMA = 1 / (2 * np.sqrt(2 * np.log(2)))
+
+
+def find_peaks(
+    matrix: np.ndarray,
+    ax_D1: np.ndarray,
+    ax_D2: np.ndarray,
+    threshold: float = 0.05,
+    window: int = 25,
+) -> np.ndarray:
+    """
+    Detects peaks in a processed matrix and measures their widths.
+
+    Peaks are local maxima over their 8 neighbours that are higher than a
+    fraction of the most intense point. Flat tops spanning several points count
+    as one peak, located at their centre. Widths are measured at half height
+    along both dimensions, for all peaks at once.
+
+    Args:
+        matrix (np.ndarray): 2D matrix with D1 along rows and D2 along columns.
+        ax_D1 (np.ndarray): D1 time vector [min].
+        ax_D2 (np.ndarray): D2 time vector [s].
+        threshold (float, optional): Minimum height relative to the matrix
+            maximum. Defaults to 0.05.
+        window (int, optional): Maximum half width, in points, searched around
+            each peak. Defaults to 25.
+
+    Returns:
+        np.ndarray: Peak list with one row per peak and columns
+            (t1 [min], t2 [s], height, 4-sigma width D1 [min], 4-sigma width D2 [s]).
+    """
+
+    n, m = matrix.shape
+    padded = np.pad(matrix, 1, mode="constant", constant_values=-np.inf)
+    is_peak = matrix > threshold * matrix.max()
+    for di in (0, 1, 2):
+        for dj in (0, 1, 2):
+            if (di, dj) != (1, 1):
+                is_peak &= matrix >= padded[di : di + n, dj : dj + m]
+
+    rows, cols = _collapse_plateaus(*np.nonzero(is_peak), matrix.shape)
+    heights = matrix[rows, cols]
+
+    fwhm_D1 = _half_height_width(matrix, rows, cols, heights, window) * (
+        ax_D1[1] - ax_D1[0]
+    )
+    fwhm_D2 = _half_height_width(matrix.T, cols, rows, heights, window) * (
+        ax_D2[1] - ax_D2[0]
+    )
+
+    return np.column_stack(
+        (
+            ax_D1[rows],
+            ax_D2[cols],
+            heights,
+            4 * FWHM_TO_SIGMA * fwhm_D1,
+            4 * FWHM_TO_SIGMA * fwhm_D2,
+        )
+    )
+
+
+def _collapse_plateaus(
+    rows: np.ndarray, cols: np.ndarray, shape: tuple[int, int]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Keeps one point of every group of adjacent local maxima.
+
+    Adjacent local maxima are necessarily equal, so each 8-connected group is a
+    plateau. The point closest to the centroid of the group is kept.
+
+    Args:
+        rows (np.ndarray): Row index of every local maximum.
+        cols (np.ndarray): Column index of every local maximum.
+        shape (tuple): Shape of the matrix.
+
+    Returns:
+        tuple: Row and column indices of one point per plateau.
+    """
+
+    lookup = np.full(shape, -1)
+    lookup[rows, cols] = np.arange(len(rows))
+
+    # Pairs of adjacent maxima, each pair listed once
+    first, second = [], []
+    for di, dj in ((0, 1), (1, -1), (1, 0), (1, 1)):
+        r, c = rows + di, cols + dj
+        inside = np.nonzero((r < shape[0]) & (c >= 0) & (c < shape[1]))[0]
+        neighbour = lookup[r[inside], c[inside]]
+        first.append(inside[neighbour >= 0])
+        second.append(neighbour[neighbour >= 0])
+    first, second = np.concatenate(first), np.concatenate(second)
+    if len(first) == 0:
+        return (rows, cols)
+
+    # Propagate the smallest index through every group
+    labels = np.arange(len(rows))
+    while True:
+        updated = labels.copy()
+        np.minimum.at(updated, first, labels[second])
+        np.minimum.at(updated, second, labels[first])
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+
+    _, group = np.unique(labels, return_inverse=True)
+    counts = np.bincount(group)
+    centre_row = np.bincount(group, rows) / counts
+    centre_col = np.bincount(group, cols) / counts
+    distance = (rows - centre_row[group]) ** 2 + (cols - centre_col[group]) ** 2
+
+    # Closest point first within each group
+    order = np.lexsort((distance, group))
+    keep = order[np.r_[True, np.diff(group[order]) != 0]]
+    return (rows[keep], cols[keep])
+
+
+def _half_height_width(
+    matrix: np.ndarray,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    heights: np.ndarray,
+    window: int,
+) -> np.ndarray:
+    """
+    Measures the width at half height along the rows of a matrix, in points.
+
+    Args:
+        matrix (np.ndarray): 2D matrix, widths are measured along axis 0.
+        rows (np.ndarray): Row index of every peak.
+        cols (np.ndarray): Column index of every peak.
+        heights (np.ndarray): Height of every peak.
+        window (int): Maximum half width searched.
+
+    Returns:
+        np.ndarray: Width of every peak, in points.
+    """
+
+    offsets = np.arange(-window, window + 1)
+    index = rows[:, None] + offsets[None, :]
+    valid = (index >= 0) & (index < matrix.shape[0])
+    profiles = np.where(
+        valid, matrix[np.clip(index, 0, matrix.shape[0] - 1), cols[:, None]], -np.inf
+    )
+    above = profiles >= heights[:, None] / 2
+
+    # Extent of the contiguous run above half height containing the apex
+    right = above[:, window:]
+    left = above[:, window::-1]
+    n_right = np.where(right.all(axis=1), window, np.argmin(right, axis=1) - 1)
+    n_left = np.where(left.all(axis=1), window, np.argmin(left, axis=1) - 1)
+
+    return (n_right + n_left + 1).astype(float)
+
+
+def normalize_retention(
+    peaks: np.ndarray,
+    D1_range: tuple[float, float],
+    D2_range: tuple[float, float],
+) -> np.ndarray:
+    """
+    Scales peak retention times to the unit square.
+
+    Args:
+        peaks (np.ndarray): Peak list, retention times in the first two columns.
+        D1_range (tuple): (start, end) of the D1 separation space [min].
+        D2_range (tuple): (start, end) of the D2 separation space [s].
+
+    Returns:
+        np.ndarray: (n, 2) array of normalized retention times.
+    """
+
+    lows = np.array([D1_range[0], D2_range[0]])
+    spans = np.array([D1_range[1] - D1_range[0], D2_range[1] - D2_range[0]])
+    return np.clip((peaks[:, :2] - lows) / spans, 0, 1)
+
+
+def bin_coverage(points: np.ndarray, bins: int | None = None) -> tuple[float, float]:
+    """
+    Computes the bin-based surface coverage and orthogonality (Gilar et al.).
+
+    The normalized space is divided into a grid of sqrt(N) x sqrt(N) bins for N
+    peaks, unless a bin count per dimension is given.
+
+    Args:
+        points (np.ndarray): (n, 2) normalized retention times.
+        bins (int, optional): Number of bins per dimension.
+
+    Returns:
+        tuple: A tuple containing:
+            - coverage (float): Fraction of occupied bins.
+            - orthogonality (float): Gilar's orthogonality, between 0 and 1.
+    """
+
+    if len(points) == 0:
+        return (0.0, 0.0)
+
+    if bins is None:
+        bins = max(1, int(round(np.sqrt(len(points)))))
+    cells = np.minimum((points * bins).astype(int), bins - 1)
+    occupied = len(np.unique(cells[:, 0] * bins + cells[:, 1]))
+
+    total = bins * bins
+    coverage = occupied / total
+    if total <= 1:
+        return (coverage, 0.0)
+
+    orthogonality = (occupied - np.sqrt(total)) / (0.63 * total - np.sqrt(total))
+    return (coverage, float(np.clip(orthogonality, 0, 1)))
+
+
+def convex_hull_area(points: np.ndarray) -> float:
+    """
+    Computes the area of the convex hull of a set of points.
+
+    Uses the monotone chain algorithm followed by the shoelace formula.
+    Applied to normalized retention times, the area is the convex hull
+    orthogonality measure (fraction of the separation space used).
+
+    Args:
+        points (np.ndarray): (n, 2) array of points.
+
+    Returns:
+        float: Area of the hull, 0 for fewer than three distinct points.
+    """
+
+    points = np.unique(points, axis=0)
+    if len(points) < 3:
+        return 0.0
+
+    def half_hull(sequence):
+        hull = []
+        for p in sequence:
+            while len(hull) >= 2:
+                (x1, y1), (x2, y2) = hull[-2], hull[-1]
+                if (x2 - x1) * (p[1] - y1) - (y2 - y1) * (p[0] - x1) > 0:
+                    break
+                hull.pop()
+            hull.append(p)
+        return hull
+
+    lower = half_hull(points)
+    upper = half_hull(points[::-1])
+    hull = np.array(lower[:-1] + upper[:-1])
+
+    x, y = hull[:, 0], hull[:, 1]
+    return float(0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))))
+
+
+def peak_capacity(span: float, widths: np.ndarray) -> float:
+    """
+    Computes the 1D peak capacity of a separation.
+
+    Args:
+        span (float): Duration of the separation window.
+        widths (np.ndarray): 4-sigma peak widths, in the same unit as the span.
+
+    Returns:
+        float: 1 + span / mean width, or NaN without measured widths.
+    """
+
+    widths = widths[np.isfinite(widths) & (widths > 0)]
+    if len(widths) == 0:
+        return float("nan")
+    return float(1 + span / widths.mean())
+
+
+def separation_metrics(
+    peaks: np.ndarray,
+    D1_range: tuple[float, float],
+    D2_range: tuple[float, float],
+    sampling_time: float | None = None,
+) -> dict:
+    """
+    Computes the separation metrics of one run from its peak list.
+
+    Args:
+        peaks (np.ndarray): Peak list as returned by find_peaks(). Only the
+            retention time columns are required, widths are optional.
+        D1_range (tuple): (start, end) of the D1 separation space [min].
+        D2_range (tuple): (start, end) of the D2 separation space [s].
+        sampling_time (float, optional): Modulation time [min], used for the
+            undersampling correction of the effective peak capacity.
+
+    Returns:
+        dict: Metrics of the run.
+    """
+
+    points = normalize_retention(peaks, D1_range, D2_range)
+    coverage, orthogonality = bin_coverage(points)
+
+    result = {
+        "peaks": len(peaks),
+        "surface_coverage": coverage,
+        "bin_orthogonality": orthogonality,
+        "hull_orthogonality": convex_hull_area(points),
+    }
+
+    if peaks.shape[1] >= 5:
+        n1 = peak_capacity(D1_range[1] - D1_range[0], peaks[:, 3])
+        n2 = peak_capacity(D2_range[1] - D2_range[0], peaks[:, 4])
+
+        # Undersampling correction (Davis, Stoll and Carr)
+        beta = 1.0
+        if sampling_time:
+            sigma_1 = np.nanmean(peaks[:, 3]) / 4
+            if sigma_1 > 0:
+                beta = np.sqrt(1 + 0.21 * (sampling_time / sigma_1) ** 2)
+
+        result.update(
+            {
+                "peak_capacity_D1": n1,
+                "peak_capacity_D2": n2,
+                "peak_capacity_2D": n1 * n2,
+                "effective_peak_capacity": float(n1 * n2 * coverage / beta),
+            }
+        )
+
+    return result
+
+
+def matrix_metrics(
+    matrix: np.ndarray,
+    ax_D1: np.ndarray,
+    ax_D2: np.ndarray,
+    sampling_time: float | None = None,
+    threshold: float = 0.05,
+) -> dict:
+    """
+    Detects peaks in a processed matrix and computes its separation metrics.
+
+    Args:
+        matrix (np.ndarray): 2D matrix with D1 along rows and D2 along columns.
+        ax_D1 (np.ndarray): D1 time vector [min].
+        ax_D2 (np.ndarray): D2 time vector [s].
+        sampling_time (float, optional): Modulation time [min].
+        threshold (float, optional): Minimum relative peak height. Defaults to 0.05.
+
+    Returns:
+        dict: Metrics of the run.
+    """
+
+    peaks = find_peaks(matrix, ax_D1, ax_D2, threshold)
+    return separation_metrics(
+        peaks, (ax_D1[0], ax_D1[-1]), (ax_D2[0], ax_D2[-1]), sampling_time
+    )
+
+
+def run_metrics(
+    path: str, sampling_time: float, blank_time: float = None, threshold: float = 0.05
+) -> dict:
+    """
+    Loads, processes and evaluates one Excel run. Meant to run in a worker process.
+
+    The first sheet is used. A header line is detected automatically.
+
+    Args:
+        path (str): Path to the Excel file.
+        sampling_time (float): Modulation time [min].
+        blank_time (float, optional): D1 time of the blank to subtract.
+        threshold (float, optional): Minimum relative peak height. Defaults to 0.05.
+
+    Returns:
+        dict: Metrics of the run, with the file name under "run".
+    """
+
+    # Imported here so the module stays usable without the model
+    from model import DataManager
+
+    manager = DataManager()
+    manager.load(path, 0, headers=False)
+    if not np.issubdtype(manager.data.dtype, np.number):
+        manager.load(path, 0, headers=True)
+        manager.data = manager.data.astype(float)
+    # Only the matrix is needed, not the indexes built for drawing
+    manager.reshape(sampling_time, blank_time)
+
+    result = {"run": Path(path).name}
+    result.update(
+        matrix_metrics(
+            manager.value_matrix,
+            manager.ax_D1,
+            manager.ax_D2,
+            sampling_time,
+            threshold,
+        )
+    )
+    return result
+
+
+def compare_runs(
+    paths: list[str],
+    sampling_time: float,
+    blank_time: float = None,
+    threshold: float = 0.05,
+    workers: int | None = None,
+) -> pd.DataFrame:
+    """
+    Evaluates several runs in a pool of worker processes.
+
+    Args:
+        paths (list[str]): Paths to the Excel files.
+        sampling_time (float): Modulation time [min], shared by all runs.
+        blank_time (float, optional): D1 time of the blank to subtract.
+        threshold (float, optional): Minimum relative peak height. Defaults to 0.05.
+        workers (int, optional): Number of processes. Defaults to the CPU count.
+
+    Returns:
+        pd.DataFrame: One row per run, sorted by effective peak capacity.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    rows = []
+
+    with ProcessPoolExecutor(max_workers=min(workers, max(1, len(paths)))) as pool:
+        futures = {
+            pool.submit(run_metrics, str(p), sampling_time, blank_time, threshold): p
+            for p in paths
+        }
+        for future, path in futures.items():
+            try:
+                rows.append(future.result())
+            except Exception as e:
+                logger.error(f"Could not evaluate {Path(path).name}: {e}")
+                rows.append({"run": Path(path).name})
+
+    table = pd.DataFrame(rows).set_index("run")
+    if "effective_peak_capacity" in table:
+        table = table.sort_values("effective_peak_capacity", ascending=False)
+    return table
+
+
+def compare_folder(folder: str, sampling_time: float, **kwargs) -> pd.DataFrame | None:
+    """
+    Evaluates every Excel run of a folder. See compare_runs() for arguments.
+
+    Args:
+        folder (str): Folder containing .xlsx files.
+        sampling_time (float): Modulation time [min], shared by all runs.
+
+    Returns:
+        pd.DataFrame | None: One row per run, None if the folder has no run.
+    """
+
+    paths = sorted(
+        p for p in Path(folder).glob("*.xlsx") if not p.name.startswith("~$")
+    )
+    if len(paths) == 0:
+        logger.error(f"No Excel run found in {folder}.")
+        return None
+    logger.info(f"Comparing {len(paths)} runs from {folder}...")
+    return compare_runs(paths, sampling_time, **kwargs)
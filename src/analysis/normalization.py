@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+import logging
+
+import numpy as np
+from matplotlib.colors import BoundaryNorm
+
+# Use root logger
+logger = logging.getLogger(__name__)
+
+NORMS = ["linear", "sqrt", "log", "equalize"]
+
+
+class IntensityQuantiles:
+    """
+    IntensityQuantiles holds the intensity distribution of a matrix and the
+    contour level arrays derived from it.
+
+    The quantiles are computed once per matrix, with np.partition on a strided
+    subsample. The 0 and 100 percentiles are the true extremes of the matrix,
+    so an unclipped scale never misses a peak the subsample skipped. Level
+    arrays are then cached per norm, so switching between norms or clip
+    settings never scans the data again.
+
+    Attributes:
+        values (np.ndarray): Intensity at every percentile of GRID.
+    """
+
+    SAMPLE_SIZE = 2**20
+    REGION_SAMPLE = 2**16
+    GRID = np.linspace(0, 100, 1001)
+    LOG_DECADES = 4
+    CACHE_SIZE = 32
+
+    def __init__(self, matrix: np.ndarray):
+        """
+        Computes the percentile grid of a matrix.
+
+        Args:
+            matrix (np.ndarray): 2D matrix of intensities.
+        """
+
+        flat = np.asarray(matrix, dtype=float).ravel()
+        sample = flat[:: max(1, flat.size // self.SAMPLE_SIZE)]
+
+        kth = np.round(self.GRID / 100 * (len(sample) - 1)).astype(int)
+        self.values = np.partition(sample, np.unique(kth))[kth]
+        self.values[0], self.values[-1] = flat.min(), flat.max()
+        self.level_cache = {}
+        self.region_cache = {}
+
+    def percentile(self, q: float) -> float:
+        """
+        Returns the intensity at a given percentile.
+
+        Args:
+            q (float): Percentile between 0 and 100.
+        """
+
+        return float(np.interp(q, self.GRID, self.values))
+
+    def clipped_range(
+        self,
+        matrix: np.ndarray,
+        rows: tuple[int, int],
+        cols: tuple[int, int],
+        clip: float,
+    ) -> tuple[float, float]:
+        """
+        Returns the intensities at the clip and 100 - clip percentiles of a
+        region of the matrix.
+
+        The full matrix is answered from the percentile grid. A zoomed region
+        is read through a strided view of at most REGION_SAMPLE points, so it
+        is never copied whole, and the result is cached per region.
+
+        Args:
+            matrix (np.ndarray): The matrix the quantiles were computed from.
+            rows (tuple): Half-open (start, stop) row indices of the region.
+            cols (tuple): Half-open (start, stop) column indices of the region.
+            clip (float): Percentage clipped at each end, between 0 and 50.
+
+        Returns:
+            tuple: (low, high) intensities.
+        """
+
+        if rows == (0, matrix.shape[0]) and cols == (0, matrix.shape[1]):
+            return (self.percentile(clip), self.percentile(100 - clip))
+
+        key = (rows, cols, clip)
+        if key in self.region_cache:
+            return self.region_cache[key]
+
+        size = (rows[1] - rows[0]) * (cols[1] - cols[0])
+        step = max(1, int(np.ceil(np.sqrt(size / self.REGION_SAMPLE))))
+        sample = matrix[rows[0] : rows[1] : step, cols[0] : cols[1] : step]
+        low, high = np.percentile(sample, [clip, 100 - clip])
+
+        if len(self.region_cache) >= self.CACHE_SIZE:
+            self.region_cache.clear()
+        self.region_cache[key] = (float(low), float(high))
+
+        return self.region_cache[key]
+
+    def levels(self, norm: str, z_min: float, z_max: float, count: int) -> np.ndarray:
+        """
+        Returns strictly increasing contour levels between two intensities.
+
+        Args:
+            norm (str): One of NORMS.
+            z_min (float): Lowest level.
+            z_max (float): Highest level.
+            count (int): Number of levels.
+
+        Returns:
+            np.ndarray: The level array.
+        """
+
+        key = (norm, z_min, z_max, count)
+        if key in self.level_cache:
+            return self.level_cache[key]
+
+        steps = np.linspace(0, 1, count)
+        span = z_max - z_min
+
+        if norm == "sqrt":
+            levels = z_min + span * steps**2
+        elif norm == "log":
+            decades = 10**self.LOG_DECADES
+            levels = z_min + span * (decades**steps - 1) / (decades - 1)
+        elif norm == "equalize":
+            # Equal fractions of the points between consecutive levels
+            q_low = np.interp(z_min, self.values, self.GRID)
+            q_high = np.interp(z_max, self.values, self.GRID)
+            levels = np.interp(
+                np.linspace(q_low, q_high, count), self.GRID, self.values
+            )
+            levels[0], levels[-1] = z_min, z_max
+            levels = np.unique(levels)
+            if len(levels) < 2:
+                levels = z_min + span * steps
+        else:
+            levels = z_min + span * steps
+
+        if len(self.level_cache) >= self.CACHE_SIZE:
+            self.level_cache.clear()
+        self.level_cache[key] = levels
+
+        return levels
+
+
+def color_norm(norm: str, levels: np.ndarray, ncolors: int) -> BoundaryNorm | None:
+    """
+    Returns the color normalization matching a level array.
+
+    Non-linear levels are colored band by band, so every band gets its own
+    evenly spaced color regardless of its width in intensity.
+
+    Args:
+        norm (str): One of NORMS.
+        levels (np.ndarray): The contour levels.
+        ncolors (int): Number of colors in the colormap.
+
+    Returns:
+        BoundaryNorm | None: None for linear scaling (default normalization).
+    """
+
+    if norm == "linear" or len(levels) + 1 > ncolors:
+        return None
+    return BoundaryNorm(levels, ncolors=ncolors, extend="both")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+import logging
+
+import numpy as np
+
+# Use root logger
+logger = logging.getLogger(__name__)
+
+PROJECTION_MODES = ["sum", "max"]
+
+
+class Projections:
+    """
+    Projections caches the marginal profiles of a value matrix.
+
+    It holds:
+    - The reconstructed 1D chromatogram (sum or max over D2, one value per modulation).
+    - The summed D2 profile (sum over D1, one value per D2 point).
+
+    The profiles are computed once per processed matrix. Processing stages that
+    shift the matrix (such as blank subtraction) update the sums incrementally
+    instead of reducing the whole matrix again.
+
+    Attributes:
+        d1_sum (np.ndarray): Sum of every modulation over D2.
+        d2_sum (np.ndarray): Sum of every D2 point over D1.
+    """
+
+    def __init__(self, matrix: np.ndarray):
+        """
+        Initializes the projections from a freshly constructed matrix.
+
+        Args:
+            matrix (np.ndarray): 2D matrix with D1 along rows and D2 along columns.
+        """
+
+        self.matrix = matrix
+        self.d1_sum = matrix.sum(axis=1)
+        self.d2_sum = matrix.sum(axis=0)
+        self._d1_max = matrix.max(axis=1)
+
+    def subtract_row(self, row: np.ndarray, matrix: np.ndarray) -> None:
+        """
+        Updates the projections after a row has been subtracted from every modulation.
+
+        Args:
+            row (np.ndarray): The subtracted D2 chromatogram.
+            matrix (np.ndarray): The matrix after subtraction.
+        """
+
+        self.matrix = matrix
+        self.d1_sum = self.d1_sum - row.sum()
+        self.d2_sum = self.d2_sum - len(self.d1_sum) * row
+
+        # The maximum has no incremental form, it is reduced again on first use
+        self._d1_max = None
+
+    def __getstate__(self) -> dict:
+        """Pickles the profiles only, e.g. when sent to a render worker."""
+
+        state = self.__dict__.copy()
+        state["_d1_max"] = self.d1_max
+        state["matrix"] = None
+        return state
+
+    @property
+    def d1_max(self) -> np.ndarray:
+        """Maximum of every modulation over D2."""
+
+        if self._d1_max is None:
+            self._d1_max = self.matrix.max(axis=1)
+        return self._d1_max
+
+    def d1(self, mode: str = "sum") -> np.ndarray:
+        """
+        Returns the reconstructed 1D chromatogram.
+
+        Args:
+            mode (str, optional): "sum" or "max" over D2. Defaults to "sum".
+        """
+
+        return self.d1_max if mode == "max" else self.d1_sum
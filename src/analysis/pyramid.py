@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from analysis.range_index import index_range
+
+# Use root logger
+logger = logging.getLogger(__name__)
+
+REDUCTIONS = ["max", "mean"]
+
+
+class MatrixPyramid:
+    """
+    MatrixPyramid holds reduced resolution copies of a matrix, in the spirit
+    of texture mipmaps.
+
+    Level (i, j) halves the rows i times and the columns j times by pairing
+    neighbouring points. Rows and columns are reduced independently, since
+    2D-LC matrices usually have a few hundred modulations (rows) but thousands
+    of D2 points (columns). Coordinates of a merged pair are their mean.
+
+    With "max" reduction peaks keep their height at every level. With "mean"
+    reduction the total intensity is kept instead (up to the pair count).
+
+    Levels are built from the next finer one on first use and cached, so the
+    pyramid never holds more than about four times the original matrix.
+    Selections are cropped to the zoomed region, so the drawn points follow
+    the screen pixels at any zoom.
+
+    Attributes:
+        reduction (str): One of REDUCTIONS.
+        depth (tuple): Number of row and column levels.
+    """
+
+    MIN_SIZE = 16  # axes are not reduced below this many points
+    CROP_CACHE = 8  # selections kept, so a zoom returns the same arrays
+    CROP_MARGIN = 0.25  # fraction of the zoom span also kept on every side
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        rows_axis: np.ndarray,
+        cols_axis: np.ndarray,
+        reduction: str = "max",
+    ):
+        """
+        Initializes the pyramid with the full resolution matrix as level (0, 0).
+
+        Args:
+            matrix (np.ndarray): 2D matrix with D1 along rows and D2 along columns.
+            rows_axis (np.ndarray): Coordinates of the rows (D1 times).
+            cols_axis (np.ndarray): Coordinates of the columns (D2 times).
+            reduction (str, optional): "max" or "mean". Defaults to "max".
+        """
+
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"Unknown reduction '{reduction}'.")
+
+        self.reduction = reduction
+        self.levels = {(0, 0): (rows_axis, cols_axis, matrix)}
+        self.crops = OrderedDict()
+        self.lock = threading.Lock()
+        self.depth = (
+            _level_count(len(rows_axis), self.MIN_SIZE),
+            _level_count(len(cols_axis), self.MIN_SIZE),
+        )
+
+    def get(self, i: int, j: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns level (i, j), building it if needed.
+
+        Args:
+            i (int): Number of row halvings.
+            j (int): Number of column halvings.
+
+        Returns:
+            tuple: (rows_axis, cols_axis, matrix) of the level.
+        """
+
+        i = min(max(i, 0), self.depth[0] - 1)
+        j = min(max(j, 0), self.depth[1] - 1)
+
+        with self.lock:
+            if (i, j) in self.levels:
+                return self.levels[(i, j)]
+
+        # Reduce from the finer level along one axis
+        if i > 0:
+            rows, cols, matrix = self.get(i - 1, j)
+            rows, matrix = _halve(rows, matrix, 0, self.reduction)
+        else:
+            rows, cols, matrix = self.get(i, j - 1)
+            cols, matrix = _halve(cols, matrix, 1, self.reduction)
+
+        with self.lock:
+            self.levels[(i, j)] = (rows, cols, matrix)
+
+        logger.debug(f"Pyramid level ({i}, {j}) built with shape {matrix.shape}.")
+
+        return (rows, cols, matrix)
+
+    def select(
+        self,
+        rows_range: tuple[float, float],
+        cols_range: tuple[float, float],
+        rows_pixels: float | None,
+        cols_pixels: float | None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the coarsest level that still has one point per screen pixel
+        within the zoomed region, cropped to that region.
+
+        The crop extends CROP_MARGIN of the zoom span beyond every side, plus
+        one point, so the drawing reaches the zoom limits and small pans or
+        zooms out at the same level stay within the drawn data. The same zoom
+        returns the same array views, so its shared memory blocks are reused.
+
+        Args:
+            rows_range (tuple): (min, max) limits along D1.
+            cols_range (tuple): (min, max) limits along D2.
+            rows_pixels (float | None): Screen pixels along D1, None keeps every row.
+            cols_pixels (float | None): Screen pixels along D2, None keeps every column.
+
+        Returns:
+            tuple: (rows_axis, cols_axis, matrix) of the selected region.
+        """
+
+        i, j = self.level_for(rows_range, cols_range, rows_pixels, cols_pixels)
+        rows, cols, matrix = self.get(i, j)
+
+        r0, r1 = index_range(rows, *_widen(rows_range, self.CROP_MARGIN))
+        c0, c1 = index_range(cols, *_widen(cols_range, self.CROP_MARGIN))
+        r0, r1 = max(r0 - 1, 0), min(r1 + 1, len(rows))
+        c0, c1 = max(c0 - 1, 0), min(c1 + 1, len(cols))
+
+        key = (i, j, r0, r1, c0, c1)
+        with self.lock:
+            if key not in self.crops:
+                self.crops[key] = (rows[r0:r1], cols[c0:c1], matrix[r0:r1, c0:c1])
+                while len(self.crops) > self.CROP_CACHE:
+                    self.crops.popitem(last=False)
+            self.crops.move_to_end(key)
+            return self.crops[key]
+
+    def level_for(
+        self,
+        rows_range: tuple[float, float],
+        cols_range: tuple[float, float],
+        rows_pixels: float | None,
+        cols_pixels: float | None,
+    ) -> tuple[int, int]:
+        """
+        Returns the level (i, j) that select() uses for a zoom, see select().
+        """
+
+        rows, cols, _ = self.levels[(0, 0)]
+        i = _level_for(rows, rows_range, rows_pixels)
+        j = _level_for(cols, cols_range, cols_pixels)
+        return (min(i, self.depth[0] - 1), min(j, self.depth[1] - 1))
+
+
+def _level_count(size: int, min_size: int) -> int:
+    """Returns the number of levels of an axis, the full one included."""
+
+    count = 1
+    while size > min_size:
+        size = -(-size // 2)
+        count += 1
+    return count
+
+
+def _level_for(axis: np.ndarray, limits: tuple[float, float], pixels) -> int:
+    """Returns the number of halvings keeping at least one point per pixel."""
+
+    if not pixels:
+        return 0
+    start, stop = index_range(axis, *limits)
+    ratio = (stop - start) / pixels
+    return int(np.floor(np.log2(ratio))) if ratio >= 2 else 0
+
+
+def _widen(limits: tuple[float, float], margin: float) -> tuple[float, float]:
+    """Extends a (min, max) range by a fraction of its span on both sides."""
+
+    low, high = limits
+    extra = margin * (high - low)
+    return (low - extra, high + extra)
+
+
+def _halve(
+    axis: np.ndarray, matrix: np.ndarray, dim: int, reduction: str
+) -> tuple[np.ndarray, np.ndarray]:
+    """Merges pairs of neighbouring points along one dimension."""
+
+    starts = np.arange(0, len(axis), 2)
+    counts = np.diff(np.append(starts, len(axis)))
+
+    axis = np.add.reduceat(np.asarray(axis, dtype=float), starts) / counts
+    if reduction == "max":
+        matrix = np.maximum.reduceat(matrix, starts, axis=dim)
+    else:
+        shape = [1, 1]
+        shape[dim] = -1
+        matrix = np.add.reduceat(matrix, starts, axis=dim) / counts.reshape(shape)
+
+    return (axis, matrix)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+
+import logging
+
+import numpy as np
+
+# Use root logger
+logger = logging.getLogger(__name__)
+
+
+class RangeIndex:
+    """
+    RangeIndex answers min, max and sum queries over any D1 x D2 rectangle
+    of a matrix in constant time. It is built once per processed matrix.
+
+    It holds:
+    - A summed-area table, giving exact rectangle sums with four lookups.
+    - 2D min/max sparse tables, giving rectangle extremes with four lookups.
+
+    The sparse tables grow with n * m * log(n) * log(m). When that exceeds
+    MAX_TABLE_CELLS, they are built over blocks of the matrix instead of single
+    cells. Queries then read the blocks fully inside the rectangle from the
+    tables and scan the partial blocks along its edges, so extremes stay
+    exact for a cost of at most a block width of cells around the rectangle.
+
+    Attributes:
+        shape (tuple): Shape of the indexed matrix.
+        block (tuple): Number of matrix rows and columns per sparse table cell.
+    """
+
+    MAX_TABLE_CELLS = 2**22
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        rows_axis: np.ndarray | None = None,
+        cols_axis: np.ndarray | None = None,
+    ):
+        """
+        Builds the summed-area and sparse tables of a matrix.
+
+        Args:
+            matrix (np.ndarray): 2D matrix to index.
+            rows_axis (np.ndarray, optional): Coordinates of the rows (D1 times).
+            cols_axis (np.ndarray, optional): Coordinates of the columns (D2 times).
+        """
+
+        matrix = np.asarray(matrix, dtype=float)
+        self.matrix = matrix
+        self.shape = matrix.shape
+        self.rows_axis = rows_axis
+        self.cols_axis = cols_axis
+
+        # Summed-area table, padded with a leading row and column of zeros
+        n, m = self.shape
+        self.sat = np.zeros((n + 1, m + 1))
+        np.cumsum(np.cumsum(matrix, axis=0), axis=1, out=self.sat[1:, 1:])
+
+        self.block = self._choose_block(n, m)
+        low = _block_reduce(matrix, self.block, np.minimum, np.inf)
+        high = _block_reduce(matrix, self.block, np.maximum, -np.inf)
+
+        self.min_table = _sparse_table(low, np.minimum)
+        self.max_table = _sparse_table(high, np.maximum)
+
+        # Floor of log2 for every possible range length
+        size = max(low.shape) + 1
+        self.log = np.zeros(size, dtype=int)
+        self.log[2:] = np.floor(np.log2(np.arange(2, size))).astype(int)
+
+        logger.debug(f"Range index built for {self.shape} with blocks {self.block}.")
+
+    def _choose_block(self, n: int, m: int) -> tuple[int, int]:
+        """Finds the smallest block size keeping sparse tables within budget."""
+
+        b1, b2 = 1, 1
+        while True:
+            rows, cols = -(-n // b1), -(-m // b2)
+            levels_rows = int(np.log2(rows)) + 1
+            levels_cols = int(np.log2(cols)) + 1
+            if rows * cols * levels_rows * levels_cols <= self.MAX_TABLE_CELLS:
+                return (b1, b2)
+
+            # Coarsen the dimension with the most cells per table
+            if rows >= cols:
+                b1 *= 2
+            else:
+                b2 *= 2
+
+    def query(self, r0: int, r1: int, c0: int, c1: int) -> tuple[float, float, float]:
+        """
+        Returns the min, max and sum of matrix[r0:r1, c0:c1].
+
+        Args:
+            r0, r1 (int): Half-open row range.
+            c0, c1 (int): Half-open column range.
+
+        Returns:
+            tuple: (min, max, sum) of the rectangle.
+
+        Raises:
+            ValueError: If the rectangle is empty.
+        """
+
+        n, m = self.shape
+        r0, r1 = max(r0, 0), min(r1, n)
+        c0, c1 = max(c0, 0), min(c1, m)
+        if r0 >= r1 or c0 >= c1:
+            raise ValueError("Empty range query.")
+
+        total = (
+            self.sat[r1, c1] - self.sat[r0, c1] - self.sat[r1, c0] + self.sat[r0, c0]
+        )
+
+        # Blocks fully inside the rectangle, as half-open block indices
+        b1, b2 = self.block
+        br0, br1 = -(-r0 // b1), r1 // b1
+        bc0, bc1 = -(-c0 // b2), c1 // b2
+        if br0 < br1 and bc0 < bc1:
+            z_min, z_max = self._query_blocks(br0, br1 - 1, bc0, bc1 - 1)
+            ir0, ir1, ic0, ic1 = br0 * b1, br1 * b1, bc0 * b2, bc1 * b2
+        else:
+            z_min, z_max = np.inf, -np.inf
+            ir0 = ir1 = r1
+            ic0 = ic1 = c1
+
+        # Partial blocks: rows above and below, then columns left and right
+        for part in (
+            self.matrix[r0:ir0, c0:c1],
+            self.matrix[ir1:r1, c0:c1],
+            self.matrix[ir0:ir1, c0:ic0],
+            self.matrix[ir0:ir1, ic1:c1],
+        ):
+            if part.size:
+                z_min = min(z_min, part.min())
+                z_max = max(z_max, part.max())
+
+        return (float(z_min), float(z_max), float(total))
+
+    def _query_blocks(self, br0: int, br1: int, bc0: int, bc1: int) -> tuple:
+        """Returns the min and max of an inclusive range of blocks."""
+
+        kr = self.log[br1 - br0 + 1]
+        kc = self.log[bc1 - bc0 + 1]
+        rr = br1 - (1 << kr) + 1
+        cc = bc1 - (1 << kc) + 1
+
+        low = self.min_table[kr][kc]
+        high = self.max_table[kr][kc]
+        z_min = min(low[br0, bc0], low[rr, bc0], low[br0, cc], low[rr, cc])
+        z_max = max(high[br0, bc0], high[rr, bc0], high[br0, cc], high[rr, cc])
+        return (z_min, z_max)
+
+    def query_coordinates(
+        self, rows_range: tuple[float, float], cols_range: tuple[float, float]
+    ) -> tuple[float, float, float]:
+        """
+        Returns the min, max and sum of the points within a coordinate rectangle.
+
+        Args:
+            rows_range (tuple): (min, max) along the rows axis (D1).
+            cols_range (tuple): (min, max) along the columns axis (D2).
+
+        Returns:
+            tuple: (min, max, sum) of the rectangle.
+        """
+
+        r0, r1 = index_range(self.rows_axis, *rows_range)
+        c0, c1 = index_range(self.cols_axis, *cols_range)
+        return self.query(r0, r1, c0, c1)
+
+
+def index_range(axis: np.ndarray, low: float, high: float) -> tuple[int, int]:
+    """
+    Converts a coordinate range to a half-open index range on a sorted axis.
+
+    The range always contains at least one point, the closest one if no point
+    falls inside the limits.
+
+    Args:
+        axis (np.ndarray): Increasing coordinates.
+        low (float): Lower coordinate limit.
+        high (float): Upper coordinate limit.
+
+    Returns:
+        tuple: (start, stop) indices.
+    """
+
+    if low > high:
+        low, high = high, low
+    start = int(np.searchsorted(axis, low, side="left"))
+    stop = int(np.searchsorted(axis, high, side="right"))
+    if stop <= start:
+        start = min(start, len(axis) - 1)
+        stop = start + 1
+    return (start, stop)
+
+
+def nearest_index(axis: np.ndarray, value: float) -> int:
+    """
+    Returns the index of the point of a sorted axis closest to a coordinate.
+
+    Retention times are sampled at a constant rate, so the index is computed
+    from the mean spacing and only corrected by walking to closer neighbours,
+    instead of searching the axis.
+
+    Args:
+        axis (np.ndarray): Increasing, (nearly) evenly spaced coordinates.
+        value (float): Coordinate to look up.
+
+    Returns:
+        int: Index of the closest point.
+    """
+
+    last = len(axis) - 1
+    if last <= 0 or axis[last] == axis[0]:
+        return 0
+
+    step = (axis[last] - axis[0]) / last
+    i = min(max(int(round((value - axis[0]) / step)), 0), last)
+    while i > 0 and abs(axis[i - 1] - value) < abs(axis[i] - value):
+        i -= 1
+    while i < last and abs(axis[i + 1] - value) < abs(axis[i] - value):
+        i += 1
+    return i
+
+
+def _block_reduce(
+    matrix: np.ndarray, block: tuple[int, int], ufunc: np.ufunc, fill: float
+) -> np.ndarray:
+    """Reduces a matrix over blocks, padding the edges with a neutral value."""
+
+    if block == (1, 1):
+        return matrix
+
+    n, m = matrix.shape
+    b1, b2 = block
+    padded = np.full((-(-n // b1) * b1, -(-m // b2) * b2), fill)
+    padded[:n, :m] = matrix
+    blocks = padded.reshape(padded.shape[0] // b1, b1, padded.shape[1] // b2, b2)
+    return ufunc.reduce(ufunc.reduce(blocks, axis=3), axis=1)
+
+
+def _sparse_table(matrix: np.ndarray, ufunc: np.ufunc) -> list[list[np.ndarray]]:
+    """
+    Builds a 2D sparse table.
+
+    table[a][b][i, j] holds the reduction of matrix[i:i + 2**a, j:j + 2**b].
+    """
+
+    n, m = matrix.shape
+    columns = [matrix]
+    b = 1
+    while (1 << b) <= m:
+        previous = columns[-1]
+        half = 1 << (b - 1)
+        columns.append(ufunc(previous[:, :-half], previous[:, half:]))
+        b += 1
+
+    table = [columns]
+    a = 1
+    while (1 << a) <= n:
+        half = 1 << (a - 1)
+        table.append([ufunc(t[:-half], t[half:]) for t in table[-1]])
+        a += 1
+
+    return table
@@ -3,11 +3,14 @@
 import logging
 import threading
 import tkinter as tk
+from pathlib import Path
 from tkinter import ttk
 
-from file_io import ask_file
+from analysis.metrics import compare_folder
+from file_io import ask_file, ask_folder, ask_save_parameters
 from model import DataManager
 from view import MainView
+from visualisation.base_page import exports
 
 # Log to root logger
 logger = logging.getLogger()
@@ -25,8 +28,14 @@ class AppController:
     Attributes:
         model (DataManager): The model handling data loading and processing.
         view (MainView): The view responsible for displaying the GUI.
+        figures (dict): Data and name of every visualization page, by page.
+        recent_pages (list): Drawn visualization pages, least recently shown first.
     """
 
+    IDLE_DELAY = 1000  # ms between background drawings of hidden pages
+    # Cached renders kept by hidden pages before the least recent are released [bytes]
+    HIDDEN_PAGES_BYTES = 256 * 2**20
+
     def __init__(self, root: tk.Tk):
         """
         Initializes the AppController, setting up the Model and View components.
@@ -51,6 +60,16 @@ class AppController:
         self.view.load_btn.config(command=self.on_load_excel_button_click)
         self.view.process_btn.config(command=self.on_process_button_click)
         self.view.export_btn.config(command=self.on_export_button_click)
+        self.view.compare_btn.config(command=self.on_compare_button_click)
+        self.view.export_figures_btn.config(
+            command=self.on_export_figures_button_click
+        )
+        exports.subscribe(self.on_export_progress)
+
+        # Pages are drawn when their tab is shown
+        self.figures = {}
+        self.recent_pages = []
+        self.view.output_note.bind("<<NotebookTabChanged>>", self.on_tab_changed)
 
     def on_load_excel_button_click(self) -> None:
         """
@@ -154,101 +173,256 @@ class AppController:
         except AttributeError:
             logger.error("No data loaded to print matrix.")
     
-    def print_matrix(self) -> None:
-        self.view.matrix_text.delete(1.0, tk.END)
+    def on_compare_button_click(self) -> None:
+        """
+        Handles the Compare Runs button click event to evaluate a folder of runs.
+
+        This method:
+            - Prompts the user for a folder containing one Excel file per method.
+            - Processes every run with the current sampling time and blank settings
+              in a pool of worker processes (see analysis.metrics.compare_folder()).
+            - Writes the comparison table as a CSV file in the same folder.
+
+        Error Handling:
+            - If the folder dialog is canceled or the inputs are invalid, nothing is done.
+            - If the folder has no run or the evaluation fails, an error is logged.
+        """
+
+        folder = ask_folder()
+        if not folder:
+            return
+
         try:
-            for i in self.model.mesh:
-                for j in i:
-                    try:
-                        self.view.matrix_text.insert(tk.END, "{:.3f}\t".format(float(j)))
-                    except ValueError:
-                        self.view.matrix_text.insert(tk.END, f"{j}\t")
-                self.view.matrix_text.insert(tk.END, "\n")
+            sampling_time = float(self.view.st_entry.get())
+        except ValueError:
+            logger.error("Invalid sampling time input.")
+            return
+
+        blank_time = None
+        if self.view.blk_checkbox.instate(["selected"]):
+            try:
+                blank_time = float(self.view.blk_entry.get())
+            except ValueError:
+                logger.error("Invalid blank time input.")
+                return
+
+        def compare():
+            try:
+                table = compare_folder(folder, sampling_time, blank_time=blank_time)
+                if table is None:
+                    return
+                output = Path(folder, "method_comparison.csv")
+                table.to_csv(output)
+                logger.info(f"\n{table.round(3).to_string()}")
+                logger.info(f"Comparison table saved to {output}.")
+            except (OSError, ValueError) as e:
+                logger.error(f"Run comparison failed : {e}")
+
+        run_in_thread(compare)
+
+    def on_export_figures_button_click(self) -> None:
+        """
+        Handles the Export All Figures button click event to save every visualization page.
+
+        This method:
+            - Prompts the user for a file path, size and resolution (see ask_save_parameters()).
+            - Queues one export per page, named after the chosen file with the page name
+              appended (e.g. run_contour.png). The file extension gives the format.
+
+        Threading Details:
+            - Pages are drawn off-screen in parallel worker processes, the progress
+              is shown below the buttons (see on_export_progress()).
+
+        Error Handling:
+            - If no data was processed or the dialog is canceled, nothing is done.
+        """
+
+        if not self.figures:
+            logger.error("No data processed to export figures.")
+            return
+
+        parameters = ask_save_parameters()
+        if parameters == None or parameters["path"] == "":
+            return
+
+        path = Path(parameters["path"])
+        size = tuple(length / 2.54 for length in parameters["size"])
+        for page, (_, name) in self.figures.items():
+            output = path.with_name(f"{path.stem}_{name.lower()}{path.suffix}")
+            exports.submit(
+                page,
+                output,
+                size,
+                parameters["dpi"],
+                rasterize=parameters["rasterize"],
+                simplify=parameters["simplify"],
+            )
+
+    def on_export_progress(self, done: int, total: int) -> None:
+        """Shows the progress of the queued figure exports."""
+
+        self.view.export_progress.configure(maximum=max(total, 1), value=done)
+
+    def show_matrix(self) -> None:
+        """Shows the cuts matrix in its tab, only the visible cells are formatted."""
+        try:
+            self.view.matrix_page.set_data(
+                self.model.value_matrix, self.model.ax_D1, self.model.ax_D2
+            )
         except AttributeError:
             logger.error("No data loaded to print matrix.")
-            self.view.matrix_text.insert(tk.END, "No data loaded.")
 
     def draw_figures(self) -> None:
         """
-        Initiates the drawing of all visualization figures once data processing is complete.
+        Hands the processed data to every visualization page once data processing is complete.
 
         This method:
-            - Calls draw_figure() for each visualization tab in the output notebook:
+            - Sets the data of each visualization tab in the output notebook:
                 - 2D Contour Plot
                 - 3D Contour Plot
                 - Overlay Plot
                 - Raw Data Plot
-            - Each call is executed in a separate thread to maintain UI responsiveness.
+            - Marks every page stale and releases the figures of hidden pages.
+            - Draws the visible page right away. Hidden pages are drawn when
+              selected, or one by one while the app is idle.
 
         Threading Details:
-            - run_in_thread() is used to keep the UI responsive during figure updates.
+            - Called from the processing thread, drawing is scheduled on the Tk thread.
 
         Logging:
             - Logs the completion status of each figure drawing operation.
         """
 
         logger.info("\nDrawing figures...")
-        
-        self.threads = []
-
-        # Draw the 2D Contour Plot
-        self.threads.append(run_in_thread(
-            draw_figure,
-            self.view.contour_page,
-            {
-                "x": self.model.ax_D2,
-                "y": self.model.ax_D1,
-                "z": self.model.value_matrix,
-            },
-            "Contour",
-        ))
-
-        # Draw the 3D Contour Plot
-        self.threads.append(run_in_thread(
-            draw_figure,
-            self.view.xyz_page,
-            {
-                "x": self.model.ax_D2,
-                "y": self.model.ax_D1,
-                "z": self.model.value_matrix,
-            },
-            "3D",
-        ))
-
-        # Draw the Overlay Plot
-        self.threads.append(run_in_thread(
-            draw_figure,
-            self.view.overlay_page,
-            {
-                "x": self.model.ax_D2,
-                "y": self.model.ax_D1,
-                "z": self.model.value_matrix,
-            },
-            "Overlay",
-        ))
-
-        # Draw the Raw Data Plot
-        self.threads.append(run_in_thread(
-            draw_figure,
-            self.view.raw_page,
-            {
-                "x": self.model.data[:, 0][:len(self.model.value_matrix.copy().reshape(-1))],
-                "y": self.model.value_matrix.copy().reshape(-1),
-                "marks": self.model.ax_D1,
-            },
-            "Raw",
-        ))
-
-        run_in_thread(
-            self.check_drawings_done,
-        )
 
-    def check_drawings_done(self):
-            if all(not t.is_alive() for t in self.threads):
-                logger.info("All figures drawn.")
-                # self.print_matrix()
+        self.figures = {
+            self.view.contour_page: (
+                {
+                    "x": self.model.ax_D2,
+                    "y": self.model.ax_D1,
+                    "z": self.model.value_matrix,
+                    "upsample": self.model.upsample_D1,
+                    "projections": self.model.projections,
+                    "index": self.model.range_index,
+                    "pyramid": self.model.pyramid,
+                    "quantiles": self.model.quantiles,
+                },
+                "Contour",
+            ),
+            self.view.xyz_page: (
+                {
+                    "x": self.model.ax_D2,
+                    "y": self.model.ax_D1,
+                    "z": self.model.value_matrix,
+                    "index": self.model.range_index,
+                    "pyramid": self.model.pyramid,
+                    "quantiles": self.model.quantiles,
+                },
+                "3D",
+            ),
+            self.view.overlay_page: (
+                {
+                    "x": self.model.ax_D2,
+                    "y": self.model.ax_D1,
+                    "z": self.model.value_matrix,
+                    "index": self.model.range_index,
+                    "pyramid": self.model.pyramid,
+                },
+                "Overlay",
+            ),
+            self.view.raw_page: (
+                {
+                    "x": self.model.data[:, 0][:len(self.model.value_matrix.copy().reshape(-1))],
+                    "y": self.model.value_matrix.copy().reshape(-1),
+                    "marks": self.model.ax_D1,
+                },
+                "Raw",
+            ),
+        }
+
+        self.view.after(0, self.show_figures)
+
+    def show_figures(self) -> None:
+        """Sets the new data on every page, draws the visible one and queues the others."""
+
+        visible = self.visible_page()
+        self.recent_pages = []
+        for page, (data, _) in self.figures.items():
+            page.data = data
+            if page is visible:
+                page.stale = True
             else:
-                self.view.after(500, self.check_drawings_done)
+                # Previous figures are outdated, free them until the page is drawn
+                page.release()
+
+        self.show_matrix()
+        self.draw_page(visible)
+        self.view.after(self.IDLE_DELAY, self.draw_stale_pages)
+
+    def visible_page(self):
+        """Returns the page of the selected notebook tab."""
+
+        return self.view.nametowidget(self.view.output_note.select())
+
+    def on_tab_changed(self, event=None) -> None:
+        """Draws the newly selected page if its figure is outdated."""
+
+        visible = self.visible_page()
+        self.draw_page(visible)
+        if visible in self.recent_pages:
+            self.recent_pages.remove(visible)
+            self.recent_pages.append(visible)
+        self.release_hidden_pages()
+
+    def release_hidden_pages(self) -> None:
+        """
+        Releases the least recently shown hidden pages while the hidden pages
+        keep more than HIDDEN_PAGES_BYTES of cached renders.
+        """
+
+        visible = self.visible_page()
+        hidden = [page for page in self.recent_pages if page is not visible]
+        size = sum(page.cache_bytes() for page in hidden)
+        for page in hidden:
+            if size <= self.HIDDEN_PAGES_BYTES:
+                break
+            size -= page.cache_bytes()
+            page.release()
+            self.recent_pages.remove(page)
+
+    def draw_page(self, page) -> None:
+        """
+        Draws a page if it is stale.
+
+        Args:
+            page: The visualization page to draw.
+        """
+
+        if page not in self.figures or not page.stale:
+            return
+
+        page.update_figure()
+        if page in self.recent_pages:
+            self.recent_pages.remove(page)
+        self.recent_pages.append(page)
+        logger.debug(f"{self.figures[page][1]} figure complete.")
+
+        if not any(p.stale for p in self.figures):
+            logger.info("All figures drawn.")
+
+    def draw_stale_pages(self) -> None:
+        """
+        Draws the remaining stale pages one at a time while the app is idle,
+        giving the event loop a chance to run in between.
+        """
+
+        stale = [page for page in self.figures if page.stale]
+        if not stale:
+            return
+
+        self.draw_page(stale[0])
+        if len(stale) > 1:
+            self.view.after(self.IDLE_DELAY, self.draw_stale_pages)
 
 def run_in_thread(target, *args):
     """
@@ -264,21 +438,6 @@ def run_in_thread(target, *args):
     return t
 
 
-def draw_figure(page, data: dict, name: str = "") -> None:
-    """
-    General method to update a figure on a given page.
-
-    Args:
-        page: The page object containing the figure to update.
-        data (dict): Dictionary containing the numeric data that will be represented.
-        name (str, optional): Name of the figure to pass to logging. Defaults to empty string.
-    """
-
-    page.data = data
-    page.update_figure()
-    logger.debug(f"{name} figure complete.")
-
-
 def freeze_buttons(widget: tk.Tk | tk.Toplevel, duration: int = 1) -> None:
     """
     Disables all child buttons of the widget temporarily to prevent accidental double-clicks.
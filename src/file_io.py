@@ -4,7 +4,7 @@ import logging
 import sys
 from pathlib import Path
 from tkinter import ttk
-from tkinter.filedialog import askopenfilename, asksaveasfilename
+from tkinter.filedialog import askdirectory, askopenfilename, asksaveasfilename
 from tkinter.simpledialog import Dialog
 
 import pandas as pd
@@ -167,7 +167,7 @@ class SaveFigureDialog(Dialog):
         # windowWidth = 360
         # windowHeight = 390
         windowWidth = 360
-        windowHeight = 200
+        windowHeight = 320
         screenWidth = master.winfo_screenwidth()
         screenHeight = master.winfo_screenheight()
         xCoordinate = int((screenWidth / 2) - (windowWidth / 2))
@@ -191,10 +191,14 @@ class SaveFigureDialog(Dialog):
         path_frame = ttk.Frame(master)
         size_frame = ttk.Frame(master)
         dpi_frame = ttk.Frame(master)
+        self.vector_frame = ttk.Frame(master)
 
         path_frame.grid(column=0, row=0, columnspan=2, sticky="nsew", **paddings)
         size_frame.grid(column=0, row=1, sticky="nsw", **paddings)
         dpi_frame.grid(column=1, row=1, sticky="nse", **paddings)
+        self.vector_frame.grid(
+            column=0, row=2, columnspan=2, sticky="nsew", **paddings
+        )
 
         ttk.Label(path_frame, text="File Path:", anchor="w", width=15).pack(
             side="top", fill="x", expand="no"
@@ -208,25 +212,42 @@ class SaveFigureDialog(Dialog):
         )
         self.path_btn.pack(side="right", fill="none", expand="no", padx=5)
 
-        # ttk.Label(size_frame, text="Width x Height [cm]:", anchor="w").pack(
-        # side="top", fill="x", expand="no"
-        # )
+        # Large PNG/TIFF sizes are rendered in bands, poster sizes are fine
+        ttk.Label(size_frame, text="Width x Height [cm]:", anchor="w").pack(
+            side="top", fill="x", expand="no"
+        )
         self.width_entry = ttk.Entry(size_frame, width=8)
-        # self.width_entry.pack(side="left", fill="x", expand="no")
-        # ttk.Label(size_frame, text="x").pack(side="left", fill="none", expand="no")
+        self.width_entry.pack(side="left", fill="x", expand="no")
+        ttk.Label(size_frame, text="x").pack(side="left", fill="none", expand="no")
         self.height_entry = ttk.Entry(size_frame, width=8)
-        # self.height_entry.pack(side="left", fill="x", expand="no")
+        self.height_entry.pack(side="left", fill="x", expand="no")
 
-        # ttk.Label(dpi_frame, text="DPI:", anchor="w", width=5).pack(
-        # side="top", fill="x", expand="no"
-        # )
+        ttk.Label(dpi_frame, text="DPI:", anchor="w", width=5).pack(
+            side="top", fill="x", expand="no"
+        )
         self.dpi_entry = ttk.Entry(dpi_frame, width=10)
-        # self.dpi_entry.pack(side="left", fill="x", expand="no")
+        self.dpi_entry.pack(side="left", fill="x", expand="no")
 
         self.width_entry.insert(0, "20.0")
         self.height_entry.insert(0, "15.0")
         self.dpi_entry.insert(0, "300")
 
+        # Only used for vector formats (SVG, PDF)
+        self.rasterize_toggle = ttk.Checkbutton(
+            self.vector_frame,
+            text="Rasterize plot data (SVG/PDF)",
+            style="Switch.TCheckbutton",
+        )
+        self.rasterize_toggle.state(["!alternate", "selected"])
+        self.rasterize_toggle.pack(side="top", anchor="w")
+        self.simplify_toggle = ttk.Checkbutton(
+            self.vector_frame,
+            text="Simplify contour paths",
+            style="Switch.TCheckbutton",
+        )
+        self.simplify_toggle.state(["!alternate"])
+        self.simplify_toggle.pack(side="top", anchor="w")
+
         return self.path_btn
 
     def buttonbox(self):
@@ -254,6 +275,8 @@ class SaveFigureDialog(Dialog):
                 "path": self.path_entry.get(),
                 "size": (float(self.width_entry.get()), float(self.height_entry.get())),
                 "dpi": int(self.dpi_entry.get()),
+                "rasterize": self.rasterize_toggle.instate(["selected"]),
+                "simplify": self.simplify_toggle.instate(["selected"]),
             }
             return True
         except:
@@ -278,6 +301,72 @@ class SaveFigureDialog(Dialog):
         self.path = path
 
 
+class SaveAnimationDialog(SaveFigureDialog):
+    """Class to create an animation export dialog, with the frame settings."""
+
+    def __init__(self, parent=None, title: str | None = "Save Animation Parameters"):
+        super().__init__(parent, title=title)
+
+    def body(self, master):
+        focus = super().body(master)
+
+        # Vector options are replaced by the frame settings
+        self.vector_frame.grid_remove()
+        frames_frame = ttk.Frame(master)
+        frames_frame.grid(
+            column=0, row=2, columnspan=2, sticky="nsew", padx=10, pady=5
+        )
+
+        ttk.Label(frames_frame, text="Frame duration [ms]:", anchor="w").grid(
+            column=0, row=0, sticky="w"
+        )
+        self.duration_entry = ttk.Entry(frames_frame, width=8)
+        self.duration_entry.grid(column=1, row=0, padx=5)
+        ttk.Label(frames_frame, text="Modulations per frame:", anchor="w").grid(
+            column=0, row=1, sticky="w"
+        )
+        self.step_entry = ttk.Entry(frames_frame, width=8)
+        self.step_entry.grid(column=1, row=1, padx=5)
+
+        # Screen sized frames, GIF and APNG files grow quickly with the resolution
+        self.width_entry.delete(0, "end")
+        self.width_entry.insert(0, "16.0")
+        self.height_entry.delete(0, "end")
+        self.height_entry.insert(0, "12.0")
+        self.dpi_entry.delete(0, "end")
+        self.dpi_entry.insert(0, "100")
+        self.duration_entry.insert(0, "50")
+        self.step_entry.insert(0, "1")
+
+        return focus
+
+    def validate(self):
+        try:
+            self.result = {
+                "path": self.path_entry.get(),
+                "size": (float(self.width_entry.get()), float(self.height_entry.get())),
+                "dpi": int(self.dpi_entry.get()),
+                "duration": int(self.duration_entry.get()),
+                "step": int(self.step_entry.get()),
+            }
+            return True
+        except:
+            return False
+
+    def ask_file_path(self):
+        path = Path(
+            asksaveasfilename(
+                filetypes=[(".gif", "*.gif"), ("Animated PNG", "*.png")],
+                defaultextension=".gif",
+            )
+        )
+        self.path_entry.state(["!disabled"])
+        self.path_entry.delete(0)
+        self.path_entry.insert(0, path)
+        self.path_entry.state(["disabled"])
+        self.path = path
+
+
 def ask_file() -> dict:
     """get file parameters (path, sheetname, has_headers) from the user"""
     l = OpenExcelDialog()
@@ -288,3 +377,19 @@ def ask_save_parameters() -> dict:
     """get figure save parameters from the user"""
     l = SaveFigureDialog()
     return l.result
+
+
+def ask_animation_parameters() -> dict:
+    """get animation export parameters from the user"""
+    l = SaveAnimationDialog()
+    return l.result
+
+
+def ask_html_path() -> str:
+    """get the path of an interactive HTML export from the user"""
+    return asksaveasfilename(filetypes=[(".html", "*.html")], defaultextension=".html")
+
+
+def ask_folder() -> str:
+    """get the path of a folder of runs from the user"""
+    return askdirectory(title="Select a folder of runs to compare")
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import logging
+import multiprocessing
 import sys
 import tkinter as tk
 from pathlib import Path
@@ -74,4 +75,6 @@ def setup_logging(base_path):
 
 
 if __name__ == "__main__":
+    # Needed for worker processes when bundled as an executable
+    multiprocessing.freeze_support()
     main()
@@ -5,6 +5,12 @@ import logging
 import numpy as np
 import pandas as pd
 
+from analysis.interpolation import upsample_rows
+from analysis.normalization import IntensityQuantiles
+from analysis.projections import Projections
+from analysis.pyramid import MatrixPyramid
+from analysis.range_index import RangeIndex
+
 # Log to root logger
 logger = logging.getLogger()
 
@@ -17,10 +23,15 @@ class DataManager:
     - Constructing time axes for D1 and D2 dimensions.
     - Reshaping data into a 2D matrix for contour visualization.
     - Performing blank subtraction, if required.
+    - Caching D1-upsampled copies of the matrix for smoother contours.
+    - Keeping the D1/D2 projections of the matrix up to date.
+    - Indexing the matrix for constant-time region min/max/sum queries.
+    - Precomputing intensity quantiles for robust contour scaling.
+    - Providing reduced resolution levels of the matrix for drawing.
     """
 
     def __init__(self):
-        pass
+        self.upsample_cache = {}
 
     def load(self, path: str, sheet: str, headers) -> np.ndarray:
         """
@@ -64,16 +75,14 @@ class DataManager:
             logger.error("No data loaded.")
             return
 
-        # Construct time vectors for D1 and D2
-        self.ax_D1, self.ax_D2 = self.construct_axes(sampling_time)
+        self.reshape(sampling_time, blank_time)
 
-        # Reshape the data into a 2D matrix
-        self.value_matrix = self.construct_matrix()
+        # Upsampled copies belong to the previous matrix
+        self.upsample_cache = {}
+        self.range_index = RangeIndex(self.value_matrix, self.ax_D1, self.ax_D2)
+        self.quantiles = IntensityQuantiles(self.value_matrix)
+        self.pyramid = MatrixPyramid(self.value_matrix, self.ax_D1, self.ax_D2)
 
-        # Perform blank subtraction if blank_time is specified
-        if blank_time:
-            self.subtract_blank(blank_time)
-        
         self.mesh = np.concat((self.ax_D1.reshape((-1, 1)), self.value_matrix), axis=1)
         self.mesh = np.concat((np.concat((np.array([" "]), self.ax_D2), axis=0).reshape((1, -1)), self.mesh), axis=0)
 
@@ -83,6 +92,29 @@ class DataManager:
         if callback:
             callback()
 
+    def reshape(self, sampling_time: float, blank_time: float = None) -> None:
+        """
+        Constructs the time axes and the 2D matrix, and optionally subtracts a blank.
+
+        This is the part of process() needed to analyse a run. It skips the
+        indexes and caches used for drawing.
+
+        Args:
+            sampling_time (float): The time interval for D2.
+            blank_time (float, optional): Time value to subtract as blank. Defaults to None.
+        """
+
+        # Construct time vectors for D1 and D2
+        self.ax_D1, self.ax_D2 = self.construct_axes(sampling_time)
+
+        # Reshape the data into a 2D matrix
+        self.value_matrix = self.construct_matrix()
+        self.projections = Projections(self.value_matrix)
+
+        # Perform blank subtraction if blank_time is specified
+        if blank_time:
+            self.subtract_blank(blank_time)
+
     def construct_axes(self, sampling_time: float) -> tuple[np.ndarray, np.ndarray]:
         """
         Constructs time vectors for D1 and D2 dimensions based on loaded data and sampling time.
@@ -172,4 +204,34 @@ Number of points along D2: {len(time_column_D2)}"
         logger.info(f"Substracting data at {self.ax_D1[blank_line]:.4f} min.")
 
         # Subtract the blank line from the entire matrix
-        self.value_matrix = self.value_matrix - self.value_matrix[blank_line, :]
+        blank = self.value_matrix[blank_line, :].copy()
+        self.value_matrix = self.value_matrix - blank
+        self.projections.subtract_row(blank, self.value_matrix)
+
+    def upsample_D1(
+        self, factor: int, method: str = "linear"
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the value matrix resampled onto a finer D1 grid.
+
+        Results are cached by factor and method until the next processing,
+        so switching back and forth between settings does not interpolate again.
+
+        Args:
+            factor (int): Number of D1 points per original modulation.
+            method (str, optional): "linear", "cubic" or "akima". Defaults to "linear".
+
+        Returns:
+            tuple: A tuple containing:
+                - ax_D1 (np.ndarray): The upsampled D1 time vector.
+                - value_matrix (np.ndarray): The upsampled 2D matrix.
+        """
+
+        key = (factor, method)
+        if key not in self.upsample_cache:
+            logger.info(f"Interpolating D1 ({method}, x{factor})...")
+            self.upsample_cache[key] = upsample_rows(
+                self.ax_D1, self.value_matrix, factor, method
+            )
+
+        return self.upsample_cache[key]
@@ -9,6 +9,7 @@ from tkinter import ttk
 from PIL import Image, ImageTk
 
 from visualisation.contour_page import ContourPage
+from visualisation.matrix_view import MatrixView
 from visualisation.overlay_page import OverlayPage
 from visualisation.raw_page import RawPage
 from visualisation.xyz_page import XYZPage
@@ -205,6 +206,8 @@ class MainView(tk.Toplevel):
         This method initializes and places the following components:
             - Load Button: For loading Excel files.
             - Calculation Frame: For calculation settings and input fields.
+            - Export and Compare Buttons: For exporting the cuts matrix and comparing runs.
+            - Export Figures Button and Progress Bar: For saving every visualization page.
             - Output Notebook: For displaying visualization tabs.
             - Console Frame: For displaying log output.
             - Vertical Separator: For visual separation of input and output areas.
@@ -217,6 +220,9 @@ class MainView(tk.Toplevel):
         Attributes:
             load_btn (ttk.Button): Button for loading Excel files.
             calc_frame (ttk.Labelframe): Frame for calculation inputs and controls.
+            compare_btn (ttk.Button): Button for comparing the separation metrics of several runs.
+            export_figures_btn (ttk.Button): Button for saving the figures of every tab.
+            export_progress (ttk.Progressbar): Progress of the queued figure exports.
             output_note (ttk.Notebook): Notebook container for visualization tabs.
             console_frame (ttk.Labelframe): Frame for displaying log output.
         """
@@ -224,6 +230,9 @@ class MainView(tk.Toplevel):
         # Initialize main navigation components
         self.load_btn = ttk.Button(self, text="Load Excel File")
         self.export_btn = ttk.Button(self, text="Export Cuts Matrix")
+        self.compare_btn = ttk.Button(self, text="Compare Runs...")
+        self.export_figures_btn = ttk.Button(self, text="Export All Figures...")
+        self.export_progress = ttk.Progressbar(self, mode="determinate")
 
         self.calc_frame = ttk.Labelframe(self, text="Calculation Conditions")
         self.output_note = ttk.Notebook(self)
@@ -255,19 +264,43 @@ class MainView(tk.Toplevel):
                     "sticky": "nsew",
                 },
             },
+            {
+                "widget": self.compare_btn,
+                "grid": {
+                    "row": 3,
+                    "column": 0,
+                    "sticky": "nsew",
+                },
+            },
+            {
+                "widget": self.export_figures_btn,
+                "grid": {
+                    "row": 4,
+                    "column": 0,
+                    "sticky": "nsew",
+                },
+            },
+            {
+                "widget": self.export_progress,
+                "grid": {
+                    "row": 5,
+                    "column": 0,
+                    "sticky": "ew",
+                },
+            },
             {
                 "widget": self.output_note,
                 "grid": {
                     "row": 0,
                     "column": 2,
-                    "rowspan": 4,
+                    "rowspan": 7,
                     "sticky": "nsew",
                 },
             },
             {
                 "widget": self.console_frame,
                 "grid": {
-                    "row": 3,
+                    "row": 6,
                     "column": 0,
                     "sticky": "nsew",
                 },
@@ -277,7 +310,7 @@ class MainView(tk.Toplevel):
                 "grid": {
                     "row": 0,
                     "column": 1,
-                    "rowspan": 3,
+                    "rowspan": 6,
                     "sticky": "ns",
                 },
             },
@@ -287,7 +320,7 @@ class MainView(tk.Toplevel):
         self.place_widgets(layout_config)
 
         # Configure row and column weights for responsive resizing
-        row_weights = [0, 0, 0, 1]
+        row_weights = [0, 0, 0, 0, 0, 0, 1]
         column_weights = [0, 0, 1]
 
         for n, rw in enumerate(row_weights):
@@ -488,6 +521,7 @@ This blank chromatogram will then be subtracted from all other 2D chromatograms
             - 3D Contour Plot (XYZPage)
             - Overlay Plot (OverlayPage)
             - Raw Data Plot (RawPage)
+            - Cuts Matrix table (MatrixView)
 
         Details:
             - Each page is packed with `expand=True` and `fill="both"` to ensure responsive resizing.
@@ -499,6 +533,7 @@ This blank chromatogram will then be subtracted from all other 2D chromatograms
             xyz_page (XYZPage): Displays 3D contour plots.
             overlay_page (OverlayPage): Displays overlay plots.
             raw_page (RawPage): Displays raw chromatogram data.
+            matrix_page (MatrixView): Displays the cuts matrix values.
         """
 
         # Initialize visualization pages
@@ -506,7 +541,7 @@ This blank chromatogram will then be subtracted from all other 2D chromatograms
         self.xyz_page = XYZPage(self.output_note)
         self.overlay_page = OverlayPage(self.output_note)
         self.raw_page = RawPage(self.output_note)
-        # self.matrix_page = ttk.Frame(self.output_note)
+        self.matrix_page = MatrixView(self.output_note)
 
         # Layout configuration for each page
         layout_config = [
@@ -538,13 +573,13 @@ This blank chromatogram will then be subtracted from all other 2D chromatograms
                     "fill": "both",
                 },
             },
-            # {
-            #     "widget": self.matrix_page,
-            #     "pack": {
-            #         "expand": True,
-            #         "fill": "both",
-            #     },
-            # },
+            {
+                "widget": self.matrix_page,
+                "pack": {
+                    "expand": True,
+                    "fill": "both",
+                },
+            },
         ]
 
         # Place the widgets using the place_widgets() utility method
@@ -555,20 +590,7 @@ This blank chromatogram will then be subtracted from all other 2D chromatograms
         self.output_note.add(self.xyz_page, text="3D Contour")
         self.output_note.add(self.overlay_page, text="Overlay")
         self.output_note.add(self.raw_page, text="Raw")
-
-        # self.output_note.add(self.matrix_page, text="Cuts Matrix")
-
-        # self.matrix_text = tk.Text(self.matrix_page, wrap="none")
-        # self.matrix_text.configure(font="Calibri")
-        # self.matrix_text.grid(row=0, column=0, sticky="nsew")
-        # xsb = tk.Scrollbar(self.matrix_page, orient="horizontal", command=self.matrix_text.xview)
-        # self.matrix_text.configure(xscrollcommand=xsb.set)
-        # xsb.grid(row=2, column=0, columnspan=100, sticky="ew")
-        # ysb = tk.Scrollbar(self.matrix_page, orient="vertical", command=self.matrix_text.yview)
-        # self.matrix_text.configure(yscrollcommand=ysb.set)
-        # ysb.grid(row=0, column=2, rowspan=100, sticky="ns")
-        # self.matrix_page.rowconfigure(0, weight=1)
-        # self.matrix_page.columnconfigure(0, weight=1)
+        self.output_note.add(self.matrix_page, text="Cuts Matrix")
 
     def on_exit(self, event=None) -> None:
         """
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+
+import io
+import logging
+import struct
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+from PIL import GifImagePlugin, Image
+
+from visualisation.tiled_export import PngWriter
+
+# Use root logger
+logger = logging.getLogger(__name__)
+
+ANIMATION_FORMATS = [".gif", ".png", ".apng"]
+# Frames rendered by a worker per request
+CHUNK_FRAMES = 25
+# Requests in flight per worker, bounding the frames held in memory
+CHUNKS_PER_WORKER = 2
+
+
+def animation_format(path: str) -> str:
+    """Returns "gif" or "png" (APNG) from the extension of an animation file."""
+
+    suffix = Path(path).suffix.lower()
+    if suffix not in ANIMATION_FORMATS:
+        raise ValueError(f"Animation export does not support '{suffix}' files.")
+    return "gif" if suffix == ".gif" else "png"
+
+
+def save_animation(
+    page, path: str, frames: list[int], duration: int, renderer=None
+) -> float:
+    """
+    Saves the modulation playback of a page as an animated GIF or PNG.
+
+    The frames are split in chunks of CHUNK_FRAMES rendered and encoded by the
+    render workers (see OffscreenRenderer.animate()), then written in order as
+    they arrive. At most CHUNKS_PER_WORKER chunks per worker are in flight, so
+    memory does not grow with the number of frames. Without workers, chunks
+    are rendered in the calling thread.
+
+    Args:
+        page (ContourPage): Off-screen page at the export size, see export_clone().
+        path (str): Output file, ".gif", ".png" or ".apng".
+        frames (list): Modulation (matrix row) of every frame.
+        duration (int): Frame duration [ms].
+        renderer (OffscreenRenderer, optional): Worker pool. Defaults to None.
+
+    Returns:
+        float: Export time [s].
+    """
+
+    start = time.perf_counter()
+    fmt = animation_format(path)
+    chunks = [frames[i : i + CHUNK_FRAMES] for i in range(0, len(frames), CHUNK_FRAMES)]
+
+    writer = None
+    try:
+        for palette, encoded in _render_chunks(page, chunks, fmt, duration, renderer):
+            if writer is None:
+                # The first frame of a chunk always covers the whole figure
+                (_, _, width, height), _ = encoded[0]
+                if fmt == "gif":
+                    writer = GifWriter(path, width, height, palette)
+                else:
+                    writer = ApngWriter(path, width, height, len(frames), duration)
+            for box, data in encoded:
+                writer.write(box, data)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    logger.debug(f"Animation of {len(frames)} frames saved in {len(chunks)} chunks.")
+    return time.perf_counter() - start
+
+
+def _render_chunks(page, chunks: list, fmt: str, duration: int, renderer):
+    """Yields the encoded chunks in order, from the workers if available."""
+
+    if renderer is not None:
+        token = (id(page), time.time())
+        in_flight = CHUNKS_PER_WORKER * renderer.max_workers
+        pending = deque()
+        try:
+            for chunk in chunks[:in_flight]:
+                pending.append(renderer.animate(page, chunk, fmt, duration, token))
+        except Exception as e:
+            logger.warning(f"Offscreen animation unavailable : {e}")
+            for future in pending:
+                future.cancel()
+        else:
+            queued = len(pending)
+            while pending:
+                yield pending.popleft().result()
+                if queued < len(chunks):
+                    pending.append(
+                        renderer.animate(page, chunks[queued], fmt, duration, token)
+                    )
+                    queued += 1
+            return
+
+    page.draw_animation()
+    for chunk in chunks:
+        yield encode_frames(page, chunk, fmt, duration)
+
+
+def encode_frames(
+    page, frames: list[int], fmt: str, duration: int
+) -> tuple[bytes | None, list]:
+    """
+    Renders and encodes frames of a page prepared with draw_animation().
+
+    Every frame restores the saved canvas and only draws the animated artists
+    returned by page.animate() over it, the figure itself is never redrawn.
+    Frames after the first one only store the box that changed since the
+    previous frame.
+
+    Args:
+        page (ContourPage): The page, prepared with draw_animation().
+        frames (list): Modulation of every frame.
+        fmt (str): "gif" or "png".
+        duration (int): Frame duration [ms].
+
+    Returns:
+        tuple: (GIF palette or None, list of ((x, y, width, height), data)),
+            where data is a GIF image block or a PNG zlib stream.
+    """
+
+    canvas = page.figure.canvas
+    palette = gif_palette(page) if fmt == "gif" else None
+
+    encoded = []
+    previous = None
+    for index in frames:
+        canvas.restore_region(page.background)
+        for artist in page.animate(index):
+            page.figure.draw_artist(artist)
+        rgba = np.asarray(canvas.buffer_rgba())
+
+        box = changed_box(previous, rgba)
+        x, y, width, height = box
+        crop = rgba[y : y + height, x : x + width]
+        if fmt == "gif":
+            image = Image.fromarray(crop[..., :3]).quantize(
+                palette=palette, dither=Image.Dither.NONE
+            )
+            data = b"".join(
+                GifImagePlugin.getdata(image, offset=(x, y), duration=duration)
+            )
+        else:
+            data = png_stream(crop)
+        encoded.append((box, data))
+        previous = rgba.copy()
+
+    return (palette.getpalette()[:768] if palette else None, encoded)
+
+
+def changed_box(previous: np.ndarray | None, current: np.ndarray) -> tuple:
+    """
+    Returns the (x, y, width, height) box of the pixels that differ between frames.
+
+    The whole frame is returned without a previous frame, and a single pixel
+    if nothing changed (animated formats cannot store empty frames).
+    """
+
+    height, width = current.shape[:2]
+    if previous is None:
+        return (0, 0, width, height)
+
+    changed = np.any(previous != current, axis=2)
+    rows = np.flatnonzero(changed.any(axis=1))
+    cols = np.flatnonzero(changed.any(axis=0))
+    if len(rows) == 0:
+        return (0, 0, 1, 1)
+    return (
+        int(cols[0]),
+        int(rows[0]),
+        int(cols[-1] - cols[0] + 1),
+        int(rows[-1] - rows[0] + 1),
+    )
+
+
+def gif_palette(page) -> Image.Image:
+    """
+    Returns the 256 colors palette shared by all GIF frames of a page.
+
+    It is computed from the saved canvas and the first data row frame, so
+    every worker derives the same palette on its own.
+    """
+
+    canvas = page.figure.canvas
+    canvas.restore_region(page.background)
+    background = np.array(canvas.buffer_rgba())[..., :3]
+    for artist in page.animate(0):
+        page.figure.draw_artist(artist)
+    frame = np.asarray(canvas.buffer_rgba())[..., :3]
+
+    sample = Image.fromarray(np.concatenate((background, frame)))
+    return sample.quantize(256, method=Image.Quantize.FASTOCTREE)
+
+
+def png_stream(rgba: np.ndarray) -> bytes:
+    """
+    Encodes RGBA pixels with Pillow and returns the zlib stream of the PNG data.
+
+    Pillow picks the row filters, the stream is then split in animation chunks.
+    """
+
+    buffer = io.BytesIO()
+    Image.fromarray(rgba).save(buffer, format="PNG", compress_level=6)
+    png = buffer.getvalue()
+
+    data = []
+    position = 8
+    while position < len(png):
+        (length,) = struct.unpack(">I", png[position : position + 4])
+        kind = png[position + 4 : position + 8]
+        if kind == b"IDAT":
+            data.append(png[position + 8 : position + 8 + length])
+        position += 12 + length
+    return b"".join(data)
+
+
+class GifWriter:
+    """GifWriter writes an endlessly looping GIF file frame by frame."""
+
+    def __init__(self, path: str, width: int, height: int, palette: bytes):
+        image = Image.new("P", (width, height))
+        image.putpalette(palette)
+        header, _ = GifImagePlugin.getheader(image, info={"loop": 0})
+
+        self.file = open(path, "wb")
+        self.file.write(b"".join(header))
+
+    def write(self, box: tuple, data: bytes) -> None:
+        """Appends an image block from getdata(), the box is already encoded."""
+        self.file.write(data)
+
+    def close(self) -> None:
+        self.file.write(b";")
+        self.file.close()
+
+
+class ApngWriter(PngWriter):
+    """
+    ApngWriter writes an endlessly looping animated PNG file frame by frame.
+
+    The frame count is written first (acTL chunk), then every frame is a
+    control chunk and its data, IDAT for the first frame so that viewers
+    without APNG support show it as a still image.
+    """
+
+    def __init__(self, path: str, width: int, height: int, frames: int, duration: int):
+        super().__init__(path, width, height, rows=0)
+        self.duration = duration
+        self.sequence = 0
+        self.chunk(b"acTL", struct.pack(">II", frames, 0))
+
+    def write(self, box: tuple, data: bytes) -> None:
+        """Appends a frame replacing a (x, y, width, height) box of the previous one."""
+
+        x, y, width, height = box
+        first = self.sequence == 0
+        # Duration in ms, no disposal, the box replaces the previous pixels
+        control = struct.pack(
+            ">IIIIIHHBB", self.sequence, width, height, x, y, self.duration, 1000, 0, 0
+        )
+        self.chunk(b"fcTL", control)
+        self.sequence += 1
+
+        if first:
+            self.chunk(b"IDAT", data)
+        else:
+            self.chunk(b"fdAT", struct.pack(">I", self.sequence) + data)
+            self.sequence += 1
+
+    def close(self) -> None:
+        self.chunk(b"IEND", b"")
+        self.file.close()
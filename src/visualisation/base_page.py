@@ -2,15 +2,29 @@
 
 import logging
 import sys
+import threading
+import time
 import tkinter as tk
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
 from tkinter import ttk
 
+import numpy as np
+from matplotlib.backend_bases import DrawEvent, MouseEvent
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 from PIL import Image, ImageTk
 
+from analysis.normalization import IntensityQuantiles
+from analysis.range_index import index_range
 from file_io import ask_save_parameters
+from visualisation.export_queue import ExportQueue
+from visualisation.offscreen import OffscreenRenderer
+from visualisation.scheduler import RedrawScheduler
+from visualisation.tiled_export import TILED_FORMATS, save_tiled
+from visualisation.view_state import ViewState
 
 # Handle case where app is running as executable
 if getattr(sys, "frozen", False):
@@ -22,6 +36,12 @@ else:
 logger = logging.getLogger(__name__)
 help_img = Image.open(f"{base_path}\\utils\\help.png").resize((16, 16))
 
+# Shared by all pages, worker processes are started on first use
+renderer = OffscreenRenderer()
+exports = ExportQueue(renderer)
+# Zoom ranges linked between the pages
+view_state = ViewState()
+
 
 class ToolTip(object):
 
@@ -87,18 +107,85 @@ class BaseVisualizationPage(ttk.Frame, ABC):
         param_frame (ttk.Frame): Frame for parameter inputs and controls.
         data (dict): Dictionary of input data that will be drawn on the figure.
         parameters (dict): Dictionary of parameter variables.
+        render_plan (dict): Decimation stride and level cap of the render in progress.
+        artists (dict): Artists of the current figure that can be updated in place.
+        stale (bool): True if the figure does not show the current data yet.
+        selector (RectangleSelector | SpanSelector | None): Mouse range selection tool.
     """
 
     DEFAULT_PARAMETERS = {}
+    # (min, max) parameters of the dimensions linked between pages
+    LINKED_AXES = {}
+    # "Link views" switch, shared by all pages
+    link_views = None
+
+    # Progressive rendering settings
+    RENDER_BUDGET = 1.0  # seconds allowed for a full render
+    PREVIEW_CELLS = 250_000  # larger data gets a coarse preview first
+    PREVIEW_LEVELS = 10
+    MIN_LEVELS = 20  # levels are not reduced below this to fit the budget
+    MIN_POINTS = 50  # decimation keeps at least this many points per axis
+    DIMENSIONS = 2  # axes decimated by the render plan stride
+
+    # Quiet periods before settings edits and window resizes are redrawn [ms]
+    EDIT_DELAY = 400
+    RESIZE_DELAY = 150
+
+    # Full renders of large data are drawn in worker processes
+    OFFSCREEN = True
+    # Memory held by the rendered bitmaps of earlier views, per page [bytes]
+    RENDER_CACHE_BYTES = 128 * 2**20
+    # Larger PNG/TIFF exports are rendered in bands [pixels]
+    TILED_EXPORT_PIXELS = 32_000_000
 
     def __init__(self, master=None):
         super().__init__(master, padding=(10, 0))
 
-        self.data = {}
-        self.parameters = {}
+        self.init_state()
+        self.stale = False
         self.help_img_tk = ImageTk.PhotoImage(help_img)
+        self.auto_apply = tk.BooleanVar(self, value=True)
+        self.redraw = RedrawScheduler(self, self.update_figure, self.EDIT_DELAY)
+        self.resize_redraw = RedrawScheduler(self, self.apply_resize, self.RESIZE_DELAY)
+        self.resize_event = None
+        self.selector = None
+        if BaseVisualizationPage.link_views is None:
+            BaseVisualizationPage.link_views = tk.BooleanVar(self, value=True)
+        view_state.subscribe(self.on_view_changed)
 
         self.body()
+        self.canvas.mpl_connect("button_press_event", self.on_canvas_press)
+
+    def init_state(self) -> None:
+        """Initializes the drawing state, which does not depend on Tk."""
+        self.data = {}
+        self.parameters = self.DEFAULT_PARAMETERS.copy()
+        self.render_plan = {"stride": 1, "levels": None}
+        self.render_cost = None
+        self.render_generation = 0
+        self.drawn_parameters = None
+        self.drawn_data = None
+        self.artists = {}
+        self.region = None
+        self.offscreen_shown = False
+        self.offscreen_pending = None
+        self.render_cache = OrderedDict()
+        self.render_key = None
+        self.cache_data = None
+
+    @classmethod
+    def offscreen(cls) -> "BaseVisualizationPage":
+        """
+        Creates a page without any Tk widget, drawing on a plain Agg figure.
+
+        Used by the render workers: draw_axes() only reads data, parameters and
+        render_plan, and stores the zoom region statistics in region.
+        """
+        page = cls.__new__(cls)
+        page.init_state()
+        page.figure = Figure(figsize=(6, 4), dpi=100)
+        page.canvas = FigureCanvasAgg(page.figure)
+        return page
 
     def body(self) -> None:
         self.figure = Figure(figsize=(6, 4), dpi=100)
@@ -107,20 +194,39 @@ class BaseVisualizationPage(ttk.Frame, ABC):
         buttons_frame = ttk.Frame(self)
 
         self.canvas.get_tk_widget().pack(side="top", fill="both", expand=True)
+        # Replaces the canvas binding, which re-renders at every intermediate size
+        self.canvas.get_tk_widget().bind("<Configure>", self.on_resize)
         self.param_frame.pack(side="top", fill="both", expand=False, ipady=5)
         buttons_frame.pack(side="top", fill="x", expand=False, ipady=10)
 
-        ttk.Button(buttons_frame, text="Apply", command=self.update_figure).pack(
+        ttk.Button(buttons_frame, text="Apply", command=self.redraw.flush).pack(
             side="left", fill="none", expand=False
         )
         ttk.Button(buttons_frame, text="Reset", command=self.reset_parameters).pack(
             side="left", fill="none", expand=False, padx=(10, 5)
         )
+        ttk.Checkbutton(
+            buttons_frame,
+            text="Auto-apply",
+            style="Switch.TCheckbutton",
+            variable=self.auto_apply,
+        ).pack(side="left", fill="none", expand=False, padx=(5, 5))
+        link_toggle = ttk.Checkbutton(
+            buttons_frame,
+            text="Link views",
+            style="Switch.TCheckbutton",
+            variable=self.link_views,
+        )
+        link_toggle.pack(side="left", fill="none", expand=False, padx=(5, 5))
+        create_tooltip(
+            link_toggle,
+            "Applies D1 and D2 ranges set on one page to the other pages. Ranges can also be selected by dragging the mouse over the plot.",
+        )
         help_apply = ttk.Label(buttons_frame, image=self.help_img_tk)
         help_apply.pack(side="left")
         create_tooltip(
             help_apply,
-            "The 'Apply' button must be clicked each time the settings are changed to redraw the figure using the new settings. The 'Reset' button allows you to restore default figure settings.",
+            "The 'Apply' button redraws the figure using the new settings. With 'Auto-apply' enabled, the figure is redrawn automatically shortly after you stop typing, and Enter applies immediately. The 'Reset' button allows you to restore default figure settings.",
         )
 
         ttk.Button(buttons_frame, text="Save Figure", command=self.save_figure).pack(
@@ -133,6 +239,11 @@ class BaseVisualizationPage(ttk.Frame, ABC):
             "This button allows you to export the currently displayed figure as a file. When clicked, a popup will appear to let you choose export parameters such as dimensions and resolution.",
         )
 
+        self.readout = ttk.Label(
+            buttons_frame, text="", foreground="gray", font=("Segoe UI", 8)
+        )
+        self.readout.pack(side="left", padx=(20, 5))
+
         ttk.Label(
             buttons_frame,
             text="developed by Mathias Buff at University of Geneva",
@@ -142,7 +253,10 @@ class BaseVisualizationPage(ttk.Frame, ABC):
 
     @abstractmethod
     def create_parameters(self) -> None:
-        pass
+        """Binds the settings entries created by the page for auto-apply."""
+        for entry in self.entry_widgets():
+            entry.bind("<KeyRelease>", self.on_parameter_edit, add="+")
+            entry.bind("<Return>", lambda event: self.redraw.flush(), add="+")
 
     @abstractmethod
     def draw_axes(self) -> None:
@@ -152,7 +266,7 @@ class BaseVisualizationPage(ttk.Frame, ABC):
     def read_parameters(self) -> None:
         pass
 
-    def reset_parameters(self) -> None:
+    def entry_widgets(self) -> list:
         entries = []
 
         # Recursively find all entry fields within the widget
@@ -164,9 +278,13 @@ class BaseVisualizationPage(ttk.Frame, ABC):
                     find_entries(child)
 
         find_entries(self)
+        return entries
+
+    def reset_parameters(self) -> None:
+        self.redraw.cancel()
 
         # Delete all text in entry fields
-        for entry in entries:
+        for entry in self.entry_widgets():
             entry.delete(0, "end")
 
         # Reset parameters to an empty dict
@@ -175,34 +293,839 @@ class BaseVisualizationPage(ttk.Frame, ABC):
 
     def update_figure(self) -> None:
         """
-        Clears the figure, redraws the axes, and refreshes the canvas.
+        Redraws the figure, reusing the existing artists when possible.
+
+        Changes that only affect limits or colors are applied in place through
+        update_artists(). Otherwise, the figure is rebuilt progressively: large
+        data is first drawn as a coarse preview (decimated, few levels), the full
+        render is prepared in a background thread and swapped in when ready,
+        unless a newer update was requested in the meantime.
         """
+        self.stale = False
         self.read_parameters()
+        if self.LINKED_AXES and self.link_views.get():
+            view_state.publish(self, self.linked_ranges())
+
+        changed = self.changed_parameters()
+        if changed is not None and self.artists and self.update_artists(changed):
+            self.drawn_parameters = self.parameters.copy()
+            self.offscreen_shown = False
+            self.canvas.draw_idle()
+            return
+
+        self.drawn_parameters = self.parameters.copy()
+        self.drawn_data = self.data
+        self.render_generation += 1
+        generation = self.render_generation
+
+        # Earlier views are swapped back in from their bitmap
+        if self.cache_data is not self.data:
+            self.render_cache.clear()
+            self.cache_data = self.data
+        self.render_key = self.cache_key()
+        if self.show_cached():
+            return
+
+        plan = self.plan_render()
+        cells, _ = self.render_work()
+        if cells <= self.PREVIEW_CELLS or self.is_prepared(plan):
+            return self.render(plan)
+
+        self.render(self.preview_plan())
+
+        if self.OFFSCREEN:
+            try:
+                future = renderer.submit(self, plan)
+            except Exception as e:
+                logger.warning(f"Offscreen rendering unavailable : {e}")
+            else:
+                self.offscreen_pending = generation
+                future.add_done_callback(
+                    lambda future: self.after(
+                        0, self.show_offscreen, future, plan, generation
+                    )
+                )
+                return
+
+        # The thread fills unset limits on a copy, never on the page itself
+        snapshot = self.snapshot()
+
+        def refine():
+            start = time.perf_counter()
+            snapshot.prepare(plan)
+            elapsed = time.perf_counter() - start
+
+            def swap():
+                if generation == self.render_generation:
+                    self.render(plan, elapsed)
+
+            self.after(0, swap)
+
+        threading.Thread(target=refine, daemon=True).start()
+
+    def show_offscreen(self, future, plan: dict, generation: int) -> None:
+        """
+        Displays a figure rendered by a worker process, unless a newer update
+        was requested in the meantime. Falls back to a local render on failure.
+
+        The RGBA buffer is shown as a figure image, so the canvas keeps showing
+        it on later redraws. The real figure is then built behind it, see
+        build_figure().
+        """
+        if generation != self.render_generation:
+            return
+        self.offscreen_pending = None
+
+        try:
+            rgba, region, elapsed = future.result()
+        except Exception as e:
+            logger.warning(f"Offscreen rendering failed : {e}")
+            return self.render(plan)
+
+        if rgba.shape[:2][::-1] != self.canvas.get_width_height(physical=True):
+            # Resized while rendering, render again at the new size
+            self.drawn_parameters = None
+            return self.update_figure()
+
+        self.render_plan = plan
+        self.show_bitmap(rgba, region)
+        self.cache_render(rgba, plan)
+
+        self.render_cost = elapsed / self.plan_units(plan)
+
+    def show_bitmap(self, rgba: np.ndarray, region: tuple | None) -> None:
+        """
+        Displays a rendered RGBA buffer in place of the figure, then builds the
+        real figure of the current render plan behind it.
+
+        Args:
+            rgba (np.ndarray): Buffer of the canvas size, as (height, width, 4).
+            region (tuple | None): Zoom region statistics of the render.
+        """
+        self.figure.clf()
+        self.figure.figimage(rgba, origin="upper")
+        self.canvas.draw()
+        self.artists = {}
+        self.selector = None
+        self.offscreen_shown = True
+        self.region = region
+        if region is not None:
+            self.update_readout(region)
+        self.build_figure()
+
+    def build_figure(self) -> None:
+        """
+        Builds the real figure behind a displayed bitmap, without drawing it.
+
+        The heavy part runs in prepare() on a snapshot in a background thread,
+        as for progressive renders, then ensure_figure() creates the artists on
+        the Tk thread. Later limit and color changes then go through
+        update_artists(), and the cursor and selection tools get real axes.
+        """
+        generation = self.render_generation
+        plan = self.render_plan
+        snapshot = self.snapshot()
+
+        def prepare():
+            snapshot.prepare(plan)
+
+            def adopt():
+                if generation == self.render_generation:
+                    self.ensure_figure()
+
+            self.after(0, adopt)
+
+        threading.Thread(target=prepare, daemon=True).start()
+
+    def cache_key(self) -> tuple | None:
+        """
+        Returns the render cache key of the current data, parameters and canvas size.
+
+        Parameters are keyed as read from the settings, before unset limits are
+        filled by draw_axes(). None is returned if a parameter is not hashable.
+        """
+        width, height = self.canvas.get_width_height(physical=True)
+        key = (
+            id(self.data),
+            width,
+            height,
+            self.figure.dpi,
+            tuple(sorted(self.parameters.items())),
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def cache_render(self, rgba: np.ndarray, plan: dict) -> None:
+        """
+        Keeps the bitmap of a full render, dropping the least recently used
+        ones beyond RENDER_CACHE_BYTES.
+
+        Args:
+            rgba (np.ndarray): Rendered canvas buffer.
+            plan (dict): Render plan of the bitmap.
+        """
+        if self.render_key is None:
+            return
+
+        self.render_cache[self.render_key] = (
+            rgba,
+            self.region,
+            plan,
+            self.parameters.copy(),
+        )
+        self.render_cache.move_to_end(self.render_key)
+
+        size = self.cache_bytes()
+        while size > self.RENDER_CACHE_BYTES and len(self.render_cache) > 1:
+            _, (old, _, _, _) = self.render_cache.popitem(last=False)
+            size -= old.nbytes
+
+    def cache_bytes(self) -> int:
+        """Returns the memory held by the cached render bitmaps [bytes]."""
+        return sum(entry[0].nbytes for entry in self.render_cache.values())
+
+    def show_cached(self) -> bool:
+        """
+        Displays the cached bitmap of the current view, if any.
+
+        The parameters filled while drawing (e.g. unset limits) are restored
+        with it, so ensure_figure() can rebuild the same figure when needed.
+
+        Returns:
+            bool: True if the view was found in the cache.
+        """
+        entry = self.render_cache.get(self.render_key)
+        if entry is None:
+            return False
+
+        rgba, region, plan, parameters = entry
+        self.render_cache.move_to_end(self.render_key)
+        self.render_plan = plan
+        self.parameters = parameters.copy()
+        self.show_bitmap(rgba, region)
+        logger.debug("Figure restored from the render cache.")
+
+        return True
+
+    def ensure_figure(self) -> None:
+        """
+        Builds the real figure if the canvas shows a bitmap without it.
+
+        The canvas is not drawn again: its buffer already holds the same image,
+        so draw listeners (blitting backgrounds) are notified as after a draw.
+        """
+        if not self.offscreen_shown or self.artists:
+            return
+
+        self.figure.clf()
+        self.draw_axes()
+        self.attach_selector()
+        self.canvas.callbacks.process(
+            "draw_event", DrawEvent("draw_event", self.canvas, self.canvas.renderer)
+        )
+
+    def offscreen_data(self) -> dict:
+        """
+        Returns the data sent to the render workers.
+
+        Callables, the range index and the pyramid stay in the UI process:
+        region_stats() answers the zoom statistics from the matrix instead, and
+        the arrays selected by view_data() are sent as "view_*" entries.
+        """
+        data = {
+            key: value
+            for key, value in self.data.items()
+            if not callable(value) and key not in ("index", "pyramid")
+        }
+        if "z" in self.data:
+            y, x, z = self.view_data()
+            if z is not self.data["z"]:
+                data.update(view_y=y, view_x=x, view_z=z)
+        return data
+
+    def release(self) -> None:
+        """
+        Clears the figure and frees the artists and cached renders of a hidden
+        page.
+
+        Pending redraws are dropped and the page is marked stale, so it is
+        redrawn the next time it is shown.
+        """
+        self.redraw.cancel()
+        self.render_generation += 1
+        self.figure.clf()
+        self.artists = {}
+        self.selector = None
+        self.offscreen_shown = False
+        self.drawn_parameters = None
+        self.drawn_data = None
+        self.render_cache.clear()
+        self.stale = True
+
+    def on_parameter_edit(self, event=None) -> None:
+        """Schedules a redraw after a settings edit if auto-apply is enabled."""
+        if self.auto_apply.get():
+            self.redraw.request()
+
+    def on_resize(self, event) -> None:
+        """Keeps the latest canvas size and resizes once the window stops moving."""
+        self.resize_event = event
+        self.resize_redraw.request()
+
+    def apply_resize(self) -> None:
+        if self.resize_event is not None:
+            self.canvas.resize(self.resize_event)
+            self.resize_event = None
+            pending = self.offscreen_pending == self.render_generation
+            if self.offscreen_shown or pending:
+                # Worker renders are bitmaps, render again at the new size
+                self.drawn_parameters = None
+                self.update_figure()
+
+    def linked_ranges(self) -> dict:
+        """Returns the (min, max) ranges set for the linked dimensions."""
+        return {
+            dim: (self.parameters[low], self.parameters[high])
+            for dim, (low, high) in self.LINKED_AXES.items()
+        }
+
+    def on_view_changed(self, source, ranges: dict) -> None:
+        """
+        Applies ranges published by another page.
+
+        The ranges are written to the zoom entries, so they behave as if typed.
+        The visible page is redrawn right away, through update_artists() when
+        only limits changed. Hidden pages are redrawn when their tab is shown.
+
+        Args:
+            source: The publishing page.
+            ranges (dict): Changed (min, max) ranges by dimension.
+        """
+        if source is self or not self.link_views.get():
+            return
+
+        linked = [
+            (self.LINKED_AXES[dim], limits)
+            for dim, limits in ranges.items()
+            if dim in self.LINKED_AXES
+        ]
+        if not linked:
+            return
+
+        for keys, limits in linked:
+            for key, value in zip(keys, limits):
+                entry = getattr(self, key)
+                entry.delete(0, "end")
+                if value != None:
+                    entry.insert(0, str(value))
+
+        if self.winfo_ismapped():
+            self.redraw.flush()
+        elif self.drawn_parameters is not None:
+            self.stale = True
+
+    def create_selector(self, axes):
+        """
+        Creates the mouse range selection tool of the page, if any.
+
+        Pages return a RectangleSelector or SpanSelector calling
+        on_select_range() with the selected D1 and D2 ranges.
+
+        Args:
+            axes (Axes): The main axes of the figure.
+        """
+        return None
+
+    def attach_selector(self) -> None:
+        """Creates the selection tool on the axes of a newly built figure."""
+        self.selector = None
+        if "axes" in self.artists:
+            self.selector = self.create_selector(self.artists["axes"])
+
+    def on_select_range(self, **ranges) -> None:
+        """
+        Zooms to a range selected with the mouse, then shares it if views are linked.
+
+        Args:
+            **ranges: (min, max) ranges by dimension ("d1", "d2").
+        """
+        for dim, limits in ranges.items():
+            low, high = sorted(round(value, 3) for value in limits)
+            for key, value in zip(self.LINKED_AXES[dim], (low, high)):
+                entry = getattr(self, key)
+                entry.delete(0, "end")
+                entry.insert(0, str(value))
+        self.redraw.flush()
+
+    def on_canvas_press(self, event) -> None:
+        """
+        Builds the real figure when a bitmap is clicked before build_figure()
+        is done, for selection.
+        """
+        if not self.offscreen_shown or self.artists or event.button != 1:
+            return
+
+        self.ensure_figure()
+        if self.selector is not None:
+            # The selector did not exist when the press was dispatched
+            self.canvas.callbacks.process(
+                "button_press_event",
+                MouseEvent(
+                    "button_press_event",
+                    self.canvas,
+                    event.x,
+                    event.y,
+                    event.button,
+                    guiEvent=event.guiEvent,
+                ),
+            )
+
+    def changed_parameters(self) -> set | None:
+        """
+        Returns the parameters changed since the figure was last built,
+        or None if the figure must be rebuilt (first draw or new data).
+        """
+        if self.drawn_parameters is None or self.drawn_data is not self.data:
+            return None
+
+        return {
+            key
+            for key, value in self.parameters.items()
+            if self.drawn_parameters.get(key) != value
+        }
+
+    def update_artists(self, changed: set) -> bool:
+        """
+        Applies limit-only or color-only changes to the existing artists.
+
+        Pages override this with set_xlim(), set_clim(), set_cmap() or set_data()
+        calls on the artists they stored in self.artists.
+
+        Args:
+            changed (set): Names of the changed parameters.
+
+        Returns:
+            bool: True if the changes were applied, False if the figure must be rebuilt.
+        """
+        return False
+
+    def format_colorbar(self, cbar) -> None:
+        """
+        Labels the intensity colorbar and rounds its ticks.
+
+        Args:
+            cbar (Colorbar): The colorbar to format.
+        """
+        cbar.set_label("Intensity", labelpad=-5, y=1.05, rotation="horizontal")
+        cbar.ax.ticklabel_format(
+            axis="y", style="sci", scilimits=(-2, 4), useOffset=False
+        )
+
+        labels = [float(f"{tick:0<3.1e}") for tick in cbar.ax.get_yticks()]
+        cbar.ax.set_yticks(labels)
+
+    def render(self, plan: dict, prepare_time: float = 0.0) -> None:
+        """
+        Clears the figure, redraws the axes with a render plan, and refreshes the canvas.
+
+        Full renders are timed to keep the cost estimate used by plan_render() current.
+
+        Args:
+            plan (dict): Render plan, see plan_render().
+            prepare_time (float, optional): Time already spent in prepare() [s].
+        """
+        start = time.perf_counter()
+        self.render_plan = plan
         self.figure.clf()
         self.draw_axes()
+        self.attach_selector()
         self.canvas.draw()
+        self.offscreen_shown = False
+        if self.region is not None:
+            self.update_readout(self.region)
+
+        if not plan.get("preview"):
+            self.cache_render(np.array(self.canvas.buffer_rgba()), plan)
+            elapsed = time.perf_counter() - start + prepare_time
+            self.render_cost = elapsed / self.plan_units(plan)
+
+    def render_work(self) -> tuple[int, int]:
+        """
+        Returns the size of a full render as (number of data points, number of levels).
+
+        Pages whose cost does not depend on a level count report a single level.
+        """
+        z = self.view_data()[2] if "z" in self.data else self.data.get("y")
+        lines = self.parameters.get("lines") or self.DEFAULT_PARAMETERS.get("lines")
+        return (np.size(z), int(lines or 1))
+
+    def plan_render(self) -> dict:
+        """
+        Scales the full render down to fit RENDER_BUDGET.
+
+        Using the cost measured on previous renders, the level count is lowered
+        first (down to MIN_LEVELS), then the data is decimated.
+
+        Returns:
+            dict: Render plan with keys "stride" (decimation step) and
+                "levels" (level cap, None for no cap).
+        """
+        plan = {"stride": 1, "levels": None}
+        if self.render_cost is None:
+            return plan
+
+        cells, levels = self.render_work()
+        budget = self.RENDER_BUDGET / self.render_cost
+
+        if cells * levels > budget and levels > self.MIN_LEVELS:
+            plan["levels"] = max(self.MIN_LEVELS, int(budget / cells))
+        used = plan["levels"] or levels
+        if cells * used > budget:
+            plan["stride"] = self.stride_for(cells * used / budget)
+
+        if plan["levels"] or plan["stride"] > 1:
+            logger.info(
+                f"Render scaled to fit {self.RENDER_BUDGET:.1f} s: "
+                f"{used} levels, 1 point out of {plan['stride']}."
+            )
+
+        return plan
+
+    def preview_plan(self) -> dict:
+        """Returns the render plan of a coarse preview."""
+        cells, _ = self.render_work()
+        stride = self.stride_for(cells / self.PREVIEW_CELLS)
+        return {"stride": stride, "levels": self.PREVIEW_LEVELS, "preview": True}
+
+    def stride_for(self, ratio: float) -> int:
+        """Returns the stride dividing the drawn points by a ratio over DIMENSIONS."""
+        return int(np.ceil(ratio ** (1 / self.DIMENSIONS)))
+
+    def plan_units(self, plan: dict) -> float:
+        """Returns the render work of a plan, in point-levels (at least 1)."""
+        cells, levels = self.render_work()
+        units = cells / plan["stride"] ** self.DIMENSIONS * (plan["levels"] or levels)
+        return max(units, 1)
+
+    def is_prepared(self, plan: dict) -> bool:
+        """
+        Returns True if the heavy part of a render is already available (e.g. cached).
+        Pages that implement prepare() should override this. Otherwise, large
+        renders are left to the workers when OFFSCREEN is set.
+        """
+        return not self.OFFSCREEN
+
+    def prepare(self, plan: dict) -> None:
+        """
+        Performs the heavy part of a full render ahead of drawing.
+
+        Called from a background thread on a snapshot() of the page, it may
+        fill parameters on it but must not touch the figure. Results reach the
+        page through shared caches (e.g. the contour engine).
+        """
+        pass
+
+    def snapshot(self) -> "BaseVisualizationPage":
+        """
+        Returns an off-screen copy of the page state for prepare().
+
+        The copy shares the data and has its own parameters and figure of the
+        canvas size, so it resolves the same view as the page without the Tk
+        thread and the background thread writing to the same objects.
+        """
+        clone = type(self).offscreen()
+        clone.data = self.data
+        clone.parameters = self.parameters.copy()
+        clone.render_plan = self.render_plan
+        clone.figure.set_size_inches(self.figure.get_size_inches())
+        clone.figure.set_dpi(self.figure.dpi)
+        return clone
+
+    def view_data(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the (y, x, z) arrays to draw for the current zoom.
+
+        With a matrix pyramid, the coarsest level that still has a point for
+        every screen pixel is used, cropped to the zoom, so the draw cost
+        follows the canvas size rather than the size of the data.
+        """
+        if "view_z" in self.data:
+            return (self.data["view_y"], self.data["view_x"], self.data["view_z"])
+        if "pyramid" not in self.data:
+            return (self.data["y"], self.data["x"], self.data["z"])
+
+        rows_pixels, cols_pixels = self.screen_pixels()
+        return self.data["pyramid"].select(
+            self.zoom_range("y"), self.zoom_range("x"), rows_pixels, cols_pixels
+        )
+
+    def view_level(self) -> tuple[int, int] | None:
+        """Returns the pyramid level view_data() selects, or None without a pyramid."""
+        if "view_z" in self.data or "pyramid" not in self.data:
+            return None
+
+        rows_pixels, cols_pixels = self.screen_pixels()
+        return self.data["pyramid"].level_for(
+            self.zoom_range("y"), self.zoom_range("x"), rows_pixels, cols_pixels
+        )
+
+    def view_extent(self) -> tuple:
+        """
+        Returns the pyramid level and the (min, max) D1 and D2 coordinates of
+        the data drawn for the current zoom. Pages store it when drawing, see
+        covers_zoom().
+        """
+        y, x, _ = self.view_data()
+        return (self.view_level(), (y[0], y[-1]), (x[0], x[-1]))
+
+    def covers_zoom(self, extent: tuple) -> bool:
+        """
+        Returns True if the data drawn with a view_extent() can show the
+        current zoom: the same pyramid level is selected and the zoom lies
+        within the drawn crop. Without a pyramid, the whole data is drawn.
+        """
+        level, (y_low, y_high), (x_low, x_high) = extent
+        if self.view_level() != level:
+            return False
+        if level is None:
+            return True
+
+        low, high = self.zoom_range("y")
+        if low < y_low or high > y_high:
+            return False
+        low, high = self.zoom_range("x")
+        return x_low <= low and high <= x_high
+
+    def zoom_range(self, axis: str) -> tuple[float, float]:
+        """Returns the zoom limits along "x" (D2) or "y" (D1), unset limits meaning the full axis."""
+        low = self.parameters.get(f"{axis}_min")
+        high = self.parameters.get(f"{axis}_max")
+        values = self.data[axis]
+        return (
+            values.min() if low is None else low,
+            values.max() if high is None else high,
+        )
+
+    def screen_pixels(self) -> tuple[float | None, float | None]:
+        """
+        Returns the canvas pixels available along D1 and D2, or None for an
+        axis that must keep every point. D1 is drawn vertically by default.
+        """
+        return (self.figure.bbox.height, self.figure.bbox.width)
+
+    def decimate(self, y, x, z, plan: dict | None = None, rows: bool = True):
+        """
+        Strides the data according to a render plan.
+
+        Args:
+            y (np.ndarray): D1 coordinates (rows of z).
+            x (np.ndarray): D2 coordinates (columns of z).
+            z (np.ndarray): 2D matrix.
+            plan (dict, optional): Render plan. Defaults to the current one.
+            rows (bool, optional): Also decimate rows. Defaults to True.
+
+        Returns:
+            tuple: Decimated (y, x, z).
+        """
+        stride = (plan or self.render_plan)["stride"]
+        if stride == 1:
+            return (y, x, z)
+
+        sx = min(stride, max(1, len(x) // self.MIN_POINTS))
+        sy = min(stride, max(1, len(y) // self.MIN_POINTS)) if rows else 1
+        return (y[::sy], x[::sx], z[::sy, ::sx])
+
+    def level_count(self, requested: int, plan: dict | None = None) -> int:
+        """Caps a requested level count according to a render plan."""
+        cap = (plan or self.render_plan)["levels"]
+        return min(requested, cap) if cap else requested
 
     def save_figure(self) -> None:
+        """
+        Asks for the export parameters and queues the export of the figure.
+
+        The figure is drawn off-screen at the requested size, so the UI stays
+        responsive and the displayed figure is left untouched.
+        """
         parameters = ask_save_parameters()
-        if parameters["path"] == "":
+        if parameters == None or parameters["path"] == "":
             return
 
-        fig = self.figure
-        axes = fig.axes[0]
-        current_size = fig.get_size_inches()
-
         cm_to_inches = 1 / 2.54
-
-        dpi = parameters["dpi"]
         width = parameters["size"][0] * cm_to_inches
         height = parameters["size"][1] * cm_to_inches
 
-        fig.set_size_inches(width, height)
-        axes.set_xlabel(axes.get_xlabel())
-        axes.set_ylabel(axes.get_ylabel())
+        exports.submit(
+            self,
+            parameters["path"],
+            (width, height),
+            parameters["dpi"],
+            rasterize=parameters["rasterize"],
+            simplify=parameters["simplify"],
+        )
+
+    def export_clone(
+        self, size: tuple[float, float], dpi: int
+    ) -> "BaseVisualizationPage":
+        """
+        Returns an off-screen copy of the page with the figure size of an export.
+
+        The copy shares the data, and selects its pyramid level from the export
+        resolution rather than from the canvas size. Parameters are read from
+        the widgets first, so pages that were never drawn export their current
+        settings. Runs on the Tk thread.
+
+        Args:
+            size (tuple): Figure size in inches (width, height).
+            dpi (int): Export resolution.
+        """
+        self.read_parameters()
+        clone = type(self).offscreen()
+        clone.data = self.data
+        clone.parameters = self.parameters.copy()
+        clone.figure.set_size_inches(size)
+        clone.figure.set_dpi(dpi)
+        return clone
+
+    def save(self, path: str, rasterize: bool = False, simplify: bool = False) -> None:
+        """
+        Draws the full figure and saves it at the figure size and resolution.
+
+        In vector formats, rasterized data layers are embedded as images at the
+        figure resolution while axes, labels and colorbars stay vectors. Other
+        formats are not affected by either option. PNG and TIFF images larger
+        than TILED_EXPORT_PIXELS are rendered and written in bands, so poster
+        sizes do not need the full bitmap in memory.
+
+        Args:
+            path (str): Output file, its extension giving the format.
+            rasterize (bool, optional): Rasterize the data_artists(). Defaults to False.
+            simplify (bool, optional): Drop vertices closer than a pixel, see
+                simplify_artists(). Defaults to False.
+        """
+        self.render_plan = {"stride": 1, "levels": None}
+        self.figure.clf()
+        self.draw_axes()
+        if rasterize:
+            for artist in self.data_artists():
+                artist.set_rasterized(True)
+        if simplify:
+            self.simplify_artists()
+
+        width, height = self.figure.get_size_inches() * self.figure.dpi
+        if (
+            Path(path).suffix.lower() in TILED_FORMATS
+            and width * height > self.TILED_EXPORT_PIXELS
+        ):
+            save_tiled(self.figure, path, self.figure.dpi)
+        else:
+            self.figure.savefig(path, dpi=self.figure.dpi)
+
+    def data_artists(self) -> list:
+        """Returns the artists drawing the data, the heavy part of vector exports."""
+        return [
+            self.artists[key]
+            for key in ("mappable", "lines", "line")
+            if key in self.artists
+        ]
+
+    def simplify_artists(self) -> None:
+        """Reduces the vertices of the data artists for vector exports."""
+        pass
+
+    def region_stats(
+        self, x_range: tuple[float, float], y_range: tuple[float, float]
+    ) -> tuple[float, float, float]:
+        """
+        Returns the min, max and sum of the intensities within a zoomed region.
+
+        When the data comes with a range index, the region is answered in
+        constant time instead of scanning the matrix. Otherwise (e.g. in the
+        render workers) only the region itself is scanned. Both give the same
+        exact extremes, so previews and worker renders share their z limits.
+
+        Args:
+            x_range (tuple): (min, max) limits along D2.
+            y_range (tuple): (min, max) limits along D1.
+
+        Returns:
+            tuple: (min, max, sum) of the region.
+        """
+
+        if "index" in self.data:
+            return self.data["index"].query_coordinates(y_range, x_range)
+
+        z = self.region_matrix(x_range, y_range)
+        return (float(z.min()), float(z.max()), float(z.sum()))
+
+    def region_matrix(
+        self, x_range: tuple[float, float], y_range: tuple[float, float]
+    ) -> np.ndarray:
+        """Returns the full resolution matrix cropped to a zoomed region."""
+
+        r0, r1 = index_range(self.data["y"], *y_range)
+        c0, c1 = index_range(self.data["x"], *x_range)
+        return self.data["z"][r0:r1, c0:c1]
+
+    def autoscale_range(self, stats: tuple[float, float, float]) -> tuple[float, float]:
+        """
+        Returns the intensity range used for unset limits of the zoomed region.
+
+        With a "clip" percentage, the clip percentiles of the region itself
+        are used, so a single huge peak does not set the scale. They come from
+        the precomputed intensity quantiles, see
+        IntensityQuantiles.clipped_range(). If the region is too flat for the
+        clipped range to be valid, its extremes are used.
+
+        Args:
+            stats (tuple): (min, max, sum) of the region, see region_stats().
 
-        fig.savefig(parameters["path"], dpi=dpi)
-        self.figure.set_size_inches(current_size)
+        Returns:
+            tuple: (low, high) intensities.
+        """
+
+        clip = self.parameters.get("clip") or 0
+        if clip <= 0:
+            return (stats[0], stats[1])
+
+        rows = index_range(
+            self.data["y"], self.parameters["y_min"], self.parameters["y_max"]
+        )
+        cols = index_range(
+            self.data["x"], self.parameters["x_min"], self.parameters["x_max"]
+        )
+        low, high = self.intensity_quantiles().clipped_range(
+            self.data["z"], rows, cols, min(clip, 50)
+        )
+        low, high = max(stats[0], low), min(stats[1], high)
+        if low >= high:
+            return (stats[0], stats[1])
+        return (low, high)
+
+    def intensity_quantiles(self) -> IntensityQuantiles:
+        """
+        Returns the intensity quantiles of the data, computing them if the
+        data was not provided with precomputed ones.
+        """
+
+        if "quantiles" not in self.data:
+            self.data["quantiles"] = IntensityQuantiles(self.data["z"])
+        return self.data["quantiles"]
+
+    def update_readout(self, stats: tuple[float, float, float]) -> None:
+        """
+        Displays the statistics of the zoomed region below the figure.
+
+        Args:
+            stats (tuple): (min, max, sum) as returned by region_stats().
+        """
+
+        self.readout.configure(
+            text=f"Zoom region: min {stats[0]:.3g} | max {stats[1]:.3g} | sum {stats[2]:.4g}"
+        )
 
     def try_float(self, input: str) -> float | None:
         if input == "":
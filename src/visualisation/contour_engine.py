@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import contourpy
+import numpy as np
+from matplotlib.contour import ContourSet
+from matplotlib.path import Path
+
+# Use root logger
+logger = logging.getLogger(__name__)
+
+# Bounds used by matplotlib for the extended (under/over) contour bands
+EXTEND_LOW, EXTEND_HIGH = -1e250, 1e250
+
+
+class ContourGeometry:
+    """
+    Precomputed filled contour geometry, one compound path per band.
+
+    Attributes:
+        paths (list[Path]): Paths of the under band, every level band and the over band.
+        zmin (float): Minimum of the contoured matrix.
+        zmax (float): Maximum of the contoured matrix.
+        mins (list): Lower (x, y) data bounds.
+        maxs (list): Upper (x, y) data bounds.
+    """
+
+    def __init__(self, paths, zmin, zmax, mins, maxs):
+        self.paths = paths
+        self.zmin = zmin
+        self.zmax = zmax
+        self.mins = mins
+        self.maxs = maxs
+
+
+class CachedContourSet(ContourSet):
+    """
+    Filled contour set built from a ContourGeometry instead of raw data.
+
+    Creating it only builds the artist, all marching-squares work has
+    been done beforehand by the ContourEngine.
+
+    Call signature::
+
+        CachedContourSet(ax, geometry, levels=levels, filled=True, extend="both", ...)
+    """
+
+    def _process_args(self, geometry, **kwargs):
+        """Overridden from ContourSet to use precomputed paths."""
+
+        self.levels = np.asarray(self.levels, dtype=float)
+        self.zmin = geometry.zmin
+        self.zmax = geometry.zmax
+        self._mins = geometry.mins
+        self._maxs = geometry.maxs
+        self._paths = geometry.paths
+        return kwargs
+
+
+class ContourEngine:
+    """
+    ContourEngine computes filled contour geometry with contourpy's threaded
+    algorithm and caches it.
+
+    Geometry is keyed by (matrix view, levels, transpose), so redrawing
+    identical contours (Apply, colormap or extreme color changes, swapping back)
+    only creates the artist. Pages compute it in prepare() on a background thread,
+    leaving artist creation as the only work done on the Tk thread.
+
+    Attributes:
+        thread_count (int): Number of contourpy threads (0 uses all cores).
+    """
+
+    CACHE_SIZE = 8
+
+    def __init__(self, thread_count: int = 0):
+        self.thread_count = thread_count or os.cpu_count() or 1
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def key(self, z: np.ndarray, levels: np.ndarray, transpose: bool) -> tuple:
+        """
+        Returns the cache key of a contour request.
+
+        Views are keyed by the array owning their memory and their place in it
+        (address, shape and strides), so the new strided or cropped views that
+        every decimation of the same plan returns share their geometry.
+        """
+
+        owner = z if z.base is None else z.base
+        view = (z.__array_interface__["data"][0], z.shape, z.strides)
+        return (id(owner), view, np.asarray(levels, dtype=float).tobytes(), transpose)
+
+    def is_cached(self, x, y, z, levels, transpose: bool = False) -> bool:
+        """Returns True if the geometry of a request is already available."""
+
+        with self.lock:
+            return self.key(z, levels, transpose) in self.cache
+
+    def filled(self, x, y, z, levels, transpose: bool = False) -> ContourGeometry:
+        """
+        Returns the filled contour geometry of a matrix, computing it if needed.
+
+        Bands below the first and above the last level are included, matching
+        contourf(..., extend="both").
+
+        Args:
+            x (np.ndarray): Column coordinates of z.
+            y (np.ndarray): Row coordinates of z.
+            z (np.ndarray): 2D matrix to contour.
+            levels (np.ndarray): Increasing contour levels.
+            transpose (bool, optional): Contour z.T against (y, x) instead.
+
+        Returns:
+            ContourGeometry: The cached geometry.
+        """
+
+        key = self.key(z, levels, transpose)
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key][1]
+
+        matrix = z
+        if transpose:
+            x, y, z = y, x, z.T
+
+        ny, nx = z.shape
+        chunks = max(1, min(2 * self.thread_count, ny - 1))
+        generator = contourpy.contour_generator(
+            x,
+            y,
+            z,
+            name="threaded",
+            thread_count=self.thread_count,
+            chunk_count=(chunks, 1),
+            corner_mask=True,
+            fill_type=contourpy.FillType.OuterCode,
+        )
+
+        bounds = np.concatenate(([EXTEND_LOW], levels, [EXTEND_HIGH]))
+        empty = Path(np.empty((0, 2)))
+        paths = [
+            (
+                Path(np.concatenate(vertices), np.concatenate(codes))
+                if len(vertices)
+                else empty
+            )
+            for vertices, codes in generator.multi_filled(bounds)
+        ]
+
+        geometry = ContourGeometry(
+            paths,
+            float(np.nanmin(z)),
+            float(np.nanmax(z)),
+            [np.min(x), np.min(y)],
+            [np.max(x), np.max(y)],
+        )
+
+        with self.lock:
+            # The view references its owner, so the owner identity cannot be reused
+            self.cache[key] = (matrix, geometry)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.CACHE_SIZE:
+                self.cache.popitem(last=False)
+
+        logger.debug(f"Contour geometry computed for {z.shape}, {len(levels)} levels.")
+
+        return geometry
+
+
+def simplify_path(path: Path, transform, tolerance: float) -> Path:
+    """
+    Drops the rings of a path smaller than a pixel grid cell, and the vertices
+    falling in the same cell as the previous vertex of their ring.
+
+    Filled contours of fine or noisy data have many vertices per pixel and
+    many sub-pixel islands, which add to the size of vector exports without
+    being visible.
+
+    Args:
+        path (Path): Path with MOVETO, LINETO and CLOSEPOLY codes.
+        transform (Transform): Data to display (pixel) transform.
+        tolerance (float): Grid cell size in pixels.
+
+    Returns:
+        Path: The simplified path.
+    """
+
+    if len(path.vertices) < 3 or path.codes is None:
+        return path
+
+    pixels = transform.transform(path.vertices)
+    cells = np.floor(pixels / tolerance)
+    keep = np.ones(len(cells), dtype=bool)
+    keep[1:] = np.any(cells[1:] != cells[:-1], axis=1)
+    keep |= path.codes != Path.LINETO
+
+    # Rings start at MOVETO codes, the ones within a cell are dropped whole
+    starts = np.flatnonzero(path.codes == Path.MOVETO)
+    extent = np.maximum.reduceat(pixels, starts) - np.minimum.reduceat(pixels, starts)
+    small = np.all(extent < tolerance, axis=1)
+    sizes = np.diff(np.append(starts, len(pixels)))
+    keep &= ~np.repeat(small, sizes)
+
+    if not keep.any():
+        return Path(np.empty((0, 2)))
+    return Path(path.vertices[keep], path.codes[keep])
@@ -2,13 +2,25 @@
 
 import logging
 import tkinter as tk
+from pathlib import Path
 from tkinter import ttk
 from tkinter.colorchooser import askcolor
 
 import matplotlib.pyplot as plt
 import numpy as np
-
-from visualisation.base_page import BaseVisualizationPage, create_tooltip
+from matplotlib.colors import Normalize
+from matplotlib.patches import Rectangle
+from matplotlib.widgets import RectangleSelector
+from mpl_toolkits.axes_grid1 import make_axes_locatable
+
+from analysis.interpolation import INTERPOLATION_METHODS
+from analysis.normalization import NORMS, color_norm
+from analysis.projections import PROJECTION_MODES
+from analysis.range_index import index_range, nearest_index
+from file_io import ask_animation_parameters, ask_html_path
+from visualisation.base_page import BaseVisualizationPage, create_tooltip, exports
+from visualisation.contour_engine import CachedContourSet, ContourEngine, simplify_path
+from visualisation.html_export import intensity_codes, save_html
 
 # Use root logger
 logger = logging.getLogger(__name__)
@@ -40,11 +52,37 @@ class ContourPage(BaseVisualizationPage):
         "color_u": "#FFFFFF",
         "color_o": "#000000",
         "lines": 100,
+        "norm": "linear",
+        "clip": 0,
+        "interpolation": "none",
+        "factor": 4,
+        "projection": "none",
+        "heatmap": False,
+        "swap": False,
+        "cursor": False,
+    }
+    # Parameters that can change without rebuilding the figure
+    LIVE_PARAMETERS = {
+        "x_min",
+        "x_max",
+        "y_min",
+        "y_max",
+        "z_min",
+        "z_max",
+        "cmap",
+        "color_u",
+        "color_o",
     }
+    LINKED_AXES = {"d1": ("y_min", "y_max"), "d2": ("x_min", "x_max")}
 
     def __init__(self, master):
         super().__init__(master)
-        self.parameters = self.DEFAULT_PARAMETERS.copy()
+
+        # Crosshair blitting: the canvas without the animated cursor artists
+        self.background = None
+        self.canvas.mpl_connect("draw_event", self.on_canvas_draw)
+        self.canvas.mpl_connect("motion_notify_event", self.on_cursor_move)
+        self.canvas.mpl_connect("axes_leave_event", self.on_cursor_leave)
 
         self.create_parameters()
 
@@ -55,6 +93,32 @@ class ContourPage(BaseVisualizationPage):
         }
         self.update_figure()
 
+    def init_state(self):
+        super().init_state()
+        self.engine = ContourEngine()
+
+    def view_data(self) -> tuple:
+        """Returns the D1 resampled matrix (cached by the model) if requested."""
+
+        if self.parameters["interpolation"] != "none" and "upsample" in self.data:
+            y, z = self.data["upsample"](
+                max(1, int(self.parameters["factor"])),
+                self.parameters["interpolation"],
+            )
+            return (y, self.data["x"], z)
+        return super().view_data()
+
+    def view_level(self):
+        """The D1 resampled matrix is drawn whole, without a pyramid level."""
+
+        if self.parameters["interpolation"] != "none" and "upsample" in self.data:
+            return None
+        return super().view_level()
+
+    def screen_pixels(self) -> tuple:
+        height, width = super().screen_pixels()
+        return (width, height) if self.transposed() else (height, width)
+
     def create_parameters(self):
 
         zoom_frame = ttk.Labelframe(self.param_frame, text="Zoom")
@@ -82,14 +146,84 @@ class ContourPage(BaseVisualizationPage):
             self.param_frame,
             style="Switch.TCheckbutton",
             text="Swap D1/D2 Axes",
-            command=self.update_figure,
+            command=self.redraw.flush,
         )
         self.swap_toggle.state(["!alternate"])
 
+        interp_frame = ttk.Labelframe(
+            self.param_frame, text="D1 Interpolation", padding=(10, 0)
+        )
+
         zoom_frame.grid(column=0, row=0, sticky="nsew", padx=5)
         colors_frame.grid(column=1, row=0, sticky="nsew", padx=5)
+        interp_frame.grid(column=2, row=0, sticky="nsew", padx=5)
         self.swap_toggle.grid(column=0, row=1, sticky="sw")
 
+        self.heatmap_toggle = ttk.Checkbutton(
+            self.param_frame,
+            style="Switch.TCheckbutton",
+            text="Fast heatmap",
+            command=self.redraw.flush,
+        )
+        self.heatmap_toggle.state(["!alternate"])
+        self.heatmap_toggle.grid(column=1, row=1, sticky="sw")
+        create_tooltip(
+            self.heatmap_toggle,
+            "Draws the data as an image instead of filled contours, with the same colormap and extremes. Much faster for browsing, switch it off for final figures.",
+        )
+
+        projection_frame = ttk.Frame(self.param_frame)
+        projection_frame.grid(column=2, row=1, sticky="sw", padx=5)
+        ttk.Label(projection_frame, text="Projections", anchor="w").pack(
+            side="left", padx=(0, 5)
+        )
+        self.projection_cb = ttk.Combobox(
+            projection_frame,
+            values=["none"] + PROJECTION_MODES,
+            state="readonly",
+            width=6,
+        )
+        self.projection_cb.pack(side="left")
+        self.projection_cb.set(self.parameters["projection"])
+        self.projection_cb.bind("<<ComboboxSelected>>", self.cb_highlight_clear)
+        help_ctr_projection = ttk.Label(projection_frame, image=self.help_img_tk)
+        help_ctr_projection.pack(side="left", padx=5)
+        create_tooltip(
+            help_ctr_projection,
+            "Projections: Show the reconstructed 1D chromatogram (sum or max over D2) and the summed D2 profile next to the contour plot. Their limits follow the contour zoom.",
+        )
+
+        self.cursor_toggle = ttk.Checkbutton(
+            self.param_frame,
+            style="Switch.TCheckbutton",
+            text="Crosshair",
+            command=self.redraw.flush,
+        )
+        self.cursor_toggle.state(["!alternate"])
+        self.cursor_toggle.grid(column=0, row=2, sticky="sw")
+        create_tooltip(
+            self.cursor_toggle,
+            "Shows the D1, D2 and Intensity values under the mouse, with the D1 and D2 slices through the cursor drawn next to the contour plot.",
+        )
+
+        animation_btn = ttk.Button(
+            self.param_frame, text="Export Animation...", command=self.save_animation
+        )
+        animation_btn.grid(column=1, row=2, sticky="sw", pady=(5, 0))
+        create_tooltip(
+            animation_btn,
+            "Exports the run modulation by modulation as an animated GIF or PNG: the contour plot grows with every modulation while its D2 chromatogram is drawn next to it.",
+        )
+
+        html_btn = ttk.Button(
+            self.param_frame, text="Export HTML...", command=self.save_html
+        )
+        html_btn.grid(column=2, row=2, sticky="sw", pady=(5, 0))
+        create_tooltip(
+            html_btn,
+            "Exports the matrix as a single HTML file with an interactive viewer (zoom, pan, value readout) that opens offline in any browser, with the colors of the plot.",
+        )
+
         ttk.Label(d1_frame, text="D1 range [min]", width=15, anchor="w").grid(
             column=0, row=0, columnspan=3, sticky="new"
         )
@@ -122,7 +256,7 @@ class ContourPage(BaseVisualizationPage):
         help_ctr_colors = ttk.Label(colors_frame, image=self.help_img_tk)
         create_tooltip(
             help_ctr_colors,
-            "Colormap: The color scale that will be used to represent Intensity values\nExtremes: The colors to represent the values outside the Intensity limits (if set)\nLevels count: Higher count provides better resolution for sharp changes in intensity, but will make image drawing slower. A value of 100 is provided by default.",
+            "Colormap: The color scale that will be used to represent Intensity values\nExtremes: The colors to represent the values outside the Intensity limits (if set)\nLevels count: Higher count provides better resolution for sharp changes in intensity, but will make image drawing slower. A value of 100 is provided by default.\nScale: Spacing of the levels (square root, logarithmic or histogram-equalized scales reveal small peaks next to a huge one)\nClip: Percentage of the most and least intense points left out of the default Intensity range",
         )
         help_ctr_colors.grid(column=0, row=0, sticky="nw")
 
@@ -169,6 +303,23 @@ class ContourPage(BaseVisualizationPage):
         self.line_count.insert(0, self.parameters["lines"])
         self.line_count.grid(column=3, row=2, padx=(10, 0))
 
+        ttk.Label(colors_frame, text="Scale", width=10, anchor="w").grid(
+            column=4, row=1, sticky="w", padx=(10, 0)
+        )
+        self.norm_cb = ttk.Combobox(
+            colors_frame, values=NORMS, state="readonly", width=9
+        )
+        self.norm_cb.grid(column=4, row=2, padx=(10, 0))
+        self.norm_cb.set(self.parameters["norm"])
+        self.norm_cb.bind("<<ComboboxSelected>>", self.cb_highlight_clear)
+
+        ttk.Label(colors_frame, text="Clip [%]", width=8, anchor="w").grid(
+            column=5, row=1, sticky="w", padx=(10, 0)
+        )
+        self.clip_entry = ttk.Entry(colors_frame, width=6)
+        self.clip_entry.insert(0, self.parameters["clip"])
+        self.clip_entry.grid(column=5, row=2, padx=(10, 0))
+
         self.cmap_cb.current(self.CMAP_LIST.index(self.parameters["cmap"]))
         self.color_under_btn.configure(
             background=self.parameters["color_u"], relief="flat"
@@ -178,6 +329,34 @@ class ContourPage(BaseVisualizationPage):
         )
         self.cmap_cb.bind("<<ComboboxSelected>>", self.cb_highlight_clear)
 
+        help_ctr_interp = ttk.Label(interp_frame, image=self.help_img_tk)
+        create_tooltip(
+            help_ctr_interp,
+            "Method: Interpolation used to resample the chromatograms along D1 ('none' draws the measured modulations only)\nFactor: Number of D1 points drawn per modulation. Smoother contours are obtained without raising the levels count.",
+        )
+        help_ctr_interp.grid(column=0, row=0, sticky="nw")
+
+        ttk.Label(interp_frame, text="Method", width=10, anchor="w").grid(
+            column=0, row=1, sticky="w"
+        )
+        self.interp_cb = ttk.Combobox(
+            interp_frame,
+            values=["none"] + INTERPOLATION_METHODS,
+            state="readonly",
+            width=8,
+        )
+        self.interp_cb.grid(column=0, row=2, padx=(0, 10))
+
+        ttk.Label(interp_frame, text="Factor", width=8, anchor="w").grid(
+            column=1, row=1, sticky="w"
+        )
+        self.factor_entry = ttk.Entry(interp_frame, width=6)
+        self.factor_entry.insert(0, self.parameters["factor"])
+        self.factor_entry.grid(column=1, row=2)
+
+        self.interp_cb.set(self.parameters["interpolation"])
+        self.interp_cb.bind("<<ComboboxSelected>>", self.cb_highlight_clear)
+
         return super().create_parameters()
 
     def pick_color_extremes(self, extreme: str):
@@ -186,6 +365,7 @@ class ContourPage(BaseVisualizationPage):
             self.color_under_btn.configure(background=color)
         elif extreme == "over":
             self.color_over_btn.configure(background=color)
+        self.on_parameter_edit()
 
     def read_parameters(self):
 
@@ -200,6 +380,21 @@ class ContourPage(BaseVisualizationPage):
             self.parameters["color_u"] = self.color_under_btn.cget("bg")
             self.parameters["color_o"] = self.color_over_btn.cget("bg")
             self.parameters["lines"] = self.try_float(self.line_count.get())
+            self.parameters["norm"] = self.norm_cb.get()
+            self.parameters["clip"] = self.try_float(self.clip_entry.get())
+            self.parameters["interpolation"] = self.interp_cb.get()
+            self.parameters["factor"] = self.try_float(self.factor_entry.get())
+            self.parameters["projection"] = self.projection_cb.get()
+            self.parameters["heatmap"] = self.heatmap_toggle.instate(["selected"])
+            self.parameters["swap"] = self.swap_toggle.instate(["selected"])
+            self.parameters["cursor"] = self.cursor_toggle.instate(["selected"])
+
+            if self.parameters["lines"] == None:
+                self.parameters["lines"] = 100
+                self.line_count.insert(0, "100")
+            if self.parameters["factor"] == None:
+                self.parameters["factor"] = self.DEFAULT_PARAMETERS["factor"]
+                self.factor_entry.insert(0, str(self.parameters["factor"]))
 
             return super().read_parameters()
         except ValueError as e:
@@ -210,17 +405,47 @@ class ContourPage(BaseVisualizationPage):
         self.color_under_btn.configure(background=self.DEFAULT_PARAMETERS["color_u"])
         self.color_over_btn.configure(background=self.DEFAULT_PARAMETERS["color_o"])
         self.cmap_cb.current(self.CMAP_LIST.index(self.DEFAULT_PARAMETERS["cmap"]))
+        self.norm_cb.set(self.DEFAULT_PARAMETERS["norm"])
+        self.interp_cb.set(self.DEFAULT_PARAMETERS["interpolation"])
+        self.projection_cb.set(self.DEFAULT_PARAMETERS["projection"])
         return super().reset_parameters()
 
-    def draw_axes(self):
-
-        self.figure.add_subplot()
-        self.figure.subplots_adjust(0.15, 0.2, 0.9, 0.9)
-        axes = self.figure.axes[0]
-
-        cmap = plt.colormaps[self.cmap_cb.get()].with_extremes(
-            under=self.parameters["color_u"], over=self.parameters["color_o"]
-        )
+    def is_prepared(self, plan: dict) -> bool:
+        if self.parameters["heatmap"]:
+            return True
+        x, y, z, levels = self.resolve_contour(plan)
+        return self.engine.is_cached(x, y, z, levels, self.transposed())
+
+    def prepare(self, plan: dict) -> None:
+        """
+        Computes the contour geometry of a render plan in the engine cache, so
+        only the artist creation is left for the Tk thread.
+        """
+        if not self.parameters["heatmap"]:
+            x, y, z, levels = self.resolve_contour(plan)
+            self.engine.filled(x, y, z, levels, self.transposed())
+
+    def snapshot(self) -> "ContourPage":
+        """Shares the contour engine, whose cache hands the geometry to the page."""
+        clone = super().snapshot()
+        clone.engine = self.engine
+        return clone
+
+    def transposed(self) -> bool:
+        """Returns True when D1 is drawn along the horizontal axis."""
+        return not self.parameters["swap"]
+
+    def resolve_contour(self, plan: dict | None = None) -> tuple:
+        """
+        Fills unset parameters with their defaults and prepares the contour request.
+
+        Args:
+            plan (dict, optional): Render plan. Defaults to the current one.
+
+        Returns:
+            tuple: (x, y, z, levels) where y and z may be resampled along D1
+                and decimated by the render plan.
+        """
 
         if self.parameters["x_min"] == None:
             self.parameters["x_min"] = self.data["x"].min()
@@ -230,64 +455,524 @@ class ContourPage(BaseVisualizationPage):
             self.parameters["y_min"] = self.data["y"].min()
         if self.parameters["y_max"] == None:
             self.parameters["y_max"] = self.data["y"].max()
+
+        # The readout shows the statistics of the zoomed region
+        self.region = self.region_stats(
+            (self.parameters["x_min"], self.parameters["x_max"]),
+            (self.parameters["y_min"], self.parameters["y_max"]),
+        )
+
+        # Unset intensity limits follow the whole matrix, so the levels (and
+        # the artists) are kept across zooms. Percentile clipping keeps a
+        # single huge peak from setting the scale.
+        quantiles = self.intensity_quantiles()
+        clip = min(self.parameters.get("clip") or 0, 50)
+        low, high = quantiles.percentile(clip), quantiles.percentile(100 - clip)
+        if low >= high:
+            low, high = quantiles.percentile(0), quantiles.percentile(100)
         if self.parameters["z_min"] == None:
-            self.parameters["z_min"] = self.data["z"].min()
+            self.parameters["z_min"] = low
         if self.parameters["z_max"] == None:
-            self.parameters["z_max"] = self.data["z"].max()
-        if self.parameters["lines"] == None:
-            self.parameters["lines"] = 100
-            self.line_count.delete(0, "end")
-            self.line_count.insert(0, "100")
+            self.parameters["z_max"] = high
+
+        # Resampled along D1 or reduced to the screen resolution
+        y, x, z = self.decimate(*self.view_data(), plan)
 
-        levels = np.linspace(
+        levels = self.intensity_quantiles().levels(
+            self.parameters["norm"],
             self.parameters["z_min"],
             self.parameters["z_max"],
-            int(self.parameters["lines"]),
+            self.level_count(int(self.parameters["lines"]), plan),
         )
 
-        if self.swap_toggle.instate(["selected"]):
+        return (x, y, z, levels)
+
+    def draw_axes(self):
+
+        self.figure.add_subplot()
+        self.figure.subplots_adjust(0.15, 0.2, 0.9, 0.9)
+        axes = self.figure.axes[0]
+
+        cmap = plt.colormaps[self.parameters["cmap"]].with_extremes(
+            under=self.parameters["color_u"], over=self.parameters["color_o"]
+        )
+
+        x, y, z, levels = self.resolve_contour()
+        norm = color_norm(self.parameters["norm"], levels, cmap.N)
+        transpose = self.transposed()
+
+        if transpose:
+            axes.set_ylim(self.parameters["x_min"], self.parameters["x_max"])
+            axes.set_xlim(self.parameters["y_min"], self.parameters["y_max"])
+            axes.set_ylabel("D2 [s]")
+            axes.set_xlabel("D1 [min]")
+        else:
             axes.set_xlim(self.parameters["x_min"], self.parameters["x_max"])
             axes.set_ylim(self.parameters["y_min"], self.parameters["y_max"])
             axes.set_xlabel("D2 [s]")
             axes.set_ylabel("D1 [min]")
 
-            cs = axes.contourf(
-                self.data["x"],
-                self.data["y"],
-                self.data["z"],
-                levels,
+        if self.parameters["heatmap"]:
+            cs = self.draw_heatmap(axes, x, y, z, levels, cmap, norm, transpose)
+        else:
+            # Geometry comes from the engine cache, only the artist is created here
+            cs = CachedContourSet(
+                axes,
+                self.engine.filled(x, y, z, levels, transpose),
+                levels=levels,
+                filled=True,
                 cmap=cmap,
+                norm=norm,
                 extend="both",
             )
+
+        projection = (
+            self.parameters["projection"] != "none" and "projections" in self.data
+        )
+        cursor = self.parameters["cursor"]
+
+        if projection or cursor:
+            divider = make_axes_locatable(axes)
+            if projection:
+                self.draw_projections(axes, divider)
+            if cursor:
+                slices = self.draw_slices(axes, divider)
+            cax = divider.append_axes("right", size="5%", pad=0.15)
+            cbar = self.figure.colorbar(cs, cax=cax, extend="both")
+        else:
+            cbar = self.figure.colorbar(cs, extend="both")
+        self.format_colorbar(cbar)
+
+        self.artists = {
+            "axes": axes,
+            "mappable": cs,
+            "colorbar": cbar,
+            "levels": levels,
+            "view": self.view_extent(),
+        }
+        if cursor:
+            self.artists.update(slices)
+
+        return super().draw_axes()
+
+    def create_selector(self, axes):
+        """Dragging a rectangle over the plot zooms to it."""
+        return RectangleSelector(
+            axes,
+            self.on_select_rectangle,
+            useblit=True,
+            button=[1],
+            minspanx=5,
+            minspany=5,
+            spancoords="pixels",
+            props={"facecolor": "gray", "edgecolor": "black", "alpha": 0.2},
+        )
+
+    def on_select_rectangle(self, press, release):
+        horizontal = (press.xdata, release.xdata)
+        vertical = (press.ydata, release.ydata)
+        if self.transposed():
+            self.on_select_range(d1=horizontal, d2=vertical)
         else:
+            self.on_select_range(d1=vertical, d2=horizontal)
+
+    def update_artists(self, changed: set) -> bool:
+        """
+        Applies zoom and color changes in place.
+
+        Contours are only kept if their levels are unchanged (e.g. zooms with
+        unset intensity limits, which follow the whole matrix). Heatmaps also
+        take intensity range and scale changes in place, with a new norm.
+        """
+        live = set(self.LIVE_PARAMETERS)
+        if self.parameters["heatmap"]:
+            live |= {"norm", "clip", "lines"}
+        if not changed <= live or self.render_plan.get("preview"):
+            return False
+
+        x, y, z, levels = self.resolve_contour()
+        if not self.covers_zoom(self.artists["view"]):
+            # The zoom needs another pyramid level or crop
+            return False
+        new_levels = not np.array_equal(levels, self.artists["levels"])
+        if new_levels and not self.parameters["heatmap"]:
+            return False
+
+        axes = self.artists["axes"]
+        mappable = self.artists["mappable"]
+
+        if self.transposed():
             axes.set_ylim(self.parameters["x_min"], self.parameters["x_max"])
             axes.set_xlim(self.parameters["y_min"], self.parameters["y_max"])
-            axes.set_ylabel("D2 [s]")
-            axes.set_xlabel("D1 [min]")
+        else:
+            axes.set_xlim(self.parameters["x_min"], self.parameters["x_max"])
+            axes.set_ylim(self.parameters["y_min"], self.parameters["y_max"])
 
-            cs = axes.contourf(
-                self.data["y"],
-                self.data["x"],
-                self.data["z"].transpose(),
-                levels,
-                cmap=cmap,
-                extend="both",
+        if "slices" in self.artists:
+            top, right = self.artists["slices"]
+            top.axes.set_ylim(self.parameters["z_min"], self.parameters["z_max"])
+            right.axes.set_xlim(self.parameters["z_min"], self.parameters["z_max"])
+
+        if changed & {"cmap", "color_u", "color_o"}:
+            mappable.set_cmap(
+                plt.colormaps[self.parameters["cmap"]].with_extremes(
+                    under=self.parameters["color_u"], over=self.parameters["color_o"]
+                )
             )
 
-        cbar = self.figure.colorbar(cs)
-        cbar.set_label("Intensity", labelpad=-5, y=1.05, rotation="horizontal")
+        if new_levels:
+            # A new norm also resets the colorbar ticks
+            norm = color_norm(self.parameters["norm"], levels, mappable.cmap.N)
+            mappable.set_norm(norm or Normalize(levels[0], levels[-1]))
+            self.format_colorbar(self.artists["colorbar"])
+            self.artists["levels"] = levels
+
+        self.update_readout(self.region)
+
+        return True
+
+    def simplify_artists(self) -> None:
+        """Simplifies the filled contour paths to a pixel of the export."""
+        if self.parameters["heatmap"] or "mappable" not in self.artists:
+            return
+
+        mappable = self.artists["mappable"]
+        transform = self.artists["axes"].transData
+        paths = mappable.get_paths()
+        mappable.set_paths([simplify_path(path, transform, 1.0) for path in paths])
+
+        before = sum(len(path.vertices) for path in paths)
+        after = sum(len(path.vertices) for path in mappable.get_paths())
+        logger.debug(f"Contour paths simplified from {before} to {after} vertices.")
+
+    def draw_heatmap(self, axes, x, y, z, levels, cmap, norm, transpose):
+        """
+        Draws the matrix as a mesh of cells centered on the real (possibly
+        uneven) times.
+
+        Values outside the level range use the extreme colors, as with
+        contours. Unlike images, the mesh takes colormap and norm changes in
+        place.
+
+        Args:
+            axes (Axes): The plot axes.
+            x, y, z (np.ndarray): D2 times, D1 times and the matrix.
+            levels (np.ndarray): Contour levels, giving the color range.
+            cmap (Colormap): Colormap with extremes.
+            norm (Normalize | None): Banded norm for non-linear scales.
+            transpose (bool): Draw D1 along the horizontal axis.
+
+        Returns:
+            QuadMesh: The mesh, usable as a colorbar mappable.
+        """
+
+        if norm is None:
+            norm = Normalize(levels[0], levels[-1])
+
+        if transpose:
+            x, y, z = y, x, z.transpose()
+        return axes.pcolormesh(x, y, z, shading="nearest", cmap=cmap, norm=norm)
+
+    def draw_projections(self, axes, divider):
+        """
+        Adds the marginal projection axes around the contour plot.
+
+        The marginals share their position axis with the contour plot, so they
+        follow its limits without the cached projections being recomputed.
+
+        Args:
+            axes (Axes): The contour plot axes.
+            divider (AxesDivider): Layout of the contour plot axes.
+        """
+
+        projections = self.data["projections"]
+        d1 = projections.d1(self.parameters["projection"])
+        d2 = projections.d2_sum
+
+        top = divider.append_axes("top", size="18%", pad=0.08, sharex=axes)
+        right = divider.append_axes("right", size="18%", pad=0.08, sharey=axes)
+
+        if self.parameters["swap"]:
+            top.plot(self.data["x"], d2, color="black", linewidth=0.8)
+            right.plot(d1, self.data["y"], color="black", linewidth=0.8)
+        else:
+            top.plot(self.data["y"], d1, color="black", linewidth=0.8)
+            right.plot(d2, self.data["x"], color="black", linewidth=0.8)
+
+        top.tick_params(labelbottom=False, labelleft=False, left=False)
+        right.tick_params(labelleft=False, labelbottom=False, bottom=False)
+
+    def draw_slices(self, axes, divider) -> dict:
+        """
+        Adds the crosshair and the slice axes showing the data through the cursor.
+
+        The cursor artists are animated: they are left out of normal draws and
+        blitted over the saved canvas on mouse moves, see on_cursor_move().
+        The slice axes have fixed intensity limits, so the moving lines never
+        require their ticks to be redrawn.
+
+        Args:
+            axes (Axes): The contour plot axes.
+            divider (AxesDivider): Layout of the contour plot axes.
+
+        Returns:
+            dict: The cursor artists, to be stored in self.artists.
+        """
+
+        z_range = (self.parameters["z_min"], self.parameters["z_max"])
+
+        top = divider.append_axes("top", size="18%", pad=0.08, sharex=axes)
+        right = divider.append_axes("right", size="18%", pad=0.08, sharey=axes)
+        top.set_ylim(*z_range)
+        right.set_xlim(*z_range)
+        top.tick_params(labelbottom=False, labelleft=False, left=False)
+        right.tick_params(labelleft=False, labelbottom=False, bottom=False)
+
+        style = {"color": "red", "linewidth": 0.8, "animated": True, "visible": False}
+        (top_line,) = top.plot([], [], **style)
+        (right_line,) = right.plot([], [], **style)
+        vline = axes.axvline(0, **style)
+        hline = axes.axhline(0, **style)
+
+        return {"slices": (top_line, right_line), "crosshair": (vline, hline)}
+
+    def on_canvas_draw(self, event=None):
+        """Saves the canvas without the cursor artists after every full draw."""
+        if "crosshair" in self.artists:
+            self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        else:
+            self.background = None
+
+    def on_cursor_move(self, event):
+        """
+        Moves the crosshair to the data point closest to the mouse.
+
+        The point is found by index arithmetic on the evenly sampled time axes
+        (see nearest_index()), then only the cursor artists are drawn over the
+        saved background and blitted, so tracking keeps up with the mouse
+        whatever the size of the matrix. The values are shown in the readout.
+        """
+        if not self.parameters["cursor"] or event.inaxes == None:
+            return
+        # Over a bitmap, the cursor waits for the real axes (see build_figure())
+        if "crosshair" not in self.artists or self.background is None:
+            return
+
+        axes = self.artists["axes"]
+        if event.inaxes is not axes:
+            return self.on_cursor_leave()
+
+        x, y, z = self.data["x"], self.data["y"], self.data["z"]
+        transpose = self.transposed()
+        d1, d2 = (event.xdata, event.ydata) if transpose else (event.ydata, event.xdata)
+        r = nearest_index(y, d1)
+        c = nearest_index(x, d2)
+
+        vline, hline = self.artists["crosshair"]
+        top_line, right_line = self.artists["slices"]
+        if transpose:
+            vline.set_xdata([y[r], y[r]])
+            hline.set_ydata([x[c], x[c]])
+            top_line.set_data(y, z[:, c])
+            right_line.set_data(z[r], x)
+        else:
+            vline.set_xdata([x[c], x[c]])
+            hline.set_ydata([y[r], y[r]])
+            top_line.set_data(x, z[r])
+            right_line.set_data(z[:, c], y)
+
+        # Values go to the readout label, text rasterization would slow blitting
+        self.readout.configure(
+            text=f"Cursor: D1 {y[r]:.4g} min | D2 {x[c]:.4g} s | value {z[r, c]:.4g}"
+        )
+        self.blit_cursor(True)
+
+    def on_cursor_leave(self, event=None):
+        """Hides the crosshair when the mouse leaves the contour plot."""
+        if "crosshair" in self.artists and self.background is not None:
+            self.blit_cursor(False)
+            if self.region is not None:
+                self.update_readout(self.region)
+
+    def blit_cursor(self, visible: bool) -> None:
+        """Restores the saved canvas and draws the cursor artists over it."""
+
+        self.canvas.restore_region(self.background)
+        for artist in self.artists["crosshair"] + self.artists["slices"]:
+            artist.set_visible(visible)
+            if visible:
+                self.figure.draw_artist(artist)
+        self.canvas.blit(self.figure.bbox)
+
+    def save_animation(self) -> None:
+        """Asks for the animation parameters and queues the animation export."""
+
+        parameters = ask_animation_parameters()
+        if parameters == None or parameters["path"] == "":
+            return
+
+        cm_to_inches = 1 / 2.54
+        width = parameters["size"][0] * cm_to_inches
+        height = parameters["size"][1] * cm_to_inches
+
+        exports.animate(
+            self,
+            parameters["path"],
+            (width, height),
+            parameters["dpi"],
+            self.animation_frames(parameters["step"]),
+            parameters["duration"],
+        )
+
+    def save_html(self) -> None:
+        """Asks for a file and queues the interactive HTML export of the matrix."""
+
+        path = ask_html_path()
+        if not path:
+            return
 
-        cbar.ax.ticklabel_format(
-            axis="y", style="sci", scilimits=(-2, 4), useOffset=False
+        lo, hi = float(np.nanmin(self.data["z"])), float(np.nanmax(self.data["z"]))
+        ranges = {
+            "d1": (self.parameters["y_min"], self.parameters["y_max"]),
+            "d2": (self.parameters["x_min"], self.parameters["x_max"]),
+        }
+        ranges = {dim: view for dim, view in ranges.items() if None not in view}
+
+        exports.run(
+            self,
+            path,
+            save_html,
+            path,
+            self.data,
+            self.color_table(intensity_codes(lo, hi)),
+            lo,
+            hi,
+            ranges,
+            Path(path).stem,
         )
 
-        labels = [float(f"{tick:0<3.1e}") for tick in cbar.ax.get_yticks()]
-        cbar.ax.set_yticks(labels)
+    def color_table(self, values: np.ndarray) -> np.ndarray:
+        """
+        Returns the RGBA colors (uint8) of intensities as drawn on the plot.
 
-        return super().draw_axes()
+        Filled contours color a whole band with the color of its middle, the
+        heatmap colors every value. Values outside the levels get the extreme
+        colors.
+
+        Args:
+            values (np.ndarray): Intensities.
+
+        Returns:
+            np.ndarray: Array of shape (len(values), 4).
+        """
+
+        cmap = plt.colormaps[self.parameters["cmap"]].with_extremes(
+            under=self.parameters["color_u"], over=self.parameters["color_o"]
+        )
+        levels = self.resolve_contour({"stride": 1, "levels": None})[3]
+        norm = color_norm(self.parameters["norm"], levels, cmap.N)
+        if norm is None:
+            norm = Normalize(levels[0], levels[-1])
+
+        if not self.parameters["heatmap"]:
+            band = np.clip(np.searchsorted(levels, values) - 1, 0, len(levels) - 2)
+            middles = (levels[band] + levels[band + 1]) / 2
+            inside = (values >= levels[0]) & (values <= levels[-1])
+            values = np.where(inside, middles, values)
+
+        return cmap(norm(values), bytes=True)
+
+    def animation_frames(self, step: int = 1) -> list[int]:
+        """Returns every step-th modulation (matrix row) within the D1 zoom."""
+
+        y = self.data["y"]
+        low = y[0] if self.parameters["y_min"] == None else self.parameters["y_min"]
+        high = y[-1] if self.parameters["y_max"] == None else self.parameters["y_max"]
+        start, stop = index_range(y, low, high)
+        return list(range(start, stop, max(1, int(step))))
+
+    def draw_animation(self) -> None:
+        """
+        Draws the fixed part of the modulation playback and saves it for blitting.
+
+        The full contour plot is drawn once with the slice axes of the
+        crosshair. The frames only draw the animated artists of animate() over
+        the saved canvas: a mask hiding the modulations not acquired yet, the
+        line of the current modulation, its D2 chromatogram, the growing D1
+        profile of maxima and a label.
+        """
+
+        self.parameters["cursor"] = True
+        self.render_plan = {"stride": 1, "levels": None}
+        self.figure.clf()
+        self.draw_axes()
+
+        axes = self.artists["axes"]
+        if self.transposed():
+            transform = axes.get_xaxis_transform()
+        else:
+            transform = axes.get_yaxis_transform()
+        mask = Rectangle(
+            (0, 0),
+            0,
+            0,
+            transform=transform,
+            facecolor=axes.get_facecolor(),
+            animated=True,
+        )
+        axes.add_patch(mask)
+        label = self.figure.text(
+            0.01, 0.99, "", ha="left", va="top", fontsize=8, animated=True
+        )
+
+        self.artists.update(
+            mask=mask, label=label, profile=np.asarray(self.data["z"]).max(axis=1)
+        )
+        self.figure.canvas.draw()
+        self.background = self.figure.canvas.copy_from_bbox(self.figure.bbox)
+
+    def animate(self, index: int) -> list:
+        """
+        Moves the animated artists of draw_animation() to a modulation.
+
+        Args:
+            index (int): The modulation (matrix row).
+
+        Returns:
+            list: The artists to draw, in order.
+        """
+
+        x, y, z = self.data["x"], self.data["y"], self.data["z"]
+        profile = self.artists["profile"]
+        axes = self.artists["axes"]
+        mask = self.artists["mask"]
+        label = self.artists["label"]
+        vline, hline = self.artists["crosshair"]
+        top_line, right_line = self.artists["slices"]
+
+        if self.transposed():
+            end = max(axes.get_xlim())
+            mask.set_bounds(y[index], 0, max(end - y[index], 0), 1)
+            vline.set_xdata([y[index], y[index]])
+            top_line.set_data(y[: index + 1], profile[: index + 1])
+            right_line.set_data(z[index], x)
+            line = vline
+        else:
+            end = max(axes.get_ylim())
+            mask.set_bounds(0, y[index], 1, max(end - y[index], 0))
+            hline.set_ydata([y[index], y[index]])
+            top_line.set_data(x, z[index])
+            right_line.set_data(profile[: index + 1], y[: index + 1])
+            line = hline
+        label.set_text(f"Modulation {index + 1}/{len(y)} | D1 {y[index]:.4g} min")
+
+        artists = [mask, line, top_line, right_line, label]
+        for artist in artists:
+            artist.set_visible(True)
+        return artists
 
     def cb_highlight_clear(self, event=None):
         current = self.cmap_cb.get()
         self.cmap_cb.set("")
         self.cmap_cb.set(current)
-        self.update_figure()
+        self.redraw.flush()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from visualisation.animation_export import save_animation
+
+# Use root logger
+logger = logging.getLogger(__name__)
+
+
+class ExportQueue:
+    """
+    ExportQueue saves page figures without blocking the Tk event loop.
+
+    Every export draws an off-screen clone of the page at the export size
+    (see BaseVisualizationPage.export_clone()), so the on-screen figure is
+    never resized. Clones are drawn in the render worker processes, several
+    exports running in parallel. If the workers are unavailable, exports are
+    drawn one at a time in a background thread instead. Animations are
+    assembled in the background thread from frames drawn by the workers.
+
+    Subscribers are called with (done, total) on the Tk thread whenever an
+    export is queued or finished.
+
+    Attributes:
+        total (int): Exports queued since the queue was last idle.
+        done (int): Finished exports among them.
+    """
+
+    def __init__(self, renderer):
+        """
+        Args:
+            renderer (OffscreenRenderer): Worker pool drawing the clones.
+        """
+        self.renderer = renderer
+        self.thread = None
+        self.subscribers = []
+        self.total = 0
+        self.done = 0
+
+    def subscribe(self, callback) -> None:
+        self.subscribers.append(callback)
+
+    def submit(
+        self, page, path: str, size: tuple[float, float], dpi: int, **options
+    ) -> Future:
+        """
+        Queues the export of a page figure.
+
+        Args:
+            page (BaseVisualizationPage): The page to export.
+            path (str): Output file, its extension giving the format.
+            size (tuple): Figure size in inches (width, height).
+            dpi (int): Export resolution.
+            **options: Vector export options, see BaseVisualizationPage.save().
+
+        Returns:
+            Future: Resolves to the export time [s].
+        """
+
+        clone = page.export_clone(size, dpi)
+        try:
+            future = self.renderer.export(clone, path, options)
+        except Exception as e:
+            logger.warning(f"Offscreen export unavailable : {e}")
+            future = self.background().submit(clone.save, path, **options)
+
+        return self.track(page, future, path)
+
+    def animate(
+        self,
+        page,
+        path: str,
+        size: tuple[float, float],
+        dpi: int,
+        frames: list[int],
+        duration: int,
+    ) -> Future:
+        """
+        Queues the export of a modulation playback, see save_animation().
+
+        Args:
+            page (ContourPage): The page to animate.
+            path (str): Output file, ".gif" or ".png".
+            size (tuple): Figure size in inches (width, height).
+            dpi (int): Export resolution.
+            frames (list): Modulation of every frame.
+            duration (int): Frame duration [ms].
+
+        Returns:
+            Future: Resolves to the export time [s].
+        """
+
+        clone = page.export_clone(size, dpi)
+        return self.run(
+            page, path, save_animation, clone, path, frames, duration, self.renderer
+        )
+
+    def run(self, page, path: str, function, *args) -> Future:
+        """
+        Queues an export function in the background thread.
+
+        Args:
+            page (BaseVisualizationPage): The exported page, reporting the result.
+            path (str): Output file.
+            function: Export function returning its time [s].
+            *args: Arguments of the function.
+
+        Returns:
+            Future: Resolves to the export time [s].
+        """
+        return self.track(page, self.background().submit(function, *args), path)
+
+    def background(self) -> ThreadPoolExecutor:
+        """Returns the background thread, started on first use."""
+        if self.thread is None:
+            self.thread = ThreadPoolExecutor(max_workers=1)
+        return self.thread
+
+    def track(self, page, future: Future, path: str) -> Future:
+        """Counts a queued export and reports it when finished."""
+
+        if self.done == self.total:
+            self.done = self.total = 0
+        self.total += 1
+        self.notify()
+
+        future.add_done_callback(
+            lambda future: page.after(0, self.finish, future, path)
+        )
+        return future
+
+    def finish(self, future: Future, path: str) -> None:
+        """Reports a finished export. Runs on the Tk thread."""
+
+        self.done += 1
+        try:
+            elapsed = future.result()
+        except Exception as e:
+            logger.error(f"Figure export to {path} failed : {e}")
+        else:
+            message = f"Figure saved to {path}"
+            if elapsed is not None:
+                message += f" in {elapsed:.1f} s"
+            logger.info(f"{message}.")
+        self.notify()
+
+    def notify(self) -> None:
+        for callback in self.subscribers:
+            callback(self.done, self.total)
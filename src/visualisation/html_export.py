@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+
+import base64
+import html
+import json
+import logging
+import time
+import zlib
+
+import numpy as np
+
+from analysis.pyramid import MatrixPyramid
+
+# Use root logger
+logger = logging.getLogger(__name__)
+
+# Cells of the finest level embedded in the file
+HTML_CELLS = 1_000_000
+# Coarser levels are added down to this many cells
+MIN_HTML_CELLS = 4096
+# Intensities are stored as 16 bits codes of the full intensity range
+CODES = 2**16
+
+
+def intensity_codes(lo: float, hi: float) -> np.ndarray:
+    """Returns the intensity of every 16 bits code of the range [lo, hi]."""
+    return lo + np.arange(CODES) / (CODES - 1) * (hi - lo)
+
+
+def save_html(
+    path: str,
+    data: dict,
+    colors: np.ndarray,
+    lo: float,
+    hi: float,
+    ranges: dict,
+    title: str = "Contour",
+) -> float:
+    """
+    Saves the matrix as a single offline HTML file with an interactive viewer.
+
+    The file embeds a multi-resolution copy of the matrix: the finest level
+    is reduced to at most HTML_CELLS cells with the matrix pyramid ("max"
+    reduction, so peaks keep their height), then every coarser level halves
+    both axes. Intensities are stored as 16 bits codes, deflated and base64
+    encoded, with the RGBA color of every code, so the viewer reproduces the
+    colors of the plot. The viewer draws the coarsest level that still has a
+    point per screen pixel, with zoom (mouse wheel), pan (drag) and a value
+    readout. It uses no network resource.
+
+    Args:
+        path (str): Output file.
+        data (dict): Page data, with "x", "y", "z" and an optional "pyramid".
+        colors (np.ndarray): RGBA colors (uint8) of the CODES intensity codes.
+        lo (float): Intensity of the first code.
+        hi (float): Intensity of the last code.
+        ranges (dict): Initial (min, max) view along "d1" and "d2".
+        title (str, optional): Page title. Defaults to "Contour".
+
+    Returns:
+        float: Export time [s].
+    """
+
+    start = time.perf_counter()
+
+    pyramid = data.get("pyramid")
+    if pyramid == None:
+        pyramid = MatrixPyramid(data["z"], data["y"], data["x"])
+
+    levels = [
+        {
+            "d1": _encode(rows.astype("<f4")),
+            "d2": _encode(cols.astype("<f4")),
+            "values": _encode(_quantize(matrix, lo, hi), compress=True),
+            "shape": matrix.shape,
+        }
+        for rows, cols, matrix in html_levels(pyramid)
+    ]
+
+    payload = {
+        "title": title,
+        "levels": levels,
+        "colors": _encode(np.ascontiguousarray(colors, dtype=np.uint8), True),
+        "range": [float(lo), float(hi)],
+        "view": {dim: [float(v) for v in limits] for dim, limits in ranges.items()},
+    }
+
+    page = VIEWER_TEMPLATE.replace("/*TITLE*/", html.escape(title)).replace(
+        "/*PAYLOAD*/", json.dumps(payload)
+    )
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(page)
+
+    logger.debug(f"HTML export with {len(levels)} levels, finest {levels[0]['shape']}.")
+    return time.perf_counter() - start
+
+
+def html_levels(pyramid: MatrixPyramid) -> list[tuple]:
+    """
+    Returns the pyramid levels embedded in the file, finest first.
+
+    The finest level halves the longer axis until it holds at most HTML_CELLS
+    cells, the next ones halve both axes down to MIN_HTML_CELLS.
+    """
+
+    last_i, last_j = (depth - 1 for depth in pyramid.depth)
+    i = j = 0
+    rows, cols, matrix = pyramid.get(i, j)
+    while matrix.size > HTML_CELLS and (i < last_i or j < last_j):
+        if j < last_j and (len(cols) >= len(rows) or i == last_i):
+            j += 1
+        else:
+            i += 1
+        rows, cols, matrix = pyramid.get(i, j)
+
+    levels = [(rows, cols, matrix)]
+    while matrix.size > MIN_HTML_CELLS:
+        i = min(i + 1, last_i)
+        j = min(j + 1, last_j)
+        coarser = pyramid.get(i, j)
+        if coarser[2].shape == matrix.shape:
+            break
+        rows, cols, matrix = coarser
+        levels.append(coarser)
+
+    return levels
+
+
+def _quantize(matrix: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    """Returns the 16 bits codes of a matrix, missing values as the lowest code."""
+
+    scale = (CODES - 1) / (hi - lo) if hi > lo else 0
+    codes = np.nan_to_num((np.asarray(matrix, dtype=float) - lo) * scale)
+    return np.clip(np.rint(codes), 0, CODES - 1).astype("<u2")
+
+
+def _encode(array: np.ndarray, compress: bool = False) -> str:
+    """Returns the bytes of an array as base64, deflated if requested."""
+
+    raw = array.tobytes()
+    if compress:
+        raw = zlib.compress(raw, 9)
+    return base64.b64encode(raw).decode("ascii")
+
+
+# The viewer: levels are decoded once into images, every redraw then only
+# copies the visible part of the best level, so zooming stays fluid.
+VIEWER_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>/*TITLE*/</title>
+<style>
+  html, body { margin: 0; height: 100%; font: 12px sans-serif; }
+  body { display: flex; flex-direction: column; }
+  canvas { flex: 1; min-height: 0; width: 100%; cursor: crosshair; }
+  #bar { padding: 4px 8px; color: #555; }
+</style>
+</head>
+<body>
+<canvas id="plot"></canvas>
+<div id="bar">Wheel: zoom | Drag: pan | Double click: reset
+  <span id="readout" style="margin-left: 20px"></span></div>
+<script>
+const DATA = /*PAYLOAD*/;
+const M = { left: 70, right: 90, top: 20, bottom: 45 };
+const canvas = document.getElementById("plot");
+const readout = document.getElementById("readout");
+const ctx = canvas.getContext("2d");
+let levels = [], colors, colorbar, view, home, drag = null;
+
+function bytes(text) {
+  return Uint8Array.from(atob(text), (c) => c.charCodeAt(0));
+}
+async function inflate(text) {
+  const stream = new Blob([bytes(text)]).stream()
+    .pipeThrough(new DecompressionStream("deflate"));
+  return new Response(stream).arrayBuffer();
+}
+
+async function load() {
+  colors = new Uint32Array(await inflate(DATA.colors));
+  const strip = new ImageData(1, 256);
+  const stripPixels = new Uint32Array(strip.data.buffer);
+  for (let k = 0; k < 256; k++) {
+    stripPixels[k] = colors[Math.round((1 - k / 255) * (colors.length - 1))];
+  }
+  colorbar = await createImageBitmap(strip);
+  for (const level of DATA.levels) {
+    const [rows, cols] = level.shape;
+    const codes = new Uint16Array(await inflate(level.values));
+    // D1 along the width, D2 upwards
+    const image = new ImageData(rows, cols);
+    const pixels = new Uint32Array(image.data.buffer);
+    for (let i = 0; i < rows; i++) {
+      for (let j = 0; j < cols; j++) {
+        pixels[(cols - 1 - j) * rows + i] = colors[codes[i * cols + j]];
+      }
+    }
+    const d1 = new Float32Array(bytes(level.d1).buffer);
+    const d2 = new Float32Array(bytes(level.d2).buffer);
+    levels.push({ rows, cols, codes, d1, d2, bitmap: await createImageBitmap(image),
+      x: extent(d1), y: extent(d2) });
+  }
+  const [d1, d2] = [levels[0].x, levels[0].y];
+  home = { x: DATA.view.d1 || d1, y: DATA.view.d2 || d2 };
+  view = { x: [...home.x], y: [...home.y] };
+  draw();
+}
+
+// Cell edges of an evenly sampled axis
+function extent(axis) {
+  const n = axis.length, step = n > 1 ? (axis[n - 1] - axis[0]) / (n - 1) : 1;
+  return [axis[0] - step / 2, axis[n - 1] + step / 2];
+}
+
+function plotBox() {
+  return { x: M.left, y: M.top, w: canvas.width - M.left - M.right,
+    h: canvas.height - M.top - M.bottom };
+}
+
+function toScreen(box, x, y) {
+  return [box.x + (x - view.x[0]) / (view.x[1] - view.x[0]) * box.w,
+    box.y + (view.y[1] - y) / (view.y[1] - view.y[0]) * box.h];
+}
+
+function toData(box, px, py) {
+  return [view.x[0] + (px - box.x) / box.w * (view.x[1] - view.x[0]),
+    view.y[1] - (py - box.y) / box.h * (view.y[1] - view.y[0])];
+}
+
+// Coarsest level with at least a point per pixel, the finest one otherwise
+function pickLevel(box) {
+  for (let k = levels.length - 1; k > 0; k--) {
+    const level = levels[k];
+    const xs = level.rows * (view.x[1] - view.x[0]) / (level.x[1] - level.x[0]);
+    const ys = level.cols * (view.y[1] - view.y[0]) / (level.y[1] - level.y[0]);
+    if (xs >= box.w && ys >= box.h) return level;
+  }
+  return levels[0];
+}
+
+function ticks(low, high, count) {
+  const raw = (high - low) / count, power = Math.pow(10, Math.floor(Math.log10(raw)));
+  const step = [1, 2, 5, 10].map((f) => f * power).find((s) => s >= raw);
+  const result = [];
+  for (let t = Math.ceil(low / step) * step; t <= high; t += step) result.push(t);
+  return result.map((t) => +t.toPrecision(10));
+}
+
+function draw() {
+  canvas.width = canvas.clientWidth;
+  canvas.height = canvas.clientHeight;
+  const box = plotBox();
+  ctx.clearRect(0, 0, canvas.width, canvas.height);
+
+  // Visible part of the level, in bitmap pixels
+  const level = pickLevel(box);
+  const fx = (v) => (v - level.x[0]) / (level.x[1] - level.x[0]) * level.rows;
+  const fy = (v) => (level.y[1] - v) / (level.y[1] - level.y[0]) * level.cols;
+  const sx0 = Math.max(0, Math.floor(fx(view.x[0])));
+  const sx1 = Math.min(level.rows, Math.ceil(fx(view.x[1])));
+  const sy0 = Math.max(0, Math.floor(fy(view.y[1])));
+  const sy1 = Math.min(level.cols, Math.ceil(fy(view.y[0])));
+  if (sx1 > sx0 && sy1 > sy0) {
+    const bx = (s) => level.x[0] + s / level.rows * (level.x[1] - level.x[0]);
+    const by = (s) => level.y[1] - s / level.cols * (level.y[1] - level.y[0]);
+    const [dx0, dy0] = toScreen(box, bx(sx0), by(sy0));
+    const [dx1, dy1] = toScreen(box, bx(sx1), by(sy1));
+    ctx.save();
+    ctx.beginPath();
+    ctx.rect(box.x, box.y, box.w, box.h);
+    ctx.clip();
+    ctx.imageSmoothingEnabled = false;
+    ctx.drawImage(level.bitmap, sx0, sy0, sx1 - sx0, sy1 - sy0,
+      dx0, dy0, dx1 - dx0, dy1 - dy0);
+    ctx.restore();
+  }
+
+  // Axes
+  ctx.strokeStyle = "#000";
+  ctx.fillStyle = "#000";
+  ctx.strokeRect(box.x, box.y, box.w, box.h);
+  ctx.textAlign = "center";
+  ctx.textBaseline = "top";
+  for (const t of ticks(view.x[0], view.x[1], Math.max(2, box.w / 90))) {
+    const [px] = toScreen(box, t, 0);
+    ctx.fillRect(px, box.y + box.h, 1, 5);
+    ctx.fillText(t, px, box.y + box.h + 7);
+  }
+  ctx.fillText("D1 [min]", box.x + box.w / 2, box.y + box.h + 25);
+  ctx.textAlign = "right";
+  ctx.textBaseline = "middle";
+  for (const t of ticks(view.y[0], view.y[1], Math.max(2, box.h / 60))) {
+    const [, py] = toScreen(box, 0, t);
+    ctx.fillRect(box.x - 5, py, 5, 1);
+    ctx.fillText(t, box.x - 7, py);
+  }
+  ctx.save();
+  ctx.translate(15, box.y + box.h / 2);
+  ctx.rotate(-Math.PI / 2);
+  ctx.textAlign = "center";
+  ctx.fillText("D2 [s]", 0, 0);
+  ctx.restore();
+
+  // Colorbar of the intensity codes
+  const cb = { x: box.x + box.w + 20, y: box.y, w: 15, h: box.h };
+  ctx.imageSmoothingEnabled = false;
+  ctx.drawImage(colorbar, cb.x, cb.y, cb.w, cb.h);
+  ctx.strokeRect(cb.x, cb.y, cb.w, cb.h);
+  ctx.textAlign = "left";
+  ctx.fillText(DATA.range[1].toPrecision(3), cb.x + cb.w + 4, cb.y);
+  ctx.fillText(DATA.range[0].toPrecision(3), cb.x + cb.w + 4, cb.y + cb.h);
+}
+
+function value(x, y) {
+  const level = levels[0];
+  const i = Math.floor((x - level.x[0]) / (level.x[1] - level.x[0]) * level.rows);
+  const j = Math.floor((y - level.y[0]) / (level.y[1] - level.y[0]) * level.cols);
+  if (i < 0 || j < 0 || i >= level.rows || j >= level.cols) return null;
+  const code = level.codes[i * level.cols + j];
+  return DATA.range[0] + code / 65535 * (DATA.range[1] - DATA.range[0]);
+}
+
+canvas.addEventListener("wheel", (event) => {
+  event.preventDefault();
+  const box = plotBox();
+  const [x, y] = toData(box, event.offsetX, event.offsetY);
+  const f = Math.pow(1.15, Math.sign(event.deltaY));
+  view.x = view.x.map((v) => x + (v - x) * f);
+  view.y = view.y.map((v) => y + (v - y) * f);
+  draw();
+}, { passive: false });
+
+canvas.addEventListener("mousedown", (event) => {
+  drag = { px: event.offsetX, py: event.offsetY, x: [...view.x], y: [...view.y] };
+});
+window.addEventListener("mouseup", () => { drag = null; });
+canvas.addEventListener("dblclick", () => {
+  view = { x: [...home.x], y: [...home.y] };
+  draw();
+});
+
+canvas.addEventListener("mousemove", (event) => {
+  const box = plotBox();
+  if (drag) {
+    const dx = (event.offsetX - drag.px) / box.w * (drag.x[1] - drag.x[0]);
+    const dy = (event.offsetY - drag.py) / box.h * (drag.y[1] - drag.y[0]);
+    view.x = drag.x.map((v) => v - dx);
+    view.y = drag.y.map((v) => v + dy);
+    draw();
+  }
+  const [x, y] = toData(box, event.offsetX, event.offsetY);
+  const v = value(x, y);
+  readout.textContent = v === null ? "" :
+    `D1 ${x.toPrecision(4)} min | D2 ${y.toPrecision(4)} s | value ${v.toPrecision(4)}`;
+});
+
+window.addEventListener("resize", () => view && draw());
+load();
+</script>
+</body>
+</html>
+"""
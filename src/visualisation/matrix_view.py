@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+
+import logging
+import math
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk
+
+import numpy as np
+
+# Use root logger
+logger = logging.getLogger(__name__)
+
+
+class MatrixView(ttk.Frame):
+    """
+    MatrixView shows a numeric matrix as a table, drawing only the visible cells.
+
+    The canvas never scrolls: the scrollbars move the first row and column
+    shown, and the canvas items are refilled with the cells in view. Every
+    visible column is a single right-justified text item, so a redraw formats
+    and configures a screen of values whatever the size of the matrix.
+
+    Attributes:
+        values (np.ndarray): The matrix, rows along D1 and columns along D2.
+        row_labels (np.ndarray): D1 time of every row [min].
+        column_labels (np.ndarray): D2 time of every column [s].
+    """
+
+    FORMAT = "{:.3f}"
+    CORNER = "↓D1  D2→"
+    PADDING = 8  # horizontal space around the values [px]
+    WHEEL_ROWS = 3  # rows scrolled by a mouse wheel step
+    HEADER_COLOR = "#f0f0f0"
+
+    def __init__(self, master=None):
+        super().__init__(master)
+
+        self.values = None
+        self.row_labels = None
+        self.column_labels = None
+        self.first_row = 0
+        self.first_column = 0
+        self.items = None
+        self.pending = None
+
+        self.font = tkfont.Font(family="Calibri", size=10)
+        self.row_height = self.font.metrics("linespace")
+        self.cell_width = self.header_width = self.font.measure(self.CORNER)
+
+        self.canvas = tk.Canvas(self, background="white", highlightthickness=0)
+        self.ysb = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.xsb = ttk.Scrollbar(self, orient="horizontal", command=self.xview)
+
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.ysb.grid(row=0, column=1, sticky="ns")
+        self.xsb.grid(row=1, column=0, sticky="ew")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.canvas.bind("<Configure>", self.on_resize)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.canvas.bind(sequence, self.on_wheel)
+            self.canvas.bind(f"<Shift-{sequence[1:]}", self.on_wheel)
+        self.schedule()
+
+    def set_data(
+        self, values: np.ndarray, row_labels: np.ndarray, column_labels: np.ndarray
+    ) -> None:
+        """
+        Shows a new matrix, from its first cell.
+
+        Nothing is formatted here, so large matrices are shown at once.
+
+        Args:
+            values (np.ndarray): The matrix, of shape (rows, columns).
+            row_labels (np.ndarray): D1 time of every row [min].
+            column_labels (np.ndarray): D2 time of every column [s].
+        """
+
+        self.values = np.asarray(values)
+        self.row_labels = np.asarray(row_labels)
+        self.column_labels = np.asarray(column_labels)
+        self.first_row = self.first_column = 0
+
+        # Uniform columns, as wide as the largest value
+        def width(array):
+            largest = max(abs(np.nanmin(array)), abs(np.nanmax(array)))
+            return self.font.measure(self.FORMAT.format(-largest)) + 2 * self.PADDING
+
+        self.cell_width = max(width(self.values), width(self.column_labels))
+        self.header_width = max(
+            width(self.row_labels), self.font.measure(self.CORNER) + 2 * self.PADDING
+        )
+
+        self.items = None
+        self.schedule()
+
+    def visible_rows(self) -> int:
+        """Returns the number of rows fully visible under the header row."""
+        return max(1, (self.canvas.winfo_height() // self.row_height) - 1)
+
+    def visible_columns(self) -> int:
+        """Returns the number of columns fully visible right of the header column."""
+        space = self.canvas.winfo_width() - self.header_width
+        return max(1, space // self.cell_width)
+
+    def yview(self, *args) -> None:
+        """Scrollbar command along the rows."""
+        if self.values is not None:
+            self.first_row = self.scroll(
+                args, self.first_row, self.values.shape[0], self.visible_rows()
+            )
+            self.schedule()
+
+    def xview(self, *args) -> None:
+        """Scrollbar command along the columns."""
+        if self.values is not None:
+            self.first_column = self.scroll(
+                args, self.first_column, self.values.shape[1], self.visible_columns()
+            )
+            self.schedule()
+
+    @staticmethod
+    def scroll(args: tuple, first: int, total: int, visible: int) -> int:
+        """
+        Returns the first index shown after a scrollbar command.
+
+        Args:
+            args (tuple): ("moveto", fraction) or ("scroll", count, "units" | "pages").
+            first (int): Current first index.
+            total (int): Number of rows or columns.
+            visible (int): Number of rows or columns in view.
+        """
+
+        if args[0] == "moveto":
+            first = round(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = visible if args[2] == "pages" else 1
+            first += int(args[1]) * step
+        return max(0, min(first, total - visible))
+
+    def on_wheel(self, event) -> None:
+        # Windows reports multiples of 120, X11 sends buttons 4 and 5
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            count = -self.WHEEL_ROWS
+        else:
+            count = self.WHEEL_ROWS
+        if event.state & 0x0001:
+            self.xview("scroll", count, "units")
+        else:
+            self.yview("scroll", count, "units")
+
+    def on_resize(self, event=None) -> None:
+        self.items = None
+        self.schedule()
+
+    def schedule(self) -> None:
+        """Redraws once the pending events are handled, merging fast scrolls."""
+        if self.pending == None:
+            self.pending = self.after_idle(self.draw)
+
+    def layout(self) -> None:
+        """Creates the headers and one text item per visible column."""
+
+        self.canvas.delete("all")
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        columns = math.ceil((width - self.header_width) / self.cell_width)
+
+        self.canvas.create_rectangle(
+            0, 0, width, self.row_height, fill=self.HEADER_COLOR, outline=""
+        )
+        self.canvas.create_rectangle(
+            0, 0, self.header_width, height, fill=self.HEADER_COLOR, outline=""
+        )
+        self.canvas.create_line(0, self.row_height, width, self.row_height, fill="gray")
+        self.canvas.create_line(
+            self.header_width, 0, self.header_width, height, fill="gray"
+        )
+        self.canvas.create_text(
+            self.PADDING, 0, text=self.CORNER, anchor="nw", font=self.font
+        )
+
+        # Cells are anchored on their right edge, so numbers line up
+        options = {"anchor": "ne", "justify": "right", "font": self.font}
+        self.items = {
+            "rows": self.canvas.create_text(
+                self.header_width - self.PADDING, self.row_height, **options
+            ),
+            "headers": [],
+            "columns": [],
+        }
+        for i in range(max(columns, 0)):
+            right = self.header_width + (i + 1) * self.cell_width - self.PADDING
+            self.items["headers"].append(self.canvas.create_text(right, 0, **options))
+            self.items["columns"].append(
+                self.canvas.create_text(right, self.row_height, **options)
+            )
+
+    def draw(self) -> None:
+        """Formats the cells in view and updates the canvas items and scrollbars."""
+
+        self.pending = None
+        if self.values is None:
+            self.canvas.delete("all")
+            self.canvas.create_text(
+                self.PADDING, 0, text="No data loaded.", anchor="nw", font=self.font
+            )
+            return
+        if self.items == None:
+            self.layout()
+
+        total_rows, total_columns = self.values.shape
+        self.first_row = max(0, min(self.first_row, total_rows - self.visible_rows()))
+        self.first_column = max(
+            0, min(self.first_column, total_columns - self.visible_columns())
+        )
+
+        # One more row than fits, partly shown at the bottom
+        rows = slice(self.first_row, self.first_row + self.visible_rows() + 1)
+        start = self.first_column
+        block = self.values[rows, start : start + len(self.items["columns"])]
+
+        self.canvas.itemconfigure(
+            self.items["rows"], text=self.format(self.row_labels[rows])
+        )
+        for i, (header, column) in enumerate(
+            zip(self.items["headers"], self.items["columns"])
+        ):
+            if i < block.shape[1]:
+                label = self.FORMAT.format(self.column_labels[start + i])
+                text = self.format(block[:, i])
+            else:
+                label = text = ""
+            self.canvas.itemconfigure(header, text=label)
+            self.canvas.itemconfigure(column, text=text)
+
+        self.ysb.set(
+            self.first_row / total_rows,
+            (self.first_row + self.visible_rows()) / total_rows,
+        )
+        self.xsb.set(
+            self.first_column / total_columns,
+            (self.first_column + self.visible_columns()) / total_columns,
+        )
+
+    def format(self, values: np.ndarray) -> str:
+        """Returns the values formatted one per line."""
+        return "\n".join(map(self.FORMAT.format, values.tolist()))
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+
+import atexit
+import importlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from visualisation.animation_export import encode_frames
+
+# Use root logger
+logger = logging.getLogger(__name__)
+
+# Arrays smaller than this are pickled with the request instead of shared
+MIN_SHARED_BYTES = 1 << 16
+# Number of shared arrays kept alive, in the UI process and in every worker
+CACHE_SIZE = 16
+
+
+class SharedArrays:
+    """
+    SharedArrays copies numpy arrays to shared memory once and keeps them there.
+
+    Arrays are keyed by identity: the data dicts handed to the pages are built
+    once per processed matrix, so every render of the same data reuses the
+    same blocks and only sends their names to the workers. The least recently
+    used blocks are released when more than CACHE_SIZE arrays are shared.
+    """
+
+    def __init__(self):
+        self.blocks = OrderedDict()
+        atexit.register(self.clear)
+
+    def share(self, array: np.ndarray) -> tuple:
+        """
+        Returns the descriptor of an array in shared memory, copying it on first use.
+
+        Args:
+            array (np.ndarray): Array to share.
+
+        Returns:
+            tuple: (block name, shape, dtype string).
+        """
+
+        key = id(array)
+        if key in self.blocks:
+            self.blocks.move_to_end(key)
+            return self.blocks[key][2]
+
+        block = shared_memory.SharedMemory(create=True, size=array.nbytes)
+        np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+        descriptor = (block.name, array.shape, array.dtype.str)
+
+        # The array is referenced so that its identity cannot be reused
+        self.blocks[key] = (array, block, descriptor)
+        while len(self.blocks) > CACHE_SIZE:
+            _, (_, old, _) = self.blocks.popitem(last=False)
+            old.close()
+            old.unlink()
+
+        return descriptor
+
+    def clear(self) -> None:
+        """Releases every shared block."""
+
+        for _, block, _ in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks.clear()
+
+
+class OffscreenRenderer:
+    """
+    OffscreenRenderer draws visualization pages with Agg in worker processes.
+
+    Matplotlib holds the GIL while rendering, so threads cannot render several
+    figures at once nor keep the Tk event loop responsive during a heavy draw.
+    Workers build the page figure from the same draw_axes() code as the UI
+    (see BaseVisualizationPage.offscreen()) and send back an RGBA buffer.
+
+    Large arrays reach the workers through shared memory. Small arrays and
+    picklable objects are sent with the request.
+
+    Attributes:
+        max_workers (int): Number of worker processes.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.arrays = SharedArrays()
+        self.pool = None
+
+    def submit(self, page, plan: dict) -> Future:
+        """
+        Renders a page in a worker process at the current canvas size.
+
+        Args:
+            page (BaseVisualizationPage): The page to render.
+            plan (dict): Render plan, see BaseVisualizationPage.plan_render().
+
+        Returns:
+            Future: Resolves to (rgba, region, elapsed), see render_page().
+        """
+
+        width, height = page.canvas.get_width_height(physical=True)
+        return self.start(
+            render_page,
+            *self.payload(page),
+            page.parameters.copy(),
+            plan,
+            (width, height),
+            page.figure.dpi,
+        )
+
+    def export(self, page, path: str, options: dict | None = None) -> Future:
+        """
+        Saves a page figure in a worker process, at the page figure size and dpi.
+
+        Args:
+            page (BaseVisualizationPage): The page to save, usually an export clone.
+            path (str): Output file, its extension giving the format.
+            options (dict, optional): Keyword arguments of BaseVisualizationPage.save().
+
+        Returns:
+            Future: Resolves to the export time [s].
+        """
+
+        return self.start(
+            export_page,
+            *self.payload(page),
+            page.parameters.copy(),
+            tuple(page.figure.get_size_inches()),
+            page.figure.dpi,
+            str(path),
+            options or {},
+        )
+
+    def animate(
+        self, page, frames: list[int], fmt: str, duration: int, token
+    ) -> Future:
+        """
+        Renders and encodes animation frames of a page in a worker process.
+
+        Args:
+            page (ContourPage): The animated page, usually an export clone.
+            frames (list): Modulation of every frame.
+            fmt (str): "gif" or "png".
+            duration (int): Frame duration [ms].
+            token: Identifies the animation, so workers draw its figure only once.
+
+        Returns:
+            Future: Resolves to the encoded frames, see encode_frames().
+        """
+
+        return self.start(
+            animate_page,
+            *self.payload(page),
+            page.parameters.copy(),
+            tuple(page.figure.get_size_inches()),
+            page.figure.dpi,
+            frames,
+            fmt,
+            duration,
+            token,
+        )
+
+    def start(self, function, *args) -> Future:
+        """Runs a function in the worker pool, starting the pool on first use."""
+
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self.pool.submit(function, *args)
+
+    def payload(self, page) -> tuple[str, str, dict, dict]:
+        """
+        Returns the page class and data of a request.
+
+        Returns:
+            tuple: (module, class name, shared array descriptors, other values).
+        """
+
+        shared, sent = {}, {}
+        for key, value in page.offscreen_data().items():
+            if (
+                isinstance(value, np.ndarray)
+                and value.dtype != object
+                and value.nbytes >= MIN_SHARED_BYTES
+            ):
+                shared[key] = self.arrays.share(value)
+            else:
+                sent[key] = value
+
+        cls = type(page)
+        return (cls.__module__, cls.__name__, shared, sent)
+
+
+# Worker side state: attached blocks, one offscreen page per class and the
+# figure of the last animation
+_attached = OrderedDict()
+_pages = {}
+_animation = {}
+
+
+def _attach(descriptor: tuple) -> np.ndarray:
+    """Returns the array of a shared block, attaching it on first use."""
+
+    name, shape, dtype = descriptor
+    if name in _attached:
+        _attached.move_to_end(name)
+        return _attached[name][1]
+
+    block = shared_memory.SharedMemory(name=name)
+    array = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+    array.flags.writeable = False
+    _attached[name] = (block, array)
+
+    while len(_attached) > CACHE_SIZE:
+        _, (old, _) = _attached.popitem(last=False)
+        try:
+            old.close()
+        except BufferError:
+            # Still referenced by a cached figure, released with the process
+            pass
+
+    return array
+
+
+def render_page(
+    module: str,
+    name: str,
+    shared: dict,
+    sent: dict,
+    parameters: dict,
+    plan: dict,
+    size: tuple[int, int],
+    dpi: float,
+) -> tuple[np.ndarray, tuple | None, float]:
+    """
+    Draws a page figure with Agg. Runs in a worker process.
+
+    Args:
+        module (str): Module of the page class.
+        name (str): Name of the page class.
+        shared (dict): Data arrays as shared memory descriptors.
+        sent (dict): Other data values.
+        parameters (dict): Page parameters.
+        plan (dict): Render plan.
+        size (tuple): Canvas size in pixels (width, height).
+        dpi (float): Figure resolution.
+
+    Returns:
+        tuple: (RGBA array of shape (height, width, 4), zoom region statistics,
+            render time [s]).
+    """
+
+    start = time.perf_counter()
+
+    cls = getattr(importlib.import_module(module), name)
+    if cls not in _pages:
+        _pages[cls] = cls.offscreen()
+    page = _pages[cls]
+
+    page.data = _receive(shared, sent)
+    page.parameters = parameters
+    page.render_plan = plan
+    page.figure.set_size_inches(size[0] / dpi, size[1] / dpi)
+    page.figure.set_dpi(dpi)
+    page.figure.clf()
+    page.draw_axes()
+    page.figure.canvas.draw()
+
+    rgba = np.array(page.figure.canvas.buffer_rgba())
+    page.figure.clf()
+    page.artists = {}
+
+    return (rgba, page.region, time.perf_counter() - start)
+
+
+def export_page(
+    module: str,
+    name: str,
+    shared: dict,
+    sent: dict,
+    parameters: dict,
+    size: tuple[float, float],
+    dpi: float,
+    path: str,
+    options: dict,
+) -> float:
+    """
+    Draws a page figure at its export size and saves it. Runs in a worker process.
+
+    A new page is used for every export, so the figure used for on-screen
+    renders keeps its size.
+
+    Args:
+        module (str): Module of the page class.
+        name (str): Name of the page class.
+        shared (dict): Data arrays as shared memory descriptors.
+        sent (dict): Other data values.
+        parameters (dict): Page parameters.
+        size (tuple): Figure size in inches (width, height).
+        dpi (float): Export resolution.
+        path (str): Output file.
+        options (dict): Keyword arguments of BaseVisualizationPage.save().
+
+    Returns:
+        float: Export time [s].
+    """
+
+    start = time.perf_counter()
+
+    page = getattr(importlib.import_module(module), name).offscreen()
+    page.data = _receive(shared, sent)
+    page.parameters = parameters
+    page.figure.set_size_inches(size)
+    page.figure.set_dpi(dpi)
+    page.save(path, **options)
+
+    return time.perf_counter() - start
+
+
+def animate_page(
+    module: str,
+    name: str,
+    shared: dict,
+    sent: dict,
+    parameters: dict,
+    size: tuple[float, float],
+    dpi: float,
+    frames: list[int],
+    fmt: str,
+    duration: int,
+    token,
+) -> tuple:
+    """
+    Renders and encodes animation frames by blitting. Runs in a worker process.
+
+    The fixed part of the figure is drawn once per animation and kept for the
+    next chunks of the same animation sent to this worker.
+
+    Args:
+        module (str): Module of the page class.
+        name (str): Name of the page class.
+        shared (dict): Data arrays as shared memory descriptors.
+        sent (dict): Other data values.
+        parameters (dict): Page parameters.
+        size (tuple): Figure size in inches (width, height).
+        dpi (float): Export resolution.
+        frames (list): Modulation of every frame.
+        fmt (str): "gif" or "png".
+        duration (int): Frame duration [ms].
+        token: Identifies the animation.
+
+    Returns:
+        tuple: The encoded frames, see encode_frames().
+    """
+
+    if _animation.get("token") != token:
+        _animation.clear()
+        page = getattr(importlib.import_module(module), name).offscreen()
+        page.data = _receive(shared, sent)
+        page.parameters = parameters
+        page.figure.set_size_inches(size)
+        page.figure.set_dpi(dpi)
+        page.draw_animation()
+        _animation.update(token=token, page=page)
+
+    return encode_frames(_animation["page"], frames, fmt, duration)
+
+
+def _receive(shared: dict, sent: dict) -> dict:
+    """Rebuilds the data dict of a request."""
+
+    data = {key: _attach(descriptor) for key, descriptor in shared.items()}
+    data.update(sent)
+    return data
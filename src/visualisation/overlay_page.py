@@ -3,8 +3,13 @@
 import logging
 from tkinter import ttk
 
+import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import Normalize
+from matplotlib.widgets import SpanSelector
 
+from analysis.range_index import index_range
 from visualisation.base_page import BaseVisualizationPage, create_tooltip
 
 # Use root logger
@@ -13,6 +18,16 @@ logger = logging.getLogger(__name__)
 
 class OverlayPage(BaseVisualizationPage):
 
+    MODES = ["overlay", "waterfall"]
+    DEFAULT_PARAMETERS = {
+        "mode": "overlay",
+        "offset": None,
+        "top": None,
+    }
+    WATERFALL_OFFSET = 0.05  # default offset, as a fraction of the intensity range
+    DIMENSIONS = 1  # every modulation is kept, the stride only thins D2
+    LINKED_AXES = {"d1": ("y_min", "y_max"), "d2": ("x_min", "x_max")}
+
     def __init__(self, master):
         super().__init__(master)
 
@@ -75,6 +90,38 @@ class OverlayPage(BaseVisualizationPage):
         self.z_max = ttk.Entry(intensity_frame, width=7)
         self.z_max.grid(column=2, row=1)
 
+        display_frame = ttk.Labelframe(self.param_frame, text="Display")
+        display_frame.grid(column=1, row=0, sticky="nsew", padx=5)
+
+        help_ovl_display = ttk.Label(display_frame, image=self.help_img_tk)
+        help_ovl_display.grid(column=0, row=0, sticky="nw", padx=5)
+        create_tooltip(
+            help_ovl_display,
+            "Mode: 'overlay' draws every modulation on the same baseline, 'waterfall' stacks them with a vertical offset (in intensity units, 5% of the intensity range if empty).\nTop N: Only draw the N most intense modulations within the zoom, empty to draw all of them.\nLines are colored by D1 time.",
+        )
+
+        ttk.Label(display_frame, text="Mode", anchor="w").grid(
+            column=0, row=1, sticky="w", padx=(10, 5)
+        )
+        self.mode_cb = ttk.Combobox(
+            display_frame, values=self.MODES, state="readonly", width=9
+        )
+        self.mode_cb.set(self.parameters["mode"])
+        self.mode_cb.bind("<<ComboboxSelected>>", lambda event: self.redraw.flush())
+        self.mode_cb.grid(column=1, row=1, pady=5)
+
+        ttk.Label(display_frame, text="Offset", anchor="w").grid(
+            column=2, row=1, sticky="w", padx=(10, 5)
+        )
+        self.offset_entry = ttk.Entry(display_frame, width=7)
+        self.offset_entry.grid(column=3, row=1)
+
+        ttk.Label(display_frame, text="Top N", anchor="w").grid(
+            column=4, row=1, sticky="w", padx=(10, 5)
+        )
+        self.top_entry = ttk.Entry(display_frame, width=5)
+        self.top_entry.grid(column=5, row=1, padx=(0, 10))
+
         return super().create_parameters()
 
     def read_parameters(self):
@@ -86,17 +133,17 @@ class OverlayPage(BaseVisualizationPage):
             self.parameters["y_max"] = self.try_float(self.y_max.get())
             self.parameters["z_min"] = self.try_float(self.z_min.get())
             self.parameters["z_max"] = self.try_float(self.z_max.get())
+            self.parameters["mode"] = self.mode_cb.get()
+            self.parameters["offset"] = self.try_float(self.offset_entry.get())
+            self.parameters["top"] = self.try_float(self.top_entry.get())
 
             return super().read_parameters()
         except ValueError as e:
             logger.error(f"Invalid input : {e}")
         return
 
-    def draw_axes(self):
-
-        self.figure.add_subplot()
-        self.figure.subplots_adjust(0.1, 0.2, 0.85, 0.9)
-        axes = self.figure.axes[0]
+    def resolve_limits(self) -> None:
+        """Fills unset limits, autoscaling intensity on the zoomed region."""
 
         if self.parameters["x_min"] == None:
             self.parameters["x_min"] = self.data["x"].min()
@@ -106,26 +153,138 @@ class OverlayPage(BaseVisualizationPage):
             self.parameters["y_min"] = self.data["y"].min()
         if self.parameters["y_max"] == None:
             self.parameters["y_max"] = self.data["y"].max()
+
+        # Autoscale intensity on the zoomed region only
+        stats = self.region_stats(
+            (self.parameters["x_min"], self.parameters["x_max"]),
+            (self.parameters["y_min"], self.parameters["y_max"]),
+        )
+        self.region = stats
+
         if self.parameters["z_min"] == None:
-            self.parameters["z_min"] = self.data["z"].min()
+            self.parameters["z_min"] = stats[0]
         if self.parameters["z_max"] == None:
-            self.parameters["z_max"] = self.data["z"].max()
+            self.parameters["z_max"] = stats[1]
+
+    def reset_parameters(self):
+        self.mode_cb.set(self.DEFAULT_PARAMETERS["mode"])
+        return super().reset_parameters()
+
+    def draw_axes(self):
+
+        self.figure.add_subplot()
+        self.figure.subplots_adjust(0.1, 0.2, 0.9, 0.9)
+        axes = self.figure.axes[0]
+
+        self.resolve_limits()
 
-        axes.set_xlim(self.parameters["x_min"], self.parameters["x_max"])
-        axes.set_ylim(self.parameters["z_min"], self.parameters["z_max"])
         axes.set_xlabel("D2 [s]")
         axes.set_ylabel("Intensity")
 
-        for i, line in enumerate(self.data["z"]):
-            if (
-                self.data["y"][i] >= self.parameters["y_min"]
-                and self.data["y"][i] <= self.parameters["y_max"]
-            ):
-                axes.plot(self.data["x"], line, label=f"{self.data["y"][i]:3.1f} min")
-        box = axes.get_position()
-        axes.set_position([box.x0, box.y0, box.width * 0.8, box.height])
-        
-        if len(axes.get_lines()) <= 20:
-            axes.legend(bbox_to_anchor=(1, 1.03), loc="upper left", fontsize=8)
+        # Every modulation is kept, only D2 points are decimated for large data
+        y, x, z = self.decimate(*self.view_data(), rows=False)
+        rows = self.select_modulations(y, x, z)
+
+        # Waterfall lines are stacked in D1 order
+        offset = 0.0
+        if self.parameters["mode"] == "waterfall":
+            offset = self.parameters["offset"]
+            if offset == None:
+                span = self.parameters["z_max"] - self.parameters["z_min"]
+                offset = self.WATERFALL_OFFSET * span
+        offsets = offset * np.arange(len(rows))
+
+        # All modulations in a single artist, colored by D1 time
+        segments = np.empty((len(rows), len(x), 2))
+        segments[:, :, 0] = x
+        segments[:, :, 1] = z[rows] + offsets[:, np.newaxis]
+        lines = LineCollection(
+            segments,
+            array=y[rows],
+            cmap=plt.colormaps["viridis"],
+            norm=Normalize(self.parameters["y_min"], self.parameters["y_max"]),
+            linewidths=1,
+        )
+        axes.add_collection(lines, autolim=False)
+
+        cbar = self.figure.colorbar(lines, ax=axes, pad=0.02)
+        cbar.set_label("D1 [min]", labelpad=-5, y=1.05, rotation="horizontal")
+
+        self.artists = {
+            "axes": axes,
+            "lines": lines,
+            "stack": offsets[-1] if len(offsets) else 0.0,
+            "view": self.view_extent(),
+        }
+        self.apply_limits()
 
         return super().draw_axes()
+
+    def select_modulations(self, y, x, z) -> np.ndarray:
+        """
+        Returns the indices of the modulations to draw, in D1 order.
+
+        Modulations must be within the D1 zoom. With a "top" parameter, only
+        the most intense ones within the D2 zoom are kept.
+
+        Args:
+            y, x, z (np.ndarray): D1 times, D2 times and the matrix.
+        """
+
+        r0, r1 = index_range(y, self.parameters["y_min"], self.parameters["y_max"])
+        rows = np.arange(r0, r1)
+
+        top = int(self.parameters["top"] or 0)
+        if 0 < top < len(rows):
+            c0, c1 = index_range(x, self.parameters["x_min"], self.parameters["x_max"])
+            intensity = z[r0:r1, c0:c1].max(axis=1)
+            rows = r0 + np.sort(np.argpartition(intensity, -top)[-top:])
+
+        return rows
+
+    def apply_limits(self) -> None:
+        """Sets the axes limits, extended by the stacking of waterfall lines."""
+
+        axes = self.artists["axes"]
+        axes.set_xlim(self.parameters["x_min"], self.parameters["x_max"])
+        axes.set_ylim(
+            self.parameters["z_min"], self.parameters["z_max"] + self.artists["stack"]
+        )
+
+    def screen_pixels(self) -> tuple:
+        # Every modulation is drawn as its own line
+        return (None, self.figure.bbox.width)
+
+    def create_selector(self, axes):
+        """Dragging over the plot selects a d2 range."""
+        return SpanSelector(
+            axes,
+            lambda low, high: self.on_select_range(d2=(low, high)),
+            "horizontal",
+            useblit=True,
+            button=1,
+            minspan=np.ptp(axes.get_xlim()) / 200,
+            props={"facecolor": "gray", "alpha": 0.2},
+        )
+
+    def update_artists(self, changed: set) -> bool:
+        """
+        Applies D2 and intensity zoom changes in place. D1 limits and the
+        display settings select the drawn modulations, so they rebuild the figure.
+        """
+        live = {"x_min", "x_max", "z_min", "z_max"}
+        if not changed <= live or self.render_plan.get("preview"):
+            return False
+        if self.parameters["mode"] == "waterfall" or self.parameters["top"]:
+            # Offsets and the top modulations depend on the zoom
+            return False
+
+        self.resolve_limits()
+        if not self.covers_zoom(self.artists["view"]):
+            # The zoom needs another pyramid level or crop
+            return False
+
+        self.update_readout(self.region)
+        self.apply_limits()
+
+        return True
@@ -4,7 +4,10 @@ import logging
 from tkinter import ttk
 
 import numpy as np
+from matplotlib.widgets import SpanSelector
 
+from analysis.decimation import DECIMATION_METHODS, decimate_range
+from analysis.range_index import index_range
 from visualisation.base_page import BaseVisualizationPage, create_tooltip
 
 # Use root logger
@@ -13,6 +16,13 @@ logger = logging.getLogger(__name__)
 
 class RawPage(BaseVisualizationPage):
 
+    DEFAULT_PARAMETERS = {
+        "decimation": "lttb",
+    }
+    POINTS_PER_PIXEL = 2  # points drawn per pixel column of the canvas
+    DIMENSIONS = 1  # the render stride only thins the trace
+    LINKED_AXES = {"d1": ("x_min", "x_max")}
+
     def __init__(self, master):
         super().__init__(master)
 
@@ -68,11 +78,34 @@ class RawPage(BaseVisualizationPage):
             self.param_frame,
             style="Switch.TCheckbutton",
             text="Injection marks",
-            command=self.update_figure,
+            command=self.redraw.flush,
         )
         self.sampling_toggle.state(["!alternate"])
         self.sampling_toggle.grid(column=1, row=0, sticky="nw", padx=5, pady=5)
 
+        decimation_frame = ttk.Frame(self.param_frame)
+        decimation_frame.grid(column=2, row=0, sticky="nw", padx=5, pady=5)
+        ttk.Label(decimation_frame, text="Downsampling", anchor="w").pack(
+            side="left", padx=(0, 5)
+        )
+        self.decimation_cb = ttk.Combobox(
+            decimation_frame,
+            values=DECIMATION_METHODS + ["none"],
+            state="readonly",
+            width=7,
+        )
+        self.decimation_cb.pack(side="left")
+        self.decimation_cb.set(self.parameters["decimation"])
+        self.decimation_cb.bind(
+            "<<ComboboxSelected>>", lambda event: self.redraw.flush()
+        )
+        help_raw_decimation = ttk.Label(decimation_frame, image=self.help_img_tk)
+        help_raw_decimation.pack(side="left", padx=5)
+        create_tooltip(
+            help_raw_decimation,
+            "Downsampling: Only a few points per pixel of the visible time range are drawn, and they are recomputed when zooming. 'lttb' keeps the visual shape of the trace, 'minmax' keeps the exact extremes of every pixel column, 'none' draws every point.",
+        )
+
         return super().create_parameters()
 
     def read_parameters(self):
@@ -83,12 +116,17 @@ class RawPage(BaseVisualizationPage):
             self.parameters["y_min"] = self.try_float(self.y_min.get())
             self.parameters["y_max"] = self.try_float(self.y_max.get())
             self.parameters["sampling"] = self.sampling_toggle.instate(["selected"])
+            self.parameters["decimation"] = self.decimation_cb.get()
 
             return super().read_parameters()
         except ValueError as e:
             logger.error(f"Invalid input : {e}")
         return
 
+    def reset_parameters(self):
+        self.decimation_cb.set(self.DEFAULT_PARAMETERS["decimation"])
+        return super().reset_parameters()
+
     def draw_axes(self):
 
         self.figure.add_subplot()
@@ -109,11 +147,93 @@ class RawPage(BaseVisualizationPage):
         axes.set_xlabel("D1 [min]")
         axes.set_ylabel("Intensity")
 
-        axes.plot(self.data["x"], self.data["y"])
-        
-        if self.parameters["sampling"]:
-            # Draw vertical lines for injection marks
-            for mark in self.data["marks"]:
-                axes.axvline(mark, color="lightgray", linestyle="--", linewidth=0.5)
+        (line,) = axes.plot(*self.visible_trace(axes.get_xlim()))
+
+        # Injection marks as a single collection, hidden unless sampling is shown
+        marks = axes.vlines(
+            self.data["marks"],
+            0,
+            1,
+            transform=axes.get_xaxis_transform(),
+            colors="lightgray",
+            linestyles="--",
+            linewidths=0.5,
+            visible=self.parameters["sampling"],
+        )
+
+        # The trace is downsampled again for every new time range
+        axes.callbacks.connect("xlim_changed", self.on_xlim_changed)
+        self.artists = {"axes": axes, "line": line, "marks": marks}
 
         return super().draw_axes()
+
+    def visible_trace(self, limits: tuple[float, float]) -> tuple:
+        """
+        Returns the trace downsampled for a time range and the canvas width.
+
+        Reduced renders (previews) lower the point budget by the render plan
+        stride, so "minmax" still keeps the extremes of every drawn bucket.
+        Without downsampling, they use "minmax" over the visible points.
+
+        Args:
+            limits (tuple): Visible (min, max) D1 range.
+        """
+
+        method = self.parameters["decimation"]
+        points = self.POINTS_PER_PIXEL * int(self.figure.bbox.width)
+        stride = self.render_plan["stride"]
+        if stride > 1:
+            if method == "none":
+                start, stop = index_range(self.data["x"], *limits)
+                points, method = stop - start, "minmax"
+            points = max(self.MIN_POINTS, points // stride)
+
+        return decimate_range(self.data["x"], self.data["y"], limits, points, method)
+
+    def on_xlim_changed(self, axes) -> None:
+        if "line" in self.artists:
+            self.artists["line"].set_data(*self.visible_trace(axes.get_xlim()))
+
+    def render_work(self) -> tuple[int, int]:
+        """Only the downsampled trace is drawn."""
+
+        points = len(self.data["y"])
+        if self.parameters.get("decimation", "none") != "none":
+            points = min(points, self.POINTS_PER_PIXEL * int(self.figure.bbox.width))
+        return (points, 1)
+
+    def create_selector(self, axes):
+        """Dragging over the plot selects a d1 range."""
+        return SpanSelector(
+            axes,
+            lambda low, high: self.on_select_range(d1=(low, high)),
+            "horizontal",
+            useblit=True,
+            button=1,
+            minspan=np.ptp(axes.get_xlim()) / 200,
+            props={"facecolor": "gray", "alpha": 0.2},
+        )
+
+    def update_artists(self, changed: set) -> bool:
+        """Applies zoom, downsampling and sampling mark changes in place."""
+
+        live = {"x_min", "x_max", "y_min", "y_max", "sampling", "decimation"}
+        if not changed <= live or self.render_plan.get("preview"):
+            return False
+
+        if self.parameters["x_min"] == None:
+            self.parameters["x_min"] = self.data["x"].min()
+        if self.parameters["x_max"] == None:
+            self.parameters["x_max"] = self.data["x"].max()
+        if self.parameters["y_min"] == None:
+            self.parameters["y_min"] = self.data["y"].min()
+        if self.parameters["y_max"] == None:
+            self.parameters["y_max"] = self.data["y"].max()
+
+        axes = self.artists["axes"]
+        axes.set_xlim(self.parameters["x_min"], self.parameters["x_max"], emit=False)
+        axes.set_ylim(self.parameters["y_min"], self.parameters["y_max"])
+        self.on_xlim_changed(axes)
+        self.artists["marks"].set_visible(self.parameters["sampling"])
+
+        return True
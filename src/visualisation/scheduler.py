@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+import logging
+
+# Use root logger
+logger = logging.getLogger(__name__)
+
+
+class RedrawScheduler:
+    """
+    RedrawScheduler coalesces redraw requests on a Tk widget.
+
+    Every request restarts a short timer, so a burst of requests (typing in an
+    entry, dragging the window border) results in a single call once the burst
+    is over. The callback reads the current state when it runs, so only the
+    newest parameters are ever drawn and superseded requests are simply dropped.
+
+    Attributes:
+        widget (tk.Misc): Widget providing the Tk event loop (after/after_cancel).
+        callback (callable): Function called without arguments to redraw.
+        delay (int): Quiet period before the callback runs [ms].
+    """
+
+    def __init__(self, widget, callback, delay: int = 400):
+        self.widget = widget
+        self.callback = callback
+        self.delay = delay
+        self.pending = None
+
+    def request(self) -> None:
+        """Schedules a redraw, replacing any pending one."""
+
+        self.cancel()
+        self.pending = self.widget.after(self.delay, self._fire)
+
+    def flush(self) -> None:
+        """Runs the redraw now, dropping any pending request."""
+
+        self.cancel()
+        self.callback()
+
+    def cancel(self) -> None:
+        """Drops the pending request, if any."""
+
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+            self.pending = None
+
+    def _fire(self) -> None:
+        self.pending = None
+        try:
+            self.callback()
+        except Exception as e:
+            logger.error(f"Redraw failed : {e}")
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+
+import logging
+import struct
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from matplotlib import cbook
+from matplotlib.backend_bases import GraphicsContextBase
+from matplotlib.backends.backend_agg import RendererAgg
+from matplotlib.transforms import Affine2D
+
+# Use root logger
+logger = logging.getLogger(__name__)
+
+# Memory allowed for one rendered band [bytes]
+BAND_BYTES = 64 * 2**20
+TILED_FORMATS = [".png", ".tif", ".tiff"]
+
+
+def save_tiled(figure, path: str, dpi: float, band_bytes: int = BAND_BYTES) -> None:
+    """
+    Saves a figure as PNG or TIFF by rendering it in horizontal bands.
+
+    Every band is drawn by the same band sized renderer, which translates the
+    drawing calls of the full image, then streamed to the file. The figure is
+    laid out once at its full size, so the bands join exactly as in a single
+    savefig() image. Peak memory depends on the image width and band_bytes,
+    not on the image height.
+
+    Args:
+        figure (Figure): The figure to save, at its final size.
+        path (str): Output file, ".png", ".tif" or ".tiff".
+        dpi (float): Export resolution.
+        band_bytes (int, optional): Memory allowed for one band. Defaults to BAND_BYTES.
+    """
+
+    suffix = Path(path).suffix.lower()
+    if suffix not in TILED_FORMATS:
+        raise ValueError(f"Tiled export does not support '{suffix}' files.")
+
+    with cbook._setattr_cm(figure, dpi=dpi):
+        # Agg truncates the figure size to whole pixels
+        width, height = (int(size) for size in figure.bbox.size)
+        rows = max(1, min(height, band_bytes // (4 * width)))
+        renderer = BandRenderer(width, rows, height, dpi)
+
+        writer_class = PngWriter if suffix == ".png" else TiffWriter
+        with writer_class(path, width, height, rows) as writer:
+            for top in range(0, height, rows):
+                renderer.render(figure, top)
+                band = np.asarray(renderer.buffer_rgba())
+                writer.write(band[: min(rows, height - top)])
+
+    logger.debug(f"Figure saved in {-(-height // rows)} bands of {rows} rows.")
+
+
+class BandRenderer(RendererAgg):
+    """
+    BandRenderer is an Agg renderer for a horizontal band of a taller image.
+
+    Artists draw in the display coordinates of the full image, and every
+    drawing call is translated down to the band, clip boxes included, so no
+    layout depends on the band. Text is placed in whole pixels of the full
+    image, as in a single image, then moved up to the band.
+    """
+
+    def __init__(self, width: int, rows: int, height: int, dpi: float):
+        """
+        Args:
+            width (int): Image width in pixels.
+            rows (int): Number of rows of a band.
+            height (int): Image height in pixels.
+            dpi (float): Export resolution.
+        """
+        super().__init__(width, rows, dpi)
+        self.image_height = height
+        self.top = 0
+        self.shift = 0
+        self.offset = Affine2D()
+
+    def _update_methods(self):
+        # The base class binds the Agg drawing methods over the ones below
+        self.copy_from_bbox = self._renderer.copy_from_bbox
+
+    def render(self, figure, top: int) -> None:
+        """
+        Draws the figure rows from top down, counted from the top edge, in
+        the buffer.
+        """
+        self.top = top
+        # Agg counts the buffer rows down from its own height
+        self.shift = self.height + top - self.image_height
+        self.offset = Affine2D().translate(0, self.shift)
+        self.clear()
+        figure.draw(self)
+
+    def get_canvas_width_height(self) -> tuple[float, float]:
+        return (self.width, self.image_height)
+
+    def band_gc(self, gc) -> "BandGraphicsContext":
+        return BandGraphicsContext(gc, self.offset)
+
+    def draw_path(self, gc, path, transform, rgbFace=None):
+        gc = self.band_gc(gc)
+        if rgbFace is None and not path.should_simplify:
+            rgbFace = gc.unclipped_face()
+        super().draw_path(gc, path, transform + self.offset, rgbFace)
+
+    def draw_markers(self, gc, marker_path, marker_trans, path, trans, rgbFace=None):
+        self._renderer.draw_markers(
+            self.band_gc(gc),
+            marker_path,
+            marker_trans,
+            path,
+            trans + self.offset,
+            rgbFace,
+        )
+
+    def draw_path_collection(
+        self, gc, master_transform, paths, all_transforms, offsets, offset_trans, *args
+    ):
+        gc = self.band_gc(gc)
+        # Offsets are added after every path transform
+        if len(offsets):
+            offset_trans = offset_trans + self.offset
+        else:
+            offsets, offset_trans = np.zeros((1, 2)), self.offset
+        facecolors, *args = args
+        face = gc.unclipped_face() if len(facecolors) == 0 else None
+        if face is not None:
+            facecolors = np.array([face])
+        self._renderer.draw_path_collection(
+            gc,
+            master_transform,
+            paths,
+            all_transforms,
+            offsets,
+            offset_trans,
+            facecolors,
+            *args,
+        )
+
+    def draw_quad_mesh(self, gc, master_transform, *args):
+        self._renderer.draw_quad_mesh(
+            self.band_gc(gc), master_transform + self.offset, *args
+        )
+
+    def draw_gouraud_triangles(self, gc, triangles_array, colors_array, transform):
+        self._renderer.draw_gouraud_triangles(
+            self.band_gc(gc), triangles_array, colors_array, transform + self.offset
+        )
+
+    def draw_image(self, gc, x, y, im):
+        self._renderer.draw_image(self.band_gc(gc), x, y + self.shift, im)
+
+    def draw_text(self, gc, x, y, s, prop, angle, ismath=False, mtext=None):
+        with self.text_in_band():
+            super().draw_text(self.band_gc(gc), x, y, s, prop, angle, ismath, mtext)
+
+    def draw_tex(self, gc, x, y, s, prop, angle, *, mtext=None):
+        with self.text_in_band():
+            super().draw_tex(self.band_gc(gc), x, y, s, prop, angle, mtext=mtext)
+
+    @contextmanager
+    def text_in_band(self):
+        """Moves the text images, rounded on the full image, up to the band."""
+        agg = self._renderer
+        self._renderer = BandText(agg, self.top)
+        try:
+            yield
+        finally:
+            self._renderer = agg
+
+
+class BandText:
+    """Forwards text images to an Agg renderer, a number of rows higher."""
+
+    def __init__(self, renderer, top: int):
+        self.renderer = renderer
+        self.top = top
+
+    def draw_text_image(self, image, x, y, angle, gc) -> None:
+        self.renderer.draw_text_image(image, x, y - self.top, angle, gc)
+
+
+class BandGraphicsContext(GraphicsContextBase):
+    """A copy of a graphics context with its clip box and path translated."""
+
+    def __init__(self, gc, offset: Affine2D):
+        super().__init__()
+        self.copy_properties(gc)
+        self.offset = offset
+        if self._cliprect is not None:
+            self._cliprect = self._cliprect.transformed(offset)
+
+    def unclipped_face(self) -> tuple | None:
+        """
+        Returns an invisible face for a stroked path, or None with a hatch.
+
+        Agg clips the strokes of unfilled paths to the buffer, which moves
+        their ends and turns the joins of closed outlines into caps in every
+        band they cross. Filled paths are not clipped, and a transparent face
+        draws nothing, as long as the alpha of the context is not forced on it.
+        """
+        if self.get_hatch_path() is not None:
+            return None
+        self._forced_alpha = False
+        return (0.0, 0.0, 0.0, 0.0)
+
+    def get_clip_path(self):
+        path, transform = super().get_clip_path()
+        if path is None:
+            return (None, None)
+        return (path, transform + self.offset)
+
+
+class PngWriter:
+    """
+    PngWriter writes an 8-bit RGBA PNG file band by band.
+
+    Rows are deflated as they arrive, so only the compressor state is held.
+    """
+
+    def __init__(self, path: str, width: int, height: int, rows: int):
+        self.file = open(path, "wb")
+        self.compressor = zlib.compressobj(6)
+
+        self.file.write(b"\x89PNG\r\n\x1a\n")
+        self.chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        try:
+            if exc[0] is None:
+                self.chunk(b"IDAT", self.compressor.flush())
+                self.chunk(b"IEND", b"")
+        finally:
+            self.file.close()
+
+    def chunk(self, kind: bytes, data: bytes) -> None:
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(kind + data)
+        self.file.write(struct.pack(">I", zlib.crc32(kind + data)))
+
+    def write(self, band: np.ndarray) -> None:
+        """Appends RGBA rows of shape (rows, width, 4)."""
+
+        # Every row starts with its filter type, 0 for none
+        rows = np.zeros((band.shape[0], band.shape[1] * 4 + 1), dtype=np.uint8)
+        rows[:, 1:] = band.reshape(band.shape[0], -1)
+        data = self.compressor.compress(rows)
+        if data:
+            self.chunk(b"IDAT", data)
+
+
+class TiffWriter:
+    """
+    TiffWriter writes an uncompressed RGBA baseline TIFF file band by band.
+
+    Strips are uncompressed, so their offsets are known beforehand and the
+    header is written first. Files are limited to 4 GB (no BigTIFF).
+    """
+
+    def __init__(self, path: str, width: int, height: int, rows: int):
+        strip_count = -(-height // rows)
+        strip_bytes = [
+            4 * width * min(rows, height - i * rows) for i in range(strip_count)
+        ]
+        if 4 * width * height > 2**32 - 2**20:
+            raise ValueError("TIFF export is limited to 4 GB, export as PNG instead.")
+
+        # Header, IFD, then the out-of-line tag values, then the strips
+        entries = 11
+        ifd_size = 2 + 12 * entries + 4
+        bits_offset = 8 + ifd_size
+        offsets_offset = bits_offset + 8
+        counts_offset = offsets_offset + 4 * strip_count
+        data_offset = counts_offset + 4 * strip_count
+        strip_offsets = data_offset + np.cumsum([0] + strip_bytes[:-1])
+
+        def tag(code, kind, count, value):
+            # Types 3 (SHORT) and 4 (LONG), values up to 4 bytes are inlined
+            if kind == 3 and count == 1:
+                return struct.pack("<HHIHH", code, kind, count, value, 0)
+            return struct.pack("<HHII", code, kind, count, value)
+
+        self.file = open(path, "wb")
+        self.file.write(b"II*\x00" + struct.pack("<I", 8))
+        self.file.write(struct.pack("<H", entries))
+        self.file.write(tag(256, 4, 1, width))  # ImageWidth
+        self.file.write(tag(257, 4, 1, height))  # ImageLength
+        self.file.write(tag(258, 3, 4, bits_offset))  # BitsPerSample
+        self.file.write(tag(259, 3, 1, 1))  # Compression: none
+        self.file.write(tag(262, 3, 1, 2))  # PhotometricInterpretation: RGB
+        self.file.write(
+            tag(273, 4, strip_count, offsets_offset)
+            if strip_count > 1
+            else tag(273, 4, 1, int(strip_offsets[0]))
+        )  # StripOffsets
+        self.file.write(tag(277, 3, 1, 4))  # SamplesPerPixel
+        self.file.write(tag(278, 4, 1, rows))  # RowsPerStrip
+        self.file.write(
+            tag(279, 4, strip_count, counts_offset)
+            if strip_count > 1
+            else tag(279, 4, 1, strip_bytes[0])
+        )  # StripByteCounts
+        self.file.write(tag(284, 3, 1, 1))  # PlanarConfiguration: contiguous
+        self.file.write(tag(338, 3, 1, 2))  # ExtraSamples: unassociated alpha
+        self.file.write(struct.pack("<I", 0))
+
+        self.file.write(struct.pack("<4H", 8, 8, 8, 8))
+        self.file.write(struct.pack(f"<{strip_count}I", *strip_offsets))
+        self.file.write(struct.pack(f"<{strip_count}I", *strip_bytes))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.file.close()
+
+    def write(self, band: np.ndarray) -> None:
+        """Appends RGBA rows of shape (rows, width, 4), one strip per band."""
+        self.file.write(np.ascontiguousarray(band, dtype=np.uint8))
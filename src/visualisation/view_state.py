@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+import logging
+
+# Use root logger
+logger = logging.getLogger(__name__)
+
+
+class ViewState:
+    """
+    ViewState holds the zoom ranges shared by the visualization pages.
+
+    Ranges are stored per dimension ("d1" for the first dimension retention
+    time, "d2" for the second one) as (min, max) tuples, where None stands
+    for the full data range. Pages subscribe a callback and publish their own
+    ranges. Subscribers are only notified of the ranges that actually changed,
+    so a page applying a range it received and publishing it back does not
+    bounce it between pages.
+
+    Attributes:
+        ranges (dict): Current (min, max) range of every published dimension.
+    """
+
+    def __init__(self):
+        self.ranges = {}
+        self.subscribers = []
+
+    def subscribe(self, callback) -> None:
+        """
+        Registers a callback called as callback(source, ranges) on every change.
+
+        Args:
+            callback (callable): Receives the publishing object and the changed ranges.
+        """
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback) -> None:
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def publish(self, source, ranges: dict) -> None:
+        """
+        Updates the shared ranges and notifies the subscribers of the changed ones.
+
+        Args:
+            source: The publishing page, passed on to the subscribers.
+            ranges (dict): (min, max) ranges by dimension.
+        """
+
+        changed = {
+            dim: tuple(limits)
+            for dim, limits in ranges.items()
+            if self.ranges.get(dim, (None, None)) != tuple(limits)
+        }
+        if not changed:
+            return
+
+        self.ranges.update(changed)
+        logger.debug(f"View ranges changed: {changed}")
+
+        for callback in list(self.subscribers):
+            try:
+                callback(source, changed)
+            except Exception as e:
+                logger.error(f"Linked view update failed : {e}")
@@ -2,11 +2,15 @@
 
 import logging
 import tkinter as tk
+from collections import OrderedDict
 from tkinter import ttk
 
 import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.colors import Normalize
 
+from analysis.normalization import NORMS, color_norm
+from analysis.range_index import index_range
 from visualisation.base_page import BaseVisualizationPage, create_tooltip
 
 # Use root logger
@@ -37,11 +41,19 @@ class XYZPage(BaseVisualizationPage):
     DEFAULT_PARAMETERS = {
         "cmap": "jet",
         "lines": 100,
+        "norm": "linear",
+        "clip": 0,
+        "surface": False,
+        "elev": 25,
+        "azim": 245,
     }
+    SURFACE_POLYGONS = 40_000  # polygon budget of the surface mode
+    MESH_CACHE_SIZE = 4
+    # No selector: dragging rotates the 3D view
+    LINKED_AXES = {"d1": ("y_min", "y_max"), "d2": ("x_min", "x_max")}
 
     def __init__(self, master):
         super().__init__(master)
-        self.parameters = self.DEFAULT_PARAMETERS.copy()
 
         self.create_parameters()
 
@@ -110,7 +122,7 @@ class XYZPage(BaseVisualizationPage):
         help_xyz_colors = ttk.Label(colors_frame, image=self.help_img_tk)
         create_tooltip(
             help_xyz_colors,
-            "Colormap: The color scale that will be used to represent Intensity values\nLevels count: Higher count provides better resolution for sharp changes in intensity, but will make image drawing slower. A value of 100 is provided by default.",
+            "Colormap: The color scale that will be used to represent Intensity values\nLevels count: Higher count provides better resolution for sharp changes in intensity, but will make image drawing slower. A value of 100 is provided by default.\nScale: Spacing of the levels (square root, logarithmic or histogram-equalized scales reveal small peaks next to a huge one)\nClip: Percentage of the most and least intense points left out of the default Intensity range",
         )
         help_xyz_colors.grid(column=0, row=0, sticky="nw")
 
@@ -137,9 +149,60 @@ class XYZPage(BaseVisualizationPage):
         self.line_count.insert(0, self.parameters["lines"])
         self.line_count.grid(column=3, row=2, padx=(10, 0))
 
+        ttk.Label(colors_frame, text="Scale", width=10, anchor="w").grid(
+            column=4, row=1, sticky="w", padx=(10, 0)
+        )
+        self.norm_cb = ttk.Combobox(
+            colors_frame, values=NORMS, state="readonly", width=9
+        )
+        self.norm_cb.grid(column=4, row=2, padx=(10, 0))
+        self.norm_cb.set(self.parameters["norm"])
+        self.norm_cb.bind("<<ComboboxSelected>>", self.cb_highlight_clear)
+
+        ttk.Label(colors_frame, text="Clip [%]", width=8, anchor="w").grid(
+            column=5, row=1, sticky="w", padx=(10, 0)
+        )
+        self.clip_entry = ttk.Entry(colors_frame, width=6)
+        self.clip_entry.insert(0, self.parameters["clip"])
+        self.clip_entry.grid(column=5, row=2, padx=(10, 0))
+
         self.cmap_cb.current(self.CMAP_LIST.index(self.parameters["cmap"]))
         self.cmap_cb.bind("<<ComboboxSelected>>", self.cb_highlight_clear)
 
+        self.surface_toggle = ttk.Checkbutton(
+            self.param_frame,
+            style="Switch.TCheckbutton",
+            text="Fast surface",
+            command=self.redraw.flush,
+        )
+        self.surface_toggle.state(["!alternate"])
+        self.surface_toggle.grid(column=0, row=1, sticky="sw")
+        create_tooltip(
+            self.surface_toggle,
+            "Draws the data as a colored surface instead of 3D contour lines. The surface is reduced to a fixed number of polygons (keeping the maximum of each block), so it stays fast to draw and rotate on large data.",
+        )
+
+        view_frame = ttk.Frame(self.param_frame)
+        view_frame.grid(column=1, row=1, sticky="sw", padx=5)
+        ttk.Label(view_frame, text="Elevation", anchor="w").pack(
+            side="left", padx=(0, 5)
+        )
+        self.elev_entry = ttk.Entry(view_frame, width=5)
+        self.elev_entry.insert(0, self.parameters["elev"])
+        self.elev_entry.pack(side="left")
+        ttk.Label(view_frame, text="Azimuth", anchor="w").pack(
+            side="left", padx=(10, 5)
+        )
+        self.azim_entry = ttk.Entry(view_frame, width=5)
+        self.azim_entry.insert(0, self.parameters["azim"])
+        self.azim_entry.pack(side="left")
+        help_xyz_view = ttk.Label(view_frame, image=self.help_img_tk)
+        help_xyz_view.pack(side="left", padx=5)
+        create_tooltip(
+            help_xyz_view,
+            "Elevation, Azimuth: Viewing angles of the 3D plot in degrees. The plot can also be rotated with the mouse.",
+        )
+
         return super().create_parameters()
 
     def read_parameters(self):
@@ -153,6 +216,19 @@ class XYZPage(BaseVisualizationPage):
             self.parameters["z_max"] = self.try_float(self.z_max.get())
             self.parameters["cmap"] = self.cmap_cb.get()
             self.parameters["lines"] = self.try_float(self.line_count.get())
+            self.parameters["norm"] = self.norm_cb.get()
+            self.parameters["clip"] = self.try_float(self.clip_entry.get())
+            self.parameters["surface"] = self.surface_toggle.instate(["selected"])
+            self.parameters["elev"] = self.try_float(self.elev_entry.get())
+            self.parameters["azim"] = self.try_float(self.azim_entry.get())
+
+            if self.parameters["lines"] == None:
+                self.parameters["lines"] = 100
+                self.line_count.insert(0, "100")
+            for key, entry in [("elev", self.elev_entry), ("azim", self.azim_entry)]:
+                if self.parameters[key] == None:
+                    self.parameters[key] = self.DEFAULT_PARAMETERS[key]
+                    entry.insert(0, str(self.parameters[key]))
 
             return super().read_parameters()
         except ValueError as e:
@@ -161,15 +237,67 @@ class XYZPage(BaseVisualizationPage):
 
     def reset_parameters(self):
         self.cmap_cb.current(self.CMAP_LIST.index(self.DEFAULT_PARAMETERS["cmap"]))
+        self.norm_cb.set(self.DEFAULT_PARAMETERS["norm"])
         return super().reset_parameters()
 
+    def init_state(self):
+        super().init_state()
+        self.mesh_cache = OrderedDict()
+
     def draw_axes(self):
 
         self.figure.add_subplot(projection="3d")
         self.figure.subplots_adjust(-0.3, 0.1, 0.9, 0.9)
         axes = self.figure.axes[0]
 
-        cmap = plt.colormaps[self.cmap_cb.get()]
+        cmap = plt.colormaps[self.parameters["cmap"]]
+        levels = self.resolve_levels()
+
+        # Crop to the zoom through index ranges on the sorted axes
+        y, x, z = self.view_data()
+        r0, r1 = index_range(y, self.parameters["y_min"], self.parameters["y_max"])
+        c0, c1 = index_range(x, self.parameters["x_min"], self.parameters["x_max"])
+
+        axes.set_xlim(self.parameters["x_min"], self.parameters["x_max"])
+        axes.set_ylim(self.parameters["y_min"], self.parameters["y_max"])
+        axes.set_zlim(self.parameters["z_min"], self.parameters["z_max"])
+        axes.set_xlabel("D2 [s]")
+        axes.set_ylabel("D1 [min]")
+        axes.set_zlabel("Intensity")
+
+        axes.view_init(elev=self.parameters["elev"], azim=self.parameters["azim"])
+
+        if self.parameters["surface"]:
+            mesh_x, mesh_y, mesh_z = self.surface_mesh(y, x, z, (r0, r1, c0, c1))
+            cs = axes.plot_surface(
+                mesh_x,
+                mesh_y,
+                mesh_z,
+                rstride=1,
+                cstride=1,
+                cmap=cmap,
+                norm=self.surface_norm(levels, cmap),
+                linewidth=0,
+                antialiased=False,
+                axlim_clip=True,
+            )
+        else:
+            y, x, z = self.decimate(y[r0:r1], x[c0:c1], z[r0:r1, c0:c1])
+            norm = color_norm(self.parameters["norm"], levels, cmap.N)
+            cs = axes.contour(x, y, z, levels, cmap=cmap, norm=norm)
+
+        cbar = self.figure.colorbar(cs, pad=0.1)
+        self.format_colorbar(cbar)
+
+        self.artists = {"axes": axes, "mappable": cs, "colorbar": cbar}
+
+        return super().draw_axes()
+
+    def resolve_levels(self) -> np.ndarray:
+        """
+        Fills unset limits, autoscaling intensity on the zoomed region, and
+        returns the contour levels.
+        """
 
         if self.parameters["x_min"] == None:
             self.parameters["x_min"] = self.data["x"].min()
@@ -179,61 +307,141 @@ class XYZPage(BaseVisualizationPage):
             self.parameters["y_min"] = self.data["y"].min()
         if self.parameters["y_max"] == None:
             self.parameters["y_max"] = self.data["y"].max()
-        if self.parameters["z_min"] == None:
-            self.parameters["z_min"] = self.data["z"].min()
-        if self.parameters["z_max"] == None:
-            self.parameters["z_max"] = self.data["z"].max()
-        if self.parameters["lines"] == None:
-            self.parameters["lines"] = 100
-            self.line_count.delete(0, "end")
-            self.line_count.insert(0, "100")
-
-
-        # Since we need to crop data in 3d projection, we copy
-        # it first to avoid modifying the original data
-        data = self.data.copy()
 
-        data["x"] = data["x"][data["x"] <= self.parameters["x_max"]]
-        data["z"] = data["z"][:, : len(data["x"])]
-        data["x"] = data["x"][data["x"] >= self.parameters["x_min"]]
-        data["z"] = data["z"][:, -len(data["x"]) :]
-
-        data["y"] = data["y"][data["y"] <= self.parameters["y_max"]]
-        data["z"] = data["z"][: len(data["y"])]
-        data["y"] = data["y"][data["y"] >= self.parameters["y_min"]]
-        data["z"] = data["z"][-len(data["y"]) :]
-
-        axes.set_xlim(self.parameters["x_min"], self.parameters["x_max"])
-        axes.set_ylim(self.parameters["y_min"], self.parameters["y_max"])
-        axes.set_zlim(self.parameters["z_min"], self.parameters["z_max"])
-        axes.set_xlabel("D2 [s]")
-        axes.set_ylabel("D1 [min]")
-        axes.set_zlabel("Intensity")
+        # Autoscale intensity on the zoomed region only
+        stats = self.region_stats(
+            (self.parameters["x_min"], self.parameters["x_max"]),
+            (self.parameters["y_min"], self.parameters["y_max"]),
+        )
+        self.region = stats
 
-        axes.view_init(elev=25, azim=245)
+        # Percentile clipping keeps a single huge peak from setting the scale
+        low, high = self.autoscale_range(stats)
+        if self.parameters["z_min"] == None:
+            self.parameters["z_min"] = low
+        if self.parameters["z_max"] == None:
+            self.parameters["z_max"] = high
 
-        levels = np.linspace(
+        return self.intensity_quantiles().levels(
+            self.parameters["norm"],
             self.parameters["z_min"],
             self.parameters["z_max"],
-            int(self.parameters["lines"]),
+            self.level_count(int(self.parameters["lines"])),
         )
 
-        cs = axes.contour(
-            data["x"], data["y"], data["z"], levels, cmap=cmap
-        )
-        cbar = self.figure.colorbar(cs, pad=0.1)
-        cbar.set_label("Intensity", labelpad=-5, y=1.05, rotation="horizontal")
-        cbar.ax.ticklabel_format(
-            axis="y", style="sci", scilimits=(-2, 4), useOffset=False
-        )
-
-        labels = [float(f"{tick:0<3.1e}") for tick in cbar.ax.get_yticks()]
-        cbar.ax.set_yticks(labels)
-
-        return super().draw_axes()
+    def surface_norm(self, levels: np.ndarray, cmap) -> Normalize:
+        """Returns the surface color normalization, banded for non-linear scales."""
+
+        norm = color_norm(self.parameters["norm"], levels, cmap.N)
+        return Normalize(levels[0], levels[-1]) if norm is None else norm
+
+    def surface_mesh(self, y, x, z, bounds: tuple) -> tuple:
+        """
+        Returns the surface mesh of a cropped region, reduced to SURFACE_POLYGONS.
+
+        Blocks of points are merged into their maximum, so peaks keep their
+        height. Meshes are cached, so view angle, intensity range or color
+        changes redraw the surface without reducing the data again.
+
+        Args:
+            y, x, z (np.ndarray): D1 times, D2 times and the matrix.
+            bounds (tuple): (r0, r1, c0, c1) index ranges of the zoom.
+
+        Returns:
+            tuple: 2D (x, y, z) arrays for plot_surface().
+        """
+
+        r0, r1, c0, c1 = bounds
+        rstride, cstride = surface_strides(r1 - r0, c1 - c0, self.SURFACE_POLYGONS)
+        key = (id(z), bounds, rstride, cstride)
+        if key in self.mesh_cache:
+            self.mesh_cache.move_to_end(key)
+            return self.mesh_cache[key][1]
+
+        rows = np.arange(r0, r1, rstride)
+        cols = np.arange(c0, c1, cstride)
+        block = np.maximum.reduceat(z[r0:r1, c0:c1], rows - r0, axis=0)
+        block = np.maximum.reduceat(block, cols - c0, axis=1)
+        mesh = (*np.meshgrid(x[cols], y[rows]), block)
+
+        # The matrix is referenced so that its identity cannot be reused
+        self.mesh_cache[key] = (z, mesh)
+        while len(self.mesh_cache) > self.MESH_CACHE_SIZE:
+            self.mesh_cache.popitem(last=False)
+
+        return mesh
+
+    def render_work(self) -> tuple[int, int]:
+        """Surfaces are drawn with at most SURFACE_POLYGONS polygons."""
+
+        cells, lines = super().render_work()
+        if self.parameters.get("surface"):
+            return (min(cells, self.SURFACE_POLYGONS), 1)
+        return (cells, lines)
+
+    def update_artists(self, changed: set) -> bool:
+        """
+        Applies view angle and colormap changes in place. Surfaces also take
+        intensity range and scale changes in place. Zoom changes crop the data,
+        so they rebuild the figure.
+        """
+        live = {"cmap", "elev", "azim"}
+        if self.parameters["surface"]:
+            live |= {"z_min", "z_max", "norm", "clip", "lines"}
+        if not changed <= live or self.render_plan.get("preview"):
+            return False
+
+        axes = self.artists["axes"]
+        mappable = self.artists["mappable"]
+        cmap = plt.colormaps[self.parameters["cmap"]]
+        mappable.set_cmap(cmap)
+
+        if changed & {"elev", "azim"}:
+            # Mouse rotations are kept otherwise
+            axes.view_init(elev=self.parameters["elev"], azim=self.parameters["azim"])
+
+        if changed & {"z_min", "z_max", "norm", "clip", "lines"}:
+            levels = self.resolve_levels()
+            self.update_readout(self.region)
+            axes.set_zlim(self.parameters["z_min"], self.parameters["z_max"])
+            # A new norm also resets the colorbar ticks
+            mappable.set_norm(self.surface_norm(levels, cmap))
+            self.format_colorbar(self.artists["colorbar"])
+
+        return True
+
+    def screen_pixels(self) -> tuple:
+        # Both horizontal axes of the 3D view span about the canvas width
+        width = self.figure.bbox.width
+        return (width, width)
 
     def cb_highlight_clear(self, event=None):
         current = self.cmap_cb.get()
         self.cmap_cb.set("")
         self.cmap_cb.set(current)
-        self.update_figure()
+        self.redraw.flush()
+
+
+def surface_strides(rows: int, cols: int, budget: int) -> tuple[int, int]:
+    """
+    Returns the row and column strides fitting a mesh within a polygon budget.
+
+    The reduced mesh is kept as square as the data allows, since both
+    horizontal axes of the 3D view span about the same screen length.
+
+    Args:
+        rows (int): Number of rows of the region.
+        cols (int): Number of columns of the region.
+        budget (int): Maximum number of mesh points.
+
+    Returns:
+        tuple: (row stride, column stride).
+    """
+
+    if rows * cols <= budget:
+        return (1, 1)
+
+    kept_rows = min(rows, int(np.sqrt(budget)))
+    kept_cols = min(cols, budget // kept_rows)
+    kept_rows = min(rows, budget // kept_cols)
+    return (-(-rows // kept_rows), -(-cols // kept_cols))
@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+# The application modules are imported from src, as when it is run
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
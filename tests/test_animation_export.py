@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image, ImageSequence
+
+from visualisation import animation_export
+from visualisation.animation_export import save_animation
+
+
+class PlaybackPage:
+    """The animation interface of ContourPage: a saved canvas and moving artists."""
+
+    def __init__(self):
+        self.figure = Figure(figsize=(3, 2), dpi=50)
+        FigureCanvasAgg(self.figure)
+        self.axes = self.figure.add_subplot()
+        self.axes.imshow(np.add.outer(np.arange(10), np.arange(15)), aspect="auto")
+
+    def draw_animation(self):
+        self.line = self.axes.axvline(0, color="white", animated=True)
+        self.label = self.figure.text(0.01, 0.99, "", va="top", animated=True)
+        self.figure.canvas.draw()
+        self.background = self.figure.canvas.copy_from_bbox(self.figure.bbox)
+
+    def animate(self, index):
+        self.line.set_xdata([index, index])
+        self.label.set_text(f"{index}")
+        return [self.line, self.label]
+
+    def frame(self, index):
+        canvas = self.figure.canvas
+        canvas.restore_region(self.background)
+        for artist in self.animate(index):
+            self.figure.draw_artist(artist)
+        return np.array(canvas.buffer_rgba())
+
+
+FRAMES = [0, 2, 4, 6, 8, 10, 12]
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # Several chunks, the last one partial
+    monkeypatch.setattr(animation_export, "CHUNK_FRAMES", 3)
+
+
+def decoded_frames(path):
+    with Image.open(path) as image:
+        info = dict(image.info)
+        frames = [
+            np.asarray(frame.convert("RGBA")) for frame in ImageSequence.Iterator(image)
+        ]
+    return info, frames
+
+
+def test_apng_round_trip(tmp_path):
+    page = PlaybackPage()
+    path = tmp_path / "playback.png"
+
+    save_animation(page, str(path), FRAMES, 80)
+
+    info, frames = decoded_frames(path)
+    assert len(frames) == len(FRAMES)
+    assert info["loop"] == 0 and info["duration"] == 80
+    for index, frame in zip(FRAMES, frames):
+        assert frame.shape == (100, 150, 4)
+        np.testing.assert_array_equal(frame, page.frame(index))
+
+
+def test_gif_round_trip(tmp_path):
+    page = PlaybackPage()
+    path = tmp_path / "playback.gif"
+
+    save_animation(page, str(path), FRAMES, 80)
+
+    info, frames = decoded_frames(path)
+    assert len(frames) == len(FRAMES)
+    assert info["loop"] == 0 and info["duration"] == 80
+
+    # The palette is lossy, every frame must still be closest to its own
+    expected = [page.frame(index)[..., :3].astype(int) for index in FRAMES]
+    for position, frame in enumerate(frames):
+        assert frame.shape == (100, 150, 4)
+        errors = [np.abs(frame[..., :3] - other).mean() for other in expected]
+        assert np.argmin(errors) == position
+        assert errors[position] < 2
+
+
+def test_rejects_other_formats(tmp_path):
+    with pytest.raises(ValueError):
+        save_animation(PlaybackPage(), str(tmp_path / "playback.mp4"), FRAMES, 80)
@@ -0,0 +1,71 @@
+import base64
+import json
+import zlib
+
+import numpy as np
+import pytest
+
+from visualisation.html_export import (
+    CODES,
+    _encode,
+    _quantize,
+    intensity_codes,
+    save_html,
+)
+
+
+def decode(text, dtype, compressed=False):
+    raw = base64.b64decode(text)
+    if compressed:
+        raw = zlib.decompress(raw)
+    return np.frombuffer(raw, dtype=dtype)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_encode_round_trip(compress):
+    array = np.random.default_rng(0).integers(0, CODES, 1000).astype("<u2")
+
+    decoded = decode(_encode(array, compress), "<u2", compress)
+    np.testing.assert_array_equal(decoded, array)
+
+
+def test_quantize_round_trip_within_half_a_code():
+    lo, hi = -3.0, 250.0
+    matrix = np.random.default_rng(1).uniform(lo, hi, (40, 60))
+
+    codes = _quantize(matrix, lo, hi)
+
+    assert codes.dtype == np.dtype("<u2")
+    values = intensity_codes(lo, hi)[codes]
+    assert np.abs(values - matrix).max() <= 0.5 * (hi - lo) / (CODES - 1) * (1 + 1e-9)
+
+
+def test_quantize_clips_and_handles_missing_values():
+    matrix = np.array([[-10.0, 0.0, np.nan], [1.0, 2.0, 10.0]])
+
+    np.testing.assert_array_equal(
+        _quantize(matrix, 0, 2), [[0, 0, 0], [CODES // 2, CODES - 1, CODES - 1]]
+    )
+    np.testing.assert_array_equal(_quantize(matrix, 1, 1), np.zeros((2, 3)))
+
+
+def test_saved_levels_decode_to_the_matrix(tmp_path):
+    rows, cols = np.linspace(0, 30, 50), np.linspace(0, 6, 80)
+    matrix = np.random.default_rng(2).uniform(0, 1, (50, 80))
+    colors = np.zeros((CODES, 4), dtype=np.uint8)
+    path = tmp_path / "contour.html"
+
+    save_html(str(path), {"x": cols, "y": rows, "z": matrix}, colors, 0, 1, {})
+
+    text = path.read_text(encoding="utf-8")
+    start = text.index('{"title"')
+    payload, _ = json.JSONDecoder().raw_decode(text[start:])
+    finest = payload["levels"][0]
+
+    assert finest["shape"] == [50, 80]
+    np.testing.assert_array_equal(decode(finest["d1"], "<f4"), rows.astype("<f4"))
+    np.testing.assert_array_equal(decode(finest["d2"], "<f4"), cols.astype("<f4"))
+    codes = decode(finest["values"], "<u2", compressed=True).reshape(50, 80)
+    np.testing.assert_array_equal(codes, _quantize(matrix, 0, 1))
+    decoded_colors = decode(payload["colors"], np.uint8, compressed=True)
+    assert decoded_colors.size == CODES * 4
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from analysis.metrics import (
+    FWHM_TO_SIGMA,
+    bin_coverage,
+    convex_hull_area,
+    find_peaks,
+    peak_capacity,
+)
+
+
+def brute_force_maxima(matrix, threshold):
+    n, m = matrix.shape
+    peaks = []
+    for i in range(n):
+        for j in range(m):
+            window = matrix[max(i - 1, 0) : i + 2, max(j - 1, 0) : j + 2]
+            if matrix[i, j] > threshold * matrix.max() and matrix[i, j] >= window.max():
+                peaks.append((i, j))
+    return peaks
+
+
+def test_find_peaks_matches_brute_force():
+    rng = np.random.default_rng(0)
+    matrix = rng.random((40, 60))
+    ax_D1, ax_D2 = np.arange(40) * 0.5, np.arange(60) * 0.1
+
+    peaks = find_peaks(matrix, ax_D1, ax_D2, threshold=0.5)
+
+    expected = brute_force_maxima(matrix, 0.5)
+    rows, cols = np.array(expected).T
+    np.testing.assert_array_equal(peaks[:, 0], ax_D1[rows])
+    np.testing.assert_array_equal(peaks[:, 1], ax_D2[cols])
+    np.testing.assert_array_equal(peaks[:, 2], matrix[rows, cols])
+
+
+def test_find_peaks_merges_plateaus():
+    matrix = np.zeros((20, 30))
+    matrix[5, 3:8] = 1
+    matrix[10:13, 10:13] = 2
+    matrix[2, 25] = matrix[3, 26] = 0.5
+    matrix[15, 20] = 3
+    ax_D1, ax_D2 = np.arange(20.0), np.arange(30.0)
+
+    peaks = find_peaks(matrix, ax_D1, ax_D2)
+
+    np.testing.assert_array_equal(
+        peaks[:, :3], [[2, 25, 0.5], [5, 5, 1], [11, 11, 2], [15, 20, 3]]
+    )
+
+
+def test_find_peaks_widths_of_a_gaussian():
+    ax_D1, ax_D2 = np.linspace(0, 30, 301), np.linspace(0, 6, 601)
+    sigma_1, sigma_2 = 0.8, 0.15
+    matrix = np.exp(
+        -((ax_D1[:, None] - 12) ** 2) / (2 * sigma_1**2)
+        - (ax_D2[None, :] - 3) ** 2 / (2 * sigma_2**2)
+    )
+
+    (peak,) = find_peaks(matrix, ax_D1, ax_D2, window=50)
+
+    assert peak[:3] == pytest.approx([12, 3, 1])
+    # Widths are whole numbers of points, so within one step of the truth
+    assert peak[3] == pytest.approx(4 * sigma_1, abs=4 * FWHM_TO_SIGMA * 0.1)
+    assert peak[4] == pytest.approx(4 * sigma_2, abs=4 * FWHM_TO_SIGMA * 0.01)
+
+
+def brute_force_occupied(points, bins):
+    occupied = set()
+    for x, y in points:
+        occupied.add((min(int(x * bins), bins - 1), min(int(y * bins), bins - 1)))
+    return len(occupied)
+
+
+@pytest.mark.parametrize("count, bins", [(50, None), (200, None), (30, 10)])
+def test_bin_coverage_matches_brute_force(count, bins):
+    rng = np.random.default_rng(count)
+    points = rng.random((count, 2)) ** 2
+    points[0] = (1, 1)
+
+    coverage, orthogonality = bin_coverage(points, bins)
+
+    bins = bins or int(round(np.sqrt(count)))
+    occupied = brute_force_occupied(points, bins)
+    total = bins * bins
+    assert coverage == occupied / total
+    expected = (occupied - np.sqrt(total)) / (0.63 * total - np.sqrt(total))
+    assert orthogonality == pytest.approx(np.clip(expected, 0, 1))
+
+
+def test_bin_coverage_of_degenerate_sets():
+    assert bin_coverage(np.empty((0, 2))) == (0.0, 0.0)
+    assert bin_coverage(np.array([[0.5, 0.5]])) == (1.0, 0.0)
+
+
+def test_peak_capacity():
+    widths = np.array([0.5, 1.5, np.nan, 0, -1])
+
+    assert peak_capacity(10, widths) == 1 + 10 / 1.0
+    assert np.isnan(peak_capacity(10, np.array([np.nan, 0])))
+
+
+def test_convex_hull_area():
+    square = np.array([[0, 0], [1, 0], [1, 1], [0, 1], [0.5, 0.5], [0.2, 0.7]])
+
+    assert convex_hull_area(square) == pytest.approx(1)
+    assert convex_hull_area(square[:2]) == 0
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from analysis.normalization import IntensityQuantiles
+
+
+@pytest.fixture
+def matrix():
+    return np.random.default_rng(0).lognormal(size=(120, 300))
+
+
+def test_percentiles_match_numpy(matrix):
+    quantiles = IntensityQuantiles(matrix)
+
+    # The matrix is smaller than SAMPLE_SIZE, so every point is used
+    for q in IntensityQuantiles.GRID[::25]:
+        expected = np.percentile(matrix, q, method="nearest")
+        assert quantiles.percentile(q) == expected
+
+
+def test_extremes_are_exact_when_subsampled(monkeypatch, matrix):
+    monkeypatch.setattr(IntensityQuantiles, "SAMPLE_SIZE", 1000)
+    matrix[7, 13] = 1e6
+    quantiles = IntensityQuantiles(matrix)
+
+    assert quantiles.percentile(0) == matrix.min()
+    assert quantiles.percentile(100) == 1e6
+    assert quantiles.percentile(50) == pytest.approx(np.median(matrix), rel=0.1)
+
+
+def test_clipped_range_of_the_full_matrix(matrix):
+    quantiles = IntensityQuantiles(matrix)
+
+    result = quantiles.clipped_range(matrix, (0, 120), (0, 300), 2)
+    assert result == (quantiles.percentile(2), quantiles.percentile(98))
+
+
+def test_clipped_range_of_a_small_region_is_exact(matrix):
+    quantiles = IntensityQuantiles(matrix)
+
+    result = quantiles.clipped_range(matrix, (10, 50), (20, 260), 5)
+    expected = np.percentile(matrix[10:50, 20:260], [5, 95])
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_clipped_range_of_a_large_region_is_sampled(monkeypatch, matrix):
+    monkeypatch.setattr(IntensityQuantiles, "REGION_SAMPLE", 2000)
+    quantiles = IntensityQuantiles(matrix)
+
+    low, high = quantiles.clipped_range(matrix, (5, 115), (0, 290), 5)
+    expected = np.percentile(matrix[5:115, 0:290], [5, 95])
+    assert (low, high) == pytest.approx(expected, rel=0.1)
+
+
+def test_clipped_range_is_cached(matrix):
+    quantiles = IntensityQuantiles(matrix)
+
+    first = quantiles.clipped_range(matrix, (10, 50), (20, 260), 5)
+    matrix[10:50, 20:260] = 0
+    assert quantiles.clipped_range(matrix, (10, 50), (20, 260), 5) == first
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from analysis.pyramid import MatrixPyramid
+
+
+@pytest.fixture
+def pyramid():
+    rng = np.random.default_rng(0)
+    rows, cols = np.linspace(0, 60, 240), np.linspace(0, 8, 1600)
+    return MatrixPyramid(rng.normal(size=(240, 1600)), rows, cols)
+
+
+def check_crop(level_axis, axis, limits, margin):
+    # The crop is a contiguous slice of the level
+    start = int(np.searchsorted(level_axis, axis[0]))
+    np.testing.assert_array_equal(level_axis[start : start + len(axis)], axis)
+    stop = start + len(axis)
+
+    span = limits[1] - limits[0]
+    low, high = limits[0] - margin * span, limits[1] + margin * span
+
+    # Every point of the widened zoom is kept ...
+    inside = np.flatnonzero((level_axis >= low) & (level_axis <= high))
+    assert start <= inside[0] and inside[-1] < stop
+
+    # ... plus exactly one point on each side, when there is one
+    assert start == 0 or level_axis[start] < low <= level_axis[start + 1]
+    assert (
+        stop == len(level_axis) or level_axis[stop - 2] <= high < level_axis[stop - 1]
+    )
+    return start, stop
+
+
+@pytest.mark.parametrize(
+    "rows_range, cols_range, pixels",
+    [
+        ((0, 60), (0, 8), (100, 300)),
+        ((20, 30), (2, 3), (100, 300)),
+        ((0.2, 5), (7, 7.9), (50, 50)),
+        ((25, 26), (4, 4.05), (400, 400)),
+    ],
+)
+def test_select_crops_the_widened_zoom(pyramid, rows_range, cols_range, pixels):
+    i, j = pyramid.level_for(rows_range, cols_range, *pixels)
+    level_rows, level_cols, level_matrix = pyramid.get(i, j)
+
+    rows, cols, matrix = pyramid.select(rows_range, cols_range, *pixels)
+
+    margin = MatrixPyramid.CROP_MARGIN
+    r0, r1 = check_crop(level_rows, rows, rows_range, margin)
+    c0, c1 = check_crop(level_cols, cols, cols_range, margin)
+    np.testing.assert_array_equal(matrix, level_matrix[r0:r1, c0:c1])
+
+    # The level still has a point per pixel within the zoom
+    visible = (level_rows >= rows_range[0]) & (level_rows <= rows_range[1])
+    assert i == 0 or visible.sum() >= pixels[0]
+    visible = (level_cols >= cols_range[0]) & (level_cols <= cols_range[1])
+    assert j == 0 or visible.sum() >= pixels[1]
+
+
+def test_select_returns_the_same_views(pyramid):
+    first = pyramid.select((20, 30), (2, 3), 100, 300)
+    second = pyramid.select((20, 30), (2, 3), 100, 300)
+    assert all(a is b for a, b in zip(first, second))
+
+
+def test_max_levels_keep_the_peaks(pyramid):
+    _, _, full = pyramid.get(0, 0)
+    for i, j in [(1, 0), (0, 3), (2, 2)]:
+        assert pyramid.get(i, j)[2].max() == full.max()
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from analysis.range_index import RangeIndex, index_range, nearest_index
+
+
+def random_rectangles(rng, shape, count):
+    n, m = shape
+    for _ in range(count):
+        r0, r1 = sorted(rng.integers(0, n + 1, 2))
+        c0, c1 = sorted(rng.integers(0, m + 1, 2))
+        if r0 < r1 and c0 < c1:
+            yield (int(r0), int(r1), int(c0), int(c1))
+
+
+@pytest.mark.parametrize("max_cells", [RangeIndex.MAX_TABLE_CELLS, 2**10, 2**6])
+def test_query_matches_brute_force(monkeypatch, max_cells):
+    # Small budgets force blocks, so the partial block scans are covered too
+    monkeypatch.setattr(RangeIndex, "MAX_TABLE_CELLS", max_cells)
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(53, 97))
+    index = RangeIndex(matrix)
+
+    for r0, r1, c0, c1 in random_rectangles(rng, matrix.shape, 500):
+        region = matrix[r0:r1, c0:c1]
+        z_min, z_max, total = index.query(r0, r1, c0, c1)
+        assert z_min == region.min()
+        assert z_max == region.max()
+        assert total == pytest.approx(region.sum(), abs=1e-9)
+
+
+def test_blocks_follow_budget(monkeypatch):
+    monkeypatch.setattr(RangeIndex, "MAX_TABLE_CELLS", 2**6)
+    index = RangeIndex(np.zeros((53, 97)))
+    assert index.block != (1, 1)
+
+
+def test_query_clamps_and_rejects_empty_ranges():
+    matrix = np.arange(12.0).reshape(3, 4)
+    index = RangeIndex(matrix)
+
+    assert index.query(-5, 10, -5, 10) == (0.0, 11.0, 66.0)
+    with pytest.raises(ValueError):
+        index.query(2, 2, 0, 4)
+
+
+def test_query_coordinates():
+    rows, cols = np.linspace(0, 10, 21), np.linspace(0, 6, 13)
+    matrix = np.add.outer(rows, cols)
+    index = RangeIndex(matrix, rows, cols)
+
+    inside = (rows >= 2) & (rows <= 4), (cols >= 1) & (cols <= 3)
+    region = matrix[np.ix_(*inside)]
+    result = index.query_coordinates((4, 2), (1, 3))
+    assert result == pytest.approx((region.min(), region.max(), region.sum()))
+
+
+def test_index_range_keeps_the_closest_point():
+    axis = np.array([0.0, 1.0, 2.0, 3.0])
+
+    assert index_range(axis, 0.5, 2.5) == (1, 3)
+    assert index_range(axis, 1.2, 1.4) == (2, 3)
+    assert index_range(axis, 5, 6) == (3, 4)
+
+
+@pytest.mark.parametrize("jitter", [0, 0.3])
+def test_nearest_index_matches_argmin(jitter):
+    rng = np.random.default_rng(1)
+    axis = np.arange(200) * 0.05 + rng.uniform(0, jitter * 0.05, 200)
+    values = rng.uniform(-1, 11, 1000)
+
+    for value in values:
+        expected = np.abs(axis - value)
+        assert expected[nearest_index(axis, value)] == expected.min()
+
+
+def test_nearest_index_degenerate_axes():
+    assert nearest_index(np.array([3.0]), 10) == 0
+    assert nearest_index(np.array([3.0, 3.0]), 10) == 0
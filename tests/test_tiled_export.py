@@ -0,0 +1,78 @@
+import io
+
+import numpy as np
+import pytest
+from matplotlib.figure import Figure
+from PIL import Image
+
+from visualisation.tiled_export import save_tiled
+
+
+def contour_figure(lines: bool = False) -> Figure:
+    """A 6x4 in figure with filled contours, markers, text and sci ticks."""
+
+    figure = Figure(figsize=(6, 4), dpi=100)
+    axes = figure.add_subplot()
+    x, y = np.meshgrid(np.linspace(0, 6, 80), np.linspace(0, 30, 120))
+    z = np.exp(-((x - 3) ** 2) - (y - 15) ** 2 / 20) + 0.1 * np.sin(y)
+    axes.contourf(x, y, z, levels=20)
+    axes.scatter([1, 3, 5], [5, 15, 25], s=40, color="white")
+    if lines:
+        axes.contour(x, y, z, levels=5, colors="black", linewidths=0.5)
+        axes.plot(x[0], 5 * x[0] + 1, color="white", linewidth=1.5)
+    axes.set_title("Tiled export")
+    axes.set_xlabel("D2 [s]")
+    axes.set_ylabel("D1 [min]")
+    axes.ticklabel_format(axis="y", style="sci", scilimits=(-2, 1))
+    return figure
+
+
+def single_shot(figure: Figure, dpi: float) -> np.ndarray:
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="raw", dpi=dpi)
+    width, height = (int(size * dpi) for size in figure.get_size_inches())
+    return np.frombuffer(buffer.getvalue(), dtype=np.uint8).reshape(height, width, 4)
+
+
+def tiled(figure: Figure, path, dpi: float, rows: int) -> np.ndarray:
+    width = int(figure.get_size_inches()[0] * dpi)
+    save_tiled(figure, str(path), dpi, band_bytes=4 * width * rows)
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGBA"))
+
+
+@pytest.mark.parametrize("rows", [37, 100, 133])
+def test_bands_match_single_savefig(tmp_path, rows):
+    figure = contour_figure()
+    expected = single_shot(figure, 100)
+
+    np.testing.assert_array_equal(
+        tiled(figure, tmp_path / "a.png", 100, rows), expected
+    )
+
+
+@pytest.mark.parametrize("suffix, dpi", [(".tif", 100), (".png", 150), (".png", 72)])
+def test_bands_match_single_savefig_formats(tmp_path, suffix, dpi):
+    figure = contour_figure()
+    expected = single_shot(figure, dpi)
+
+    result = tiled(figure, tmp_path / f"a{suffix}", dpi, 37)
+    np.testing.assert_array_equal(result, expected)
+    # The figure keeps its own resolution
+    assert figure.dpi == 100
+
+
+@pytest.mark.parametrize("rows", [1, 37])
+def test_strokes_across_bands_only_differ_in_antialiasing(tmp_path, rows):
+    # Agg clips strokes to the band before rasterizing them, so the coverage
+    # of their edge pixels may round differently, but nothing moves
+    figure = contour_figure(lines=True)
+    expected = single_shot(figure, 100).astype(int)
+
+    result = tiled(figure, tmp_path / "a.png", 100, rows).astype(int)
+    assert np.abs(result - expected).max() <= 3
+
+
+def test_rejects_other_formats(tmp_path):
+    with pytest.raises(ValueError):
+        save_tiled(contour_figure(), str(tmp_path / "a.jpg"), 100)